@@ -1,5 +1,10 @@
+import asyncio
+from contextlib import aclosing
+from contextvars import ContextVar
 import yaml
 import uuid
+import time
+import weakref
 from typing import Dict, Optional, Any, Callable
 import logging
 import httpx
@@ -36,6 +41,19 @@ from a2a.types import (
     TaskStatusUpdateEvent,
 )
 from actions.api.common.utils.push_notification_auth import PushNotificationReceiverAuth
+from actions.api.a2a_transport import AgentTransportConfig, get_transport
+from actions.api.a2a_card_cache import CachedCard, CardCache, fetch_card
+from actions.api.a2a_health import AgentHealthTracker, JitteredScheduler
+from actions.api.a2a_task_store import TaskStore, get_message_id
+from actions.api.a2a_session import A2ASession, SessionStore
+from actions.api.event_log import EventLog
+from actions.api.a2a_tracing import A2ATracer
+from actions.api.coalescer import MessageCoalescer
+from actions.api.artifact_assembler import ArtifactAssembler, ArtifactTooLarge
+from actions.api.a2a_router import SkillRouter, sentence_transformer_embed
+from actions.api.a2a_checkpoint import CheckpointStore, TaskCheckpoint, create_checkpoint_store
+from actions.api.circuit_breaker import CircuitBreaker, CircuitBreakerConfig, CircuitOpenError, CircuitState
+from actions.api import metrics, profiling
 
 class Event(BaseModel):
     id: str
@@ -46,49 +64,178 @@ class Event(BaseModel):
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.events import SlotSet
+from rasa_sdk.executor import CollectingDispatcher
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_DISCOVERY_TIMEOUT = 10.0
+DEFAULT_REFRESH_INTERVAL = 60.0
+DEFAULT_SESSION_ID = "default"
+A2A_CONFIG_PATH = "a2a.yml"
+DEFAULT_FAN_OUT_DEADLINE = 15.0
+# a2a_agent_name value that asks the skill router to pick the agent
+DEFAULT_AUTO_ROUTE_NAME = "auto"
+
+# set for the duration of each ActionA2A.run() so concurrent conversations never share state
+_current_session: ContextVar[Optional[A2ASession]] = ContextVar("a2a_session", default=None)
+# set inside each fan-out request so an agent's reply is collected instead of dispatched
+_reply_collector: ContextVar[Optional[MessageCoalescer]] = ContextVar("a2a_reply_collector", default=None)
+
+A2A_REQUEST_SECONDS = metrics.histogram(
+    "a2a_request_seconds", "Duration of A2A send_message calls", ["agent", "mode", "outcome"]
+)
+A2A_STREAM_FIRST_EVENT_SECONDS = metrics.histogram(
+    "a2a_stream_first_event_seconds", "Time from sending a streaming A2A request to its first event", ["agent"]
+)
+A2A_STREAM_EVENTS_TOTAL = metrics.counter(
+    "a2a_stream_events_total", "Streamed A2A events received", ["agent"]
+)
+A2A_CIRCUIT_STATE = metrics.gauge(
+    "a2a_circuit_state", "1 for the current circuit breaker state of each agent", ["agent", "state"]
+)
+A2A_REQUEST_TIMEOUT_SECONDS = metrics.gauge(
+    "a2a_request_timeout_seconds", "Current adaptive request timeout of each agent", ["agent"]
+)
+A2A_AGENT_HEALTH = metrics.gauge(
+    "a2a_agent_health", "1 for the current card poll health of each agent", ["agent", "status"]
+)
+A2A_SESSIONS = metrics.gauge("a2a_sessions", "A2A conversation sessions held in memory")
+A2A_SESSION_BYTES = metrics.gauge("a2a_session_bytes", "Estimated memory held by A2A sessions")
+A2A_POOL_CONNECTIONS = metrics.gauge(
+    "a2a_pool_connections", "Connections in the shared A2A HTTP pools", ["pool", "state"]
+)
+
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 
 class RemoteAgentConnections:
     """Handles connections and communication with a single remote agent"""
 
-    def __init__(self, agent_card: AgentCard):
+    def __init__(
+        self,
+        agent_card: AgentCard,
+        transport_config: Optional[AgentTransportConfig] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
         self.agent_card = agent_card
-        self.client = A2AClient(httpx.AsyncClient(timeout=30), agent_card=agent_card)
+        self.transport_config = transport_config or AgentTransportConfig()
+        # outlives this connection: a refreshed card gets a new connection with the same breaker
+        self.breaker = breaker
+        self.http_kwargs = self.transport_config.http_kwargs
+        self.client = A2AClient(
+            get_transport().client_for(self.transport_config), agent_card=agent_card
+        )
 
     @property
     def events(self) -> list[Event]:
-        return sorted(self._events.values(), key=lambda x: x.timestamp)
+        """Events from this agent in the current conversation, oldest first."""
+        session = _current_session.get()
+        if session is None:
+            return []
+        return session.events.for_actor(self.agent_card.name)
 
     async def send_message(
         self,
         request: MessageSendParams,
         task_callback: TaskUpdateCallback | None,
+    ) -> Task | Message | None:
+        """
+        Send the message through the agent's circuit breaker: fail fast with
+        CircuitOpenError while the circuit is open, otherwise time the call out
+        after the breaker's adaptive timeout and report the outcome. A unary
+        call must answer within the timeout; a stream must deliver each event
+        (the first one included) within it, however long the whole task runs.
+        The latency reported for a stream is its longest wait for an event.
+        """
+        name = self.agent_card.name
+        mode = "streaming" if self.agent_card.capabilities.streaming else "unary"
+        breaker = self.breaker
+        if breaker is not None and not breaker.allow():
+            A2A_REQUEST_SECONDS.observe(0.0, agent=name, mode=mode, outcome="rejected")
+            raise CircuitOpenError(f"Circuit for A2A agent {name} is open")
+        timeout = breaker.timeout() if breaker is not None else None
+        streaming = self.agent_card.capabilities.streaming
+        stream_latency = [0.0]
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with profiling.span("send"):
+                if streaming:
+                    result = await self._send_message(request, task_callback, timeout, stream_latency)
+                else:
+                    result = await asyncio.wait_for(self._send_message(request, task_callback), timeout)
+            outcome = "ok"
+        except asyncio.CancelledError:
+            # cancelled by us (e.g. a fan-out that is already done), says nothing about the agent
+            outcome = "cancelled"
+            if breaker is not None:
+                breaker.release()
+            raise
+        except asyncio.TimeoutError as e:
+            outcome = "timeout"
+            if timeout is None:
+                # not our timeout, raised inside the exchange
+                raise
+            latency = timeout if streaming else time.perf_counter() - started
+            if breaker is not None:
+                breaker.record_failure(latency, f"timed out after {timeout:.1f}s")
+            if streaming:
+                raise TimeoutError(f"A2A agent {name} sent no stream event within {timeout:.1f}s") from e
+            raise TimeoutError(f"A2A agent {name} did not answer within {timeout:.1f}s") from e
+        except Exception as e:
+            if breaker is not None:
+                breaker.record_failure(time.perf_counter() - started, e)
+            raise
+        finally:
+            A2A_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, agent=name, mode=mode, outcome=outcome
+            )
+        if breaker is not None:
+            breaker.record_success(stream_latency[0] if streaming else time.perf_counter() - started)
+        return result
+
+    async def _send_message(
+        self,
+        request: MessageSendParams,
+        task_callback: TaskUpdateCallback | None,
+        event_timeout: Optional[float] = None,
+        stream_latency: Optional[list[float]] = None,
     ) -> Task | Message | None:
         if self.agent_card.capabilities.streaming:
             task = None
-            async for response in self.client.send_message_streaming(
-                SendStreamingMessageRequest(params=request)
-            ):
-                if not response.root.result:
-                    return response.root.error
-                # In the case a message is returned, that is the end of the interaction.
-                event = response.root.result
-                if isinstance(event, Message):
-                    return event
-
-                # Otherwise we are in the Task + TaskUpdate cycle.
-                if task_callback and event:
-                    task = task_callback(event, self.agent_card)
-                if hasattr(event, "final") and event.final:
-                    break
+            started = time.perf_counter()
+            first = True
+            stream = self.client.send_message_streaming(
+                SendStreamingMessageRequest(id=str(uuid.uuid4()), params=request),
+                http_kwargs=self.http_kwargs,
+            )
+            events = _events_within(stream, event_timeout, stream_latency)
+            with profiling.span("stream"):
+                async with aclosing(events):
+                    async for response in events:
+                        if first:
+                            A2A_STREAM_FIRST_EVENT_SECONDS.observe(
+                                time.perf_counter() - started, agent=self.agent_card.name
+                            )
+                            first = False
+                        A2A_STREAM_EVENTS_TOTAL.inc(agent=self.agent_card.name)
+                        if not response.root.result:
+                            return response.root.error
+                        # In the case a message is returned, that is the end of the interaction.
+                        event = response.root.result
+                        if isinstance(event, Message):
+                            return event
+
+                        # Otherwise we are in the Task + TaskUpdate cycle.
+                        if task_callback and event:
+                            task = task_callback(event, self.agent_card)
+                        if hasattr(event, "final") and event.final:
+                            break
             return task
         else:  # Non-streaming
             response = await self.client.send_message(
-                SendMessageRequest(params=request)
+                SendMessageRequest(id=str(uuid.uuid4()), params=request),
+                http_kwargs=self.http_kwargs,
             )
             if isinstance(response.root, JSONRPCErrorResponse):
                 return response.root.error
@@ -118,21 +265,24 @@ class RemoteAgentConnections:
                         history=[request.message],
                     )
                 )
-            logger.debug(f">>> Sending request to remote agent: {request.model_dump()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f">>> Sending request to remote agent: {request.model_dump()}")
             response_stream = self.client.send_message_streaming(
                 SendStreamingMessageRequest(
                     id=str(uuid.uuid4()),
                     params=request,
-                )
+                ),
+                http_kwargs=self.http_kwargs,
             )
             async for result in response_stream:
                 if isinstance(result.root, JSONRPCErrorResponse):
                     logger.error(f"Error: {result.root.error}")
                     return None
                 event = result.root.result
-                logger.debug(
-                    f">>> stream event => {event.model_dump_json(exclude_none=True)}"
-                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        f">>> stream event => {event.model_dump_json(exclude_none=True)}"
+                    )
                 if task_callback:
                     task = task_callback(event)
                 if isinstance(event, Task) and event.status.state in [
@@ -147,7 +297,8 @@ class RemoteAgentConnections:
                     SendMessageRequest(
                         id=str(uuid.uuid4()),
                         params=request,
-                    )
+                    ),
+                    http_kwargs=self.http_kwargs,
                 )
                 event = response.root.result
                 if task_callback:
@@ -158,6 +309,26 @@ class RemoteAgentConnections:
                 return None
 
 
+async def _events_within(stream, timeout: Optional[float], longest_wait: Optional[list[float]] = None):
+    """Yield the events of `stream`, failing with TimeoutError when one takes longer than `timeout`.
+
+    The longest wait for an event is kept in `longest_wait[0]`.
+    """
+    try:
+        while True:
+            waited = time.perf_counter()
+            try:
+                event = await asyncio.wait_for(stream.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+            if longest_wait is not None:
+                longest_wait[0] = max(longest_wait[0], time.perf_counter() - waited)
+            yield event
+    finally:
+        if hasattr(stream, "aclose"):
+            await stream.aclose()
+
+
 def merge_metadata(target, source):
     if not hasattr(target, "metadata") or not hasattr(source, "metadata"):
         return
@@ -179,18 +350,64 @@ def merge_metadata(target, source):
     #     return SendTaskResponse(**await self._send_request(request))
 
 
-def get_message_id(m: Message | None) -> str | None:
-    if not m or not m.metadata or "message_id" not in m.metadata:
-        return None
-    return m.metadata["message_id"]
-
-
 def get_last_message_id(m: Message | None) -> str | None:
     if not m or not m.metadata or "last_message_id" not in m.metadata:
         return None
     return m.metadata["last_message_id"]
 
 
+def coalesce_config(streaming_config: dict) -> dict[str, Any]:
+    config = {}
+    if "coalesce" in streaming_config:
+        config["enabled"] = bool(streaming_config["coalesce"])
+    if "max_chars" in streaming_config:
+        config["max_chars"] = int(streaming_config["max_chars"])
+    if "window" in streaming_config:
+        config["window"] = float(streaming_config["window"])
+    return config
+
+
+def reply_complete(event: TaskCallbackArg) -> bool:
+    """True when an event ends the agent's current reply, i.e. buffered text should be sent."""
+    if getattr(event, "final", False):
+        return True
+    status = getattr(event, "status", None)
+    return status is not None and status.state not in [TaskState.submitted, TaskState.working]
+
+
+def build_request(
+    text: str, session_id: str, checkpoint: Optional[TaskCheckpoint] = None
+) -> MessageSendParams:
+    return MessageSendParams(
+        # id=str(uuid.uuid4()),
+        # referenceTaskIds=str(uuid.uuid4()),
+        message=Message(
+            role="user",
+            parts=[TextPart(text=text)],
+            messageId=str(uuid.uuid4()),
+            sessionId=session_id,
+            # continue the remote task that asked for input on the previous turn
+            contextId=checkpoint.context_id if checkpoint else None,
+            taskId=checkpoint.task_id if checkpoint else None,
+        ),
+        configuration=MessageSendConfiguration(
+            acceptedOutputModes=["text", "text/plain"],
+        ),
+    )
+
+
+def result_status(result: Task | Message | Any) -> str:
+    """Map the result of RemoteAgentConnections.send_message to an a2a_status value."""
+    if isinstance(result, Message):
+        return "completed"
+    if isinstance(result, Task):
+        if result.status.state == TaskState.completed:
+            return "completed"
+        if result.status.state == TaskState.input_required:
+            return "input-required"
+    return "error"
+
+
 def task_still_open(task: Task | None) -> bool:
     if not task:
         return False
@@ -204,29 +421,79 @@ def task_still_open(task: Task | None) -> bool:
 class ActionA2A(Action):
     """Custom action for A2A client functionality"""
 
-    _tasks: list[Task]
-    _task_map: dict[str, str]
-
     def __init__(self):
         # super().__init__(name)
         # The self.agents dictionary is used to store and manage connections to remote agents.
         self.agents: Dict[str, RemoteAgentConnections] = {}
         self.agent_card = None
-        self._tasks = []
-        self._task_map = {}
-        self._events: dict[str, Event] = {}
-        self.dispatcher: Optional[Callable] = None # need dispatcher to send messages back to Rasa as they are streamed via A2A SSE
+        self.card_cache = CardCache()
+        self.agent_health = AgentHealthTracker()
+        self._agent_configs: list[dict] = []
+        self._discovery_timeout = DEFAULT_DISCOVERY_TIMEOUT
+        self._refresh_scheduler: Optional[JitteredScheduler] = None
+        self._background_tasks: set[asyncio.Task] = set()
+        # conversation state (dispatcher, tasks, events) lives in one A2ASession per sender_id
+        self.sessions = SessionStore()
+        self.tracer = A2ATracer()
+        self.coalesce_config: dict[str, Any] = {}
+        self.fan_out_groups: dict[str, dict] = {}
+        self.router = SkillRouter()
+        self.auto_route_name = DEFAULT_AUTO_ROUTE_NAME
+        # open input-required tasks per (sender_id, agent), created from a2a.yml in load_agents
+        self.checkpoints: Optional[CheckpointStore] = None
+        # (sender_id, agent) pairs this process checkpointed or resumed, others need no delete
+        self._checkpointed: set[tuple[str, str]] = set()
+        self.breaker_config = CircuitBreakerConfig()
+        self.breakers: dict[str, CircuitBreaker] = {}
+        # weakly held, a replaced instance is not kept alive or collected by the registry
+        metrics.on_collect(weakref.WeakMethod(self.collect_metrics))
         # self.task_callback: Optional[TaskUpdateCallback] = None
         return None
 
+    @property
+    def session(self) -> A2ASession:
+        """The session of the conversation whose run() is executing in this context."""
+        session = _current_session.get()
+        if session is None:
+            # outside of run(), e.g. when callbacks are driven directly; only run() sets the context
+            session = self.sessions.get(DEFAULT_SESSION_ID)
+        return session
+
+    @property
+    def dispatcher(self) -> Optional[CollectingDispatcher]:
+        # need dispatcher to send messages back to Rasa as they are streamed via A2A SSE
+        return self.session.dispatcher
+
+    @dispatcher.setter
+    def dispatcher(self, dispatcher: Optional[CollectingDispatcher]):
+        self.session.dispatcher = dispatcher
+
+    @property
+    def _tasks(self) -> TaskStore:
+        return self.session.tasks
+
+    @property
+    def _task_map(self) -> dict[str, str]:
+        return self.session.task_map
+
+    @property
+    def _events(self) -> EventLog:
+        return self.session.events
+
+    @property
+    def _artifact_assembler(self) -> ArtifactAssembler:
+        return self.session.artifacts
+
+    @property
+    def _next_id(self) -> dict[str, str]:
+        return self.session.next_id
+
     def add_task(self, task: Task):
-        self._tasks.append(task)
+        self._tasks.put(task)
 
     def update_task(self, task: Task):
-        for i, t in enumerate(self._tasks):
-            if t.id == task.id:
-                self._tasks[i] = task
-                return
+        if task.id in self._tasks:
+            self._tasks.put(task)
 
     def attach_message_to_task(self, message: Message | None, task_id: str):
         if message and message.metadata and "message_id" in message.metadata:
@@ -248,10 +515,10 @@ class ActionA2A(Action):
         message_id = get_message_id(message)
         if not message_id:
             return
-        if get_message_id(task.status.message) not in [
-            get_message_id(x) for x in task.history
-        ]:
+        status_message_id = get_message_id(task.status.message)
+        if not self._tasks.has_message(task.id, status_message_id):
             task.history.append(task.status.message)
+            self._tasks.add_message_id(task.id, status_message_id)
         else:
             print(
                 "Message id already in history",
@@ -269,7 +536,7 @@ class ActionA2A(Action):
             task_id = event.taskId
         if not task_id:
             task_id = str(uuid.uuid4())
-        current_task = next(filter(lambda x: x.id == task_id, self._tasks), None)
+        current_task = self._tasks.get(task_id)
         if not current_task:
             context_id = event.contextId
             current_task = Task(
@@ -288,6 +555,7 @@ class ActionA2A(Action):
         self, current_task: Task, task_update_event: TaskArtifactUpdateEvent
     ):
         artifact = task_update_event.artifact
+        assembler = self._artifact_assembler
         if not task_update_event.append:
             # received the first chunk or entire payload for an artifact
             if task_update_event.lastChunk is None or task_update_event.lastChunk:
@@ -296,22 +564,28 @@ class ActionA2A(Action):
                 if not current_task.artifacts:
                     current_task.artifacts = []
                 current_task.artifacts.append(artifact)
+                return
+            # this is a chunk of an artifact, buffer it in the assembler
+            try:
+                assembler.start(artifact)
+            except ArtifactTooLarge as e:
+                logger.error(str(e))
+            return
+
+        # we received an append chunk, add to the partial artifact
+        try:
+            assembler.append(artifact)
+        except ArtifactTooLarge as e:
+            logger.error(str(e))
+        if task_update_event.lastChunk:
+            # None when the artifact was dropped, a truncated artifact is never attached
+            assembled = assembler.finish(artifact.artifactId)
+            if assembled is None:
+                return
+            if current_task.artifacts:
+                current_task.artifacts.append(assembled)
             else:
-                # this is a chunk of an artifact, stash it in temp store for assembling
-                if artifact.artifactId not in self._artifact_chunks:
-                    self._artifact_chunks[artifact.artifactId] = []
-                self._artifact_chunks[artifact.artifactId].append(artifact)
-        else:
-            # we received an append chunk, add to the existing temp artifact
-            current_temp_artifact = self._artifact_chunks[artifact.artifactId][-1]
-            # TODO handle if current_temp_artifact is missing
-            current_temp_artifact.parts.extend(artifact.parts)
-            if task_update_event.lastChunk:
-                if current_task.artifacts:
-                    current_task.artifacts.append(current_temp_artifact)
-                else:
-                    current_task.artifacts = [current_temp_artifact]
-                del self._artifact_chunks[artifact.artifactId][-1]
+                current_task.artifacts = [assembled]
 
     def name(self) -> str:
         return "action_a2a"
@@ -319,35 +593,205 @@ class ActionA2A(Action):
     async def load_agents(self):
         """
         Load agent configurations from a2a.yml
-        - Get agent card at {agent["base_url]}{agent["agent_card_path"]}
+        - Agents with a cached card are registered straight away, stale cards are
+          revalidated in the background
+        - All other cards are fetched concurrently under `discovery_timeout`
         """
         logger.info("Reading a2a.yml")
-        with open("a2a.yml", "r") as file:
-            config = yaml.safe_load(file)["remote_agents"]
-            for agent in config:
-                logger.info(
-                    f"Loading agent: {agent['name']}, {agent['base_url']}{agent['agent_card_path']}"
-                )
-                async with httpx.AsyncClient(timeout=30) as httpx_client:
-                    card_resolver = A2ACardResolver(
-                        httpx_client, agent["base_url"], agent["agent_card_path"]
-                    )
-                    try:
-                        self.agent_card = await card_resolver.get_agent_card()
-                        # self.agent_card["url"] = agent.get("agent_endpoint_path", "/")
-                        logger.info(f"Agent card: {self.agent_card}")
-                        logger.info(f"agent['name']: {agent['name']}")
-                        self.agents[agent["name"]] = RemoteAgentConnections(
-                            self.agent_card
-                            # card_resolver.get_agent_card()
-                        )
-                        logger.info(
-                            f"Loaded agent: {self.agent_card.name}, vers: {self.agent_card.version}"
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to load A2A agent card {agent['name']}: {str(e)}"
-                        )
+        with open(A2A_CONFIG_PATH, "r") as file:
+            a2a_config = yaml.safe_load(file)
+        config = a2a_config["remote_agents"]
+        deadline = float(a2a_config.get("discovery_timeout", DEFAULT_DISCOVERY_TIMEOUT))
+        self._agent_configs = config
+        self._discovery_timeout = deadline
+        self._configure_health_checks(a2a_config.get("health_check") or {})
+        self._configure_sessions(a2a_config.get("session_state") or {})
+        self.tracer = A2ATracer.from_config(a2a_config.get("tracing") or {}, config)
+        self.coalesce_config = coalesce_config(a2a_config.get("streaming") or {})
+        self.fan_out_groups = {group["name"]: group for group in a2a_config.get("fan_out") or []}
+        self.breaker_config = CircuitBreakerConfig.from_dict(a2a_config.get("circuit_breaker"))
+        self._configure_routing(a2a_config.get("routing") or {})
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+        self.checkpoints = create_checkpoint_store(a2a_config.get("checkpoints") or {})
+        self._checkpointed = set()
+
+        to_fetch = []
+        for agent in config:
+            cached = self.card_cache.get(agent["base_url"])
+            if cached:
+                logger.info(f"Using cached agent card for {agent['name']}")
+                self._register_agent(agent, cached)
+                if not cached.is_fresh():
+                    metrics.record_cache("a2a_card", "stale")
+                    self._run_in_background(self._load_agent(agent))
+                else:
+                    metrics.record_cache("a2a_card", "hit")
+            else:
+                metrics.record_cache("a2a_card", "miss")
+                to_fetch.append(agent)
+
+        if not to_fetch:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._load_agent(agent) for agent in to_fetch)),
+                timeout=deadline,
+            )
+        except asyncio.TimeoutError:
+            missing = [agent["name"] for agent in to_fetch if agent["name"] not in self.agents]
+            logger.error(
+                f"A2A agent discovery exceeded {deadline}s, agents not loaded: {missing}"
+            )
+
+    def _configure_sessions(self, session_config: dict):
+        self.sessions.max_sessions = int(session_config.get("max_sessions", self.sessions.max_sessions))
+        self.sessions.ttl = float(session_config.get("ttl", self.sessions.ttl))
+        self.sessions.max_bytes = int(session_config.get("max_bytes", self.sessions.max_bytes))
+        self.sessions.event_log_capacity = int(
+            session_config.get("event_log_capacity", self.sessions.event_log_capacity)
+        )
+        self.sessions.event_spill_path = session_config.get(
+            "event_spill_path", self.sessions.event_spill_path
+        )
+        self.sessions.artifact_max_bytes = int(
+            session_config.get("artifact_max_bytes", self.sessions.artifact_max_bytes)
+        )
+        self.sessions.artifact_timeout = float(
+            session_config.get("artifact_timeout", self.sessions.artifact_timeout)
+        )
+
+    def collect_metrics(self):
+        """Refresh the gauges read from live A2A state, called on each metrics scrape."""
+        A2A_CIRCUIT_STATE.clear()
+        for name, breaker in self.breakers.items():
+            for state in CircuitState:
+                A2A_CIRCUIT_STATE.set(int(breaker.state == state), agent=name, state=state.value)
+            A2A_REQUEST_TIMEOUT_SECONDS.set(breaker.timeout(), agent=name)
+        A2A_AGENT_HEALTH.clear()
+        for name, health in self.agent_health.snapshot().items():
+            A2A_AGENT_HEALTH.set(1, agent=name, status=health["status"])
+        A2A_SESSIONS.set(len(self.sessions))
+        A2A_SESSION_BYTES.set(self.sessions.total_bytes)
+        for pool in get_transport().metrics():
+            for state in ("active", "idle"):
+                A2A_POOL_CONNECTIONS.set(pool[state], pool=pool["pool"], state=state)
+
+    def _configure_routing(self, routing_config: dict):
+        self.auto_route_name = routing_config.get("auto_route_name", self.auto_route_name)
+        self.router.min_score = float(routing_config.get("min_score", self.router.min_score))
+        self.router.embedding_weight = float(
+            routing_config.get("embedding_weight", self.router.embedding_weight)
+        )
+        if routing_config.get("embedding_model"):
+            self.router.embed = sentence_transformer_embed(routing_config["embedding_model"])
+
+    def _configure_health_checks(self, health_config: dict):
+        self.agent_health.degraded_latency = float(
+            health_config.get("degraded_latency", self.agent_health.degraded_latency)
+        )
+        self.agent_health.failure_threshold = int(
+            health_config.get("failure_threshold", self.agent_health.failure_threshold)
+        )
+        if self._refresh_scheduler is None:
+            self._refresh_scheduler = JitteredScheduler(
+                "a2a_agent_refresh",
+                interval=float(health_config.get("interval", DEFAULT_REFRESH_INTERVAL)),
+                jitter=float(health_config.get("jitter", 0.2)),
+                callback=self.refresh_agents,
+            )
+
+    async def refresh_agents(self):
+        """
+        Re-read the agents listed in a2a.yml and re-poll their cards. New or
+        changed cards replace the entry in self.agents and agents no longer
+        listed are dropped; calls already running keep the connection they
+        looked up, so nothing in flight is interrupted. An agent whose poll
+        fails keeps serving its current connection.
+        """
+        self._update_agent_configs(self._read_remote_agents())
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._load_agent(agent) for agent in self._agent_configs)),
+                timeout=self._discovery_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"A2A agent refresh exceeded {self._discovery_timeout}s")
+        logger.debug(f"A2A agent health: {self.agent_health.snapshot()}")
+
+    def _read_remote_agents(self) -> Optional[list[dict]]:
+        try:
+            with open(A2A_CONFIG_PATH, "r") as file:
+                return yaml.safe_load(file)["remote_agents"]
+        except Exception as e:
+            logger.warning(f"Failed to re-read {A2A_CONFIG_PATH}, keeping the current agents: {str(e)}")
+            return None
+
+    def _update_agent_configs(self, config: Optional[list[dict]]):
+        if config is None:
+            return
+        self._agent_configs = config
+        configured = {agent["name"] for agent in config}
+        removed = [name for name in self.agents if name not in configured]
+        for name in removed:
+            logger.info(f"A2A agent {name} is no longer configured, dropping it")
+            del self.agents[name]
+            self.breakers.pop(name, None)
+            self.agent_health.forget(name)
+        if removed:
+            self.router.build({name: connection.agent_card for name, connection in self.agents.items()})
+
+    async def _load_agent(self, agent: dict):
+        """Fetch (or revalidate) one agent card, cache it and register the agent."""
+        logger.info(
+            f"Loading agent: {agent['name']}, {agent['base_url']}{agent['agent_card_path']}"
+        )
+        transport_config = AgentTransportConfig.from_dict(agent)
+        cached = self.card_cache.get(agent["base_url"])
+        started = time.perf_counter()
+        try:
+            entry = await fetch_card(
+                get_transport().client_for(transport_config),
+                agent["base_url"],
+                agent["agent_card_path"],
+                cached=cached,
+                http_kwargs=transport_config.http_kwargs,
+            )
+        except asyncio.CancelledError:
+            self.agent_health.record_failure(agent["name"], "timed out")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to load A2A agent card {agent['name']}: {str(e)}")
+            self.agent_health.record_failure(agent["name"], str(e))
+            return
+        self.agent_health.record_success(agent["name"], time.perf_counter() - started)
+        self.card_cache.put(agent["base_url"], entry)
+        if cached and entry.card is cached.card:
+            # the agent answered 304 Not Modified
+            metrics.record_cache("a2a_card", "revalidated")
+        if cached and cached.card == entry.card and agent["name"] in self.agents:
+            return
+        self._register_agent(agent, entry)
+
+    def _register_agent(self, agent: dict, entry: CachedCard):
+        self.agent_card = entry.agent_card
+        logger.info(f"Agent card: {self.agent_card}")
+        breaker = self.breakers.get(agent["name"])
+        if breaker is None:
+            breaker = self.breakers[agent["name"]] = CircuitBreaker(agent["name"], self.breaker_config)
+        self.agents[agent["name"]] = RemoteAgentConnections(
+            self.agent_card, AgentTransportConfig.from_dict(agent), breaker
+        )
+        logger.info(
+            f"Loaded agent: {self.agent_card.name}, vers: {self.agent_card.version}"
+        )
+        self.router.build({name: connection.agent_card for name, connection in self.agents.items()})
+
+    def _run_in_background(self, coro):
+        # keep a reference so the task is not garbage collected before it finishes
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
     async def ensure_agents_loaded(self):
         if not self.agents:
@@ -355,6 +799,8 @@ class ActionA2A(Action):
             logger.info(f"Loaded agents:")
             for agent in self.agents:
                 logger.info(f"  - {agent}")
+        if self._refresh_scheduler:
+            self._refresh_scheduler.start()
 
 # In class ActionA2A:
 
@@ -366,36 +812,53 @@ class ActionA2A(Action):
         current_task: Optional[Task] = None
 
         if isinstance(event_data, TaskStatusUpdateEvent):
-            logger.info(f"DETAILED_EVENT_LOG: TaskStatusUpdateEvent received. Status: {event_data.status.state}")
-            if event_data.status.message:
-                logger.info(f"DETAILED_EVENT_LOG: TaskStatusUpdateEvent - Message object: {event_data.status.message.model_dump_json(exclude_none=True, indent=2)}")
-                for i, part_wrapper in enumerate(event_data.status.message.parts):
-                    # Assuming part_wrapper is a 'Part' pydantic model which has a 'root' field
-                    # that can be TextPart, FunctionCallPart etc.
-                    logger.info(f"DETAILED_EVENT_LOG: Part {i} kind: {part_wrapper.root.kind if hasattr(part_wrapper, 'root') else 'N/A'}")
-                    logger.info(f"DETAILED_EVENT_LOG: Part {i} content: {part_wrapper.model_dump_json(exclude_none=True, indent=2)}")
-            else:
-                logger.info("DETAILED_EVENT_LOG: TaskStatusUpdateEvent - No message object in status.")
+            self.tracer.trace(
+                "status_update",
+                agent_card.name,
+                task_id=event_data.taskId,
+                state=event_data.status.state,
+                final=event_data.final,
+                part_kinds=lambda: [p.root.kind for p in event_data.status.message.parts]
+                if event_data.status.message
+                else [],
+                payload=lambda: event_data.model_dump(mode="json", exclude_none=True),
+            )
             current_task = self.add_or_get_task(event_data)
             current_task.status = event_data.status
             self.attach_message_to_task(event_data.status.message, current_task.id)
             self.insert_message_history(current_task, event_data.status.message)
             self.update_task(current_task)
         elif isinstance(event_data, TaskArtifactUpdateEvent):
-            logger.info(f"DETAILED_EVENT_LOG: TaskArtifactUpdateEvent received. Status: {event_data.artifact.name}")
+            self.tracer.trace(
+                "artifact_update",
+                agent_card.name,
+                task_id=event_data.taskId,
+                artifact=event_data.artifact.name,
+                append=event_data.append,
+                last_chunk=event_data.lastChunk,
+                payload=lambda: event_data.model_dump(mode="json", exclude_none=True),
+            )
             current_task = self.add_or_get_task(event_data)
             self.process_artifact_event(current_task, event_data)
             self.update_task(current_task)
         elif isinstance(event_data, Task):
-            logger.info(f"DETAILED_EVENT_LOG: Task event received: {event_data.model_dump_json(exclude_none=True, indent=2)}")
+            self.tracer.trace(
+                "task",
+                agent_card.name,
+                task_id=event_data.id,
+                state=event_data.status.state,
+                payload=lambda: event_data.model_dump(mode="json", exclude_none=True),
+            )
             # This could be an initial task submission confirmation or a full task update
             # Check if task already exists
-            existing_task = next((t for t in self._tasks if t.id == event_data.id), None)
+            existing_task = self._tasks.get(event_data.id)
             if existing_task:
                 # Update existing task
                 existing_task.status = event_data.status # Essential
                 if event_data.artifacts: existing_task.artifacts = event_data.artifacts # Or merge
-                if event_data.history: existing_task.history = event_data.history # Or merge
+                if event_data.history:
+                    existing_task.history = event_data.history # Or merge
+                    self._tasks.index_history(existing_task)
                 # Update other fields as necessary
                 self.attach_message_to_task(event_data.status.message, existing_task.id)
                 current_task = existing_task
@@ -412,7 +875,8 @@ class ActionA2A(Action):
 
 
         # Now, call a method to dispatch the message from this event_data, if any
-        self._dispatch_event_content(event_data, agent_card)
+        with profiling.span("dispatch"):
+            self._dispatch_event_content(event_data, agent_card)
         
         # Log the event internally (your existing emit_event logic can be repurposed for this)
         self._log_event_internally(event_data, agent_card)
@@ -443,10 +907,10 @@ class ActionA2A(Action):
             # Avoid dispatching generic "submitted" or "working" if no actual text
             elif event_data.status.state in [TaskState.submitted, TaskState.working] and \
                  (not event_data.status.message or not any(p.root.text for p in event_data.status.message.parts if hasattr(p.root, 'text'))):
-                 logger.debug(f"Skipping dispatch for status update: {event_data.status.state} without specific message content.")
+                 logger.debug("Skipping dispatch for status update: %s without specific message content.", event_data.status.state)
                  return # Don't dispatch simple status changes without text
             else: # Create a message for other states if no explicit message
-                logger.debug(f"Creating message for task status: {event_data.status.state} without explicit message content.")
+                logger.debug("Creating message for task status: %s without explicit message content.", event_data.status.state)
                 content_message = Message(
                     parts=[Part(root=TextPart(text=f"Task status: {str(event_data.status.state)}"))], # type: ignore
                     role=Role.agent,
@@ -470,7 +934,7 @@ class ActionA2A(Action):
                     taskId=task_id
                 )
             else:
-                logger.debug(f"Artifact update event for {event_data.artifact.name} has no text parts to dispatch immediately.")
+                logger.debug("Artifact update event for %s has no text parts to dispatch immediately.", event_data.artifact.name)
                 return # No text to dispatch from this artifact event
 
         elif isinstance(event_data, Task):
@@ -482,16 +946,40 @@ class ActionA2A(Action):
                  pass # Artifacts handled by TaskArtifactUpdateEvent, or final task processing in run()
 
         if content_message and content_message.parts:
-            logger.debug(f"Dispatching content from event for task {task_id}: {content_message.model_dump_json(exclude_none=True)}")
+            self.tracer.trace(
+                "dispatch",
+                agent_card.name,
+                task_id=task_id,
+                parts=len(content_message.parts),
+                payload=lambda: content_message.model_dump(mode="json", exclude_none=True),
+            )
+            coalescer = self._coalescer()
+            # appended artifact chunks continue the previous text, anything else starts a new line
+            separator = "" if getattr(event_data, "append", False) else "\n"
             for part in content_message.parts:
                 if hasattr(part.root, "text") and part.root.text: # Check if text exists and is not empty
-                    self.dispatcher.utter_message(text=part.root.text)
+                    coalescer.add(task_id, part.root.text, separator=separator)
                 # You can add handling for other part kinds (data, file) here if needed,
                 # similar to your _send_response method.
                 elif part.root.kind == 'data' and hasattr(part.root, "data"):
                     instructions = part.root.data.get('instructions', '')
                     if instructions:
-                        self.dispatcher.utter_message(text=instructions)
+                        coalescer.add(task_id, instructions)
+
+        if reply_complete(event_data):
+            self._coalescer().flush(task_id)
+
+    def _coalescer(self) -> MessageCoalescer:
+        collector = _reply_collector.get()
+        if collector is not None:
+            return collector
+        session = self.session
+        if session.coalescer is None:
+            session.coalescer = MessageCoalescer(
+                emit=lambda text: session.dispatcher.utter_message(text=text),
+                **self.coalesce_config,
+            )
+        return session.coalescer
 
     def _log_event_internally(self, task_event_data: TaskCallbackArg, agent_card: AgentCard):
         """
@@ -598,7 +1086,139 @@ class ActionA2A(Action):
             )
 
     def add_event(self, event: Event):
-        self._events[event.id] = event
+        self._events.append(event)
+
+    def fan_out_agents(self, group: dict) -> list[str]:
+        """Loaded agents in a fan-out group: those listed by name plus those with a matching skill tag."""
+        names = [name for name in group.get("agents") or [] if name in self.agents]
+        tag = group.get("skill_tag")
+        if tag:
+            tag = tag.lower()
+            for name, connection in self.agents.items():
+                skills = connection.agent_card.skills or []
+                if name not in names and any(
+                    tag in (t.lower() for t in skill.tags or []) for skill in skills
+                ):
+                    names.append(name)
+        return names
+
+    async def _ask_agent(self, agent_name: str, text: str, session_id: str) -> dict[str, str]:
+        """Send one fan-out request, collecting the agent's reply text instead of dispatching it."""
+        replies: list[str] = []
+        collector = MessageCoalescer(emit=replies.append, **self.coalesce_config)
+        _reply_collector.set(collector)
+        try:
+            result = await self.agents[agent_name].send_message(
+                build_request(text, session_id), self.task_callback
+            )
+        except Exception as e:
+            logger.error(f"Fan-out request to {agent_name} failed: {str(e)}")
+            return {"status": "error", "text": str(e)}
+        collector.flush_all()
+        if isinstance(result, Message):
+            replies.extend(p.root.text for p in result.parts if getattr(p.root, "text", None))
+        return {"status": result_status(result), "text": "\n".join(replies)}
+
+    async def run_fan_out(self, dispatcher, group: dict, text: str, session_id: str):
+        """
+        Send the user message to every agent in a fan-out group at once.
+        - strategy "merge" waits for all agents until the deadline and sends every reply
+        - strategy "first" stops as soon as `first_n` agents replied successfully
+        Agents still running when the group is done or the deadline passes are cancelled.
+        """
+        agent_names = self.fan_out_agents(group)
+        if not agent_names:
+            logger.error(f"No loaded agents for fan-out group {group['name']}")
+            dispatcher.utter_message(text=f"No agents are available for {group['name']}. Try again later")
+            return [SlotSet("a2a_status", "error")]
+
+        deadline = float(group.get("deadline", DEFAULT_FAN_OUT_DEADLINE))
+        strategy = group.get("strategy", "merge")
+        first_n = int(group.get("first_n", 1))
+        logger.info(f"=== Fan-out to {agent_names}, strategy: {strategy}, deadline: {deadline}s ===")
+
+        requests = {
+            asyncio.create_task(self._ask_agent(name, text, session_id)): name
+            for name in agent_names
+        }
+        results: dict[str, dict[str, str]] = {}
+        winners: list[str] = []
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        pending = set(requests)
+        while pending and not (strategy == "first" and len(winners) >= first_n):
+            remaining = end - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for request in done:
+                name = requests[request]
+                results[name] = request.result()
+                if results[name]["status"] != "error":
+                    winners.append(name)
+
+        for request in pending:
+            request.cancel()
+            results[requests[request]] = {"status": "cancelled", "text": ""}
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.info(f"Cancelled slow fan-out agents: {[requests[r] for r in pending]}")
+
+        if strategy == "first":
+            winners = winners[:first_n]
+        for name in winners:
+            if results[name]["text"]:
+                prefix = f"{name}: " if len(winners) > 1 else ""
+                dispatcher.utter_message(text=f"{prefix}{results[name]['text']}")
+
+        status = "completed" if winners else "error"
+        if not winners:
+            dispatcher.utter_message(text=f"None of the agents in {group['name']} answered in time.")
+        return [
+            SlotSet("a2a_status", status),
+            SlotSet("a2a_fan_out_results", results),
+        ]
+
+    async def _forget_checkpoint(self, sender_id: str, agent_name: str) -> None:
+        key = (sender_id, agent_name)
+        if key not in self._checkpointed:
+            # nothing was checkpointed for this pair, skip the store round-trip
+            return
+        self._checkpointed.discard(key)
+        await asyncio.to_thread(self.checkpoints.delete, sender_id, agent_name)
+
+    async def resume_checkpoint(self, sender_id: str, agent_name: str, a2a_status: Optional[str]):
+        """The checkpointed task to continue, if the last turn with this agent asked for input."""
+        if self.checkpoints is None:
+            return None
+        if a2a_status != "input-required":
+            # a new request: never attach it to a task left open by an abandoned exchange
+            await self._forget_checkpoint(sender_id, agent_name)
+            return None
+        # store calls block (e.g. SQLite), keep them off the event loop
+        checkpoint = await asyncio.to_thread(self.checkpoints.get, sender_id, agent_name)
+        if checkpoint:
+            self._checkpointed.add((sender_id, agent_name))
+            logger.info(f"Resuming A2A task {checkpoint.task_id} of {agent_name} for {sender_id}")
+        return checkpoint
+
+    async def save_checkpoint(self, sender_id: str, agent_name: str, task: Task | Message | Any):
+        """Checkpoint a task waiting for user input, forget it once it is finished or failed."""
+        if self.checkpoints is None:
+            return
+        try:
+            if isinstance(task, Task) and task.status.state == TaskState.input_required:
+                self._checkpointed.add((sender_id, agent_name))
+                await asyncio.to_thread(
+                    self.checkpoints.put,
+                    TaskCheckpoint(sender_id, agent_name, task.id, task.contextId, task.status.state.value),
+                )
+            else:
+                await self._forget_checkpoint(sender_id, agent_name)
+        except Exception as e:
+            logger.error(f"Failed to checkpoint A2A task for {sender_id}, {agent_name}: {str(e)}")
 
     def _send_response(self, dispatcher, task):
         """Send back response parts as utterances"""
@@ -637,15 +1257,29 @@ class ActionA2A(Action):
                     #     dispatcher.utter_message(part.data["instructions"])
 
     async def run(self, dispatcher, tracker, domain):
+        """Execute A2A client action in the session of tracker.sender_id"""
+        session = self.sessions.acquire(tracker.sender_id)
+        token = _current_session.set(session)
+        try:
+            return await self._run(dispatcher, tracker, domain)
+        finally:
+            if session.coalescer is not None:
+                session.coalescer.flush_all()
+            _current_session.reset(token)
+            self.sessions.release(session)
+
+    async def _run(self, dispatcher, tracker, domain):
         events = []
-        """Execute A2A client action"""
         self.dispatcher = dispatcher # Store dispatcher for use in callbacks
-        await self.ensure_agents_loaded()
+        with profiling.span("card_load"):
+            await self.ensure_agents_loaded()
         agent_list = ""
         for agent in self.agents:
             logger.info(f"Agent: {agent}, card: {self.agents[agent].agent_card}")
             # append agent name to agent_list
             agent_list += f"{agent}, "
+        for group in self.fan_out_groups:
+            agent_list += f"{group}, "
         events.append(SlotSet("a2a_agents", agent_list.strip(", ")))
         current_message = tracker.latest_message
         session_id = tracker.sender_id
@@ -655,6 +1289,26 @@ class ActionA2A(Action):
         logger.debug(
             f"=== Agent name: {agent_name}, a2a_message slot: {a2a_message}, current_message: {current_message['text']} ==="
         )
+        if not agent_name or agent_name == self.auto_route_name:
+            decision = self.router.route(current_message["text"])
+            self.tracer.trace("routing", decision.agent or "", decision=decision.as_dict)
+            events.append(SlotSet("a2a_routing", decision.as_dict()))
+            if not decision.agent:
+                logger.info(f"No agent can handle the message, best score: {decision.score}")
+                dispatcher.utter_message(response="utter_no_a2a_agent")
+                return events + [SlotSet("a2a_status", "error")]
+            logger.info(f"Routed message to {decision.agent}, score: {decision.score}")
+            agent_name = decision.agent
+            events.append(SlotSet("a2a_agent_name", agent_name))
+
+        if agent_name in self.fan_out_groups:
+            events.extend(
+                await self.run_fan_out(
+                    dispatcher, self.fan_out_groups[agent_name], current_message["text"], session_id
+                )
+            )
+            return events
+
         if not agent_name or agent_name not in self.agents:
             logger.error(f"Invalid A2A agent specified: {agent_name}, agents:")
             for agent in self.agents:
@@ -662,34 +1316,24 @@ class ActionA2A(Action):
             dispatcher.utter_message(
                 text=f"Invalid A2A agent specified: {agent_name}. Available agents: {self.agents}. Try again later"
             )
-            return [SlotSet("a2a_status", "error")]
+            return events + [SlotSet("a2a_status", "error")]
 
         logger.info(
             f"=== Sending message to agent: {agent_name}, message: {current_message['text']}, session_id: {session_id} ==="
         )
 
-        request: MessageSendParams = MessageSendParams(
-            # id=str(uuid.uuid4()),
-            # referenceTaskIds=str(uuid.uuid4()),
-            message=Message(
-                role="user",
-                parts=[TextPart(text=current_message["text"])],
-                messageId=str(uuid.uuid4()),
-                sessionId=session_id,
-                # contextId=contextId,
-                # taskId=taskId,
-            ),
-            configuration=MessageSendConfiguration(
-                acceptedOutputModes=["text", "text/plain"],
-            ),
-        )
+        checkpoint = await self.resume_checkpoint(session_id, agent_name, tracker.get_slot("a2a_status"))
+        request = build_request(current_message["text"], session_id, checkpoint)
 
+        task = None
         try:
             connection = self.agents[agent_name]
-            logger.debug(f"=== Sending request: {request}")
+            logger.debug("=== Sending request: %s", request)
             # task = await connection.send_task(request, self.task_callback)
             task = await connection.send_message(request, self.task_callback)
-            logger.debug(f"=== Received task: {task}")
+            self._coalescer().flush_all()
+            await self.save_checkpoint(session_id, agent_name, task)
+            logger.debug("=== Received task: %s", task)
 
             if not task:
                 dispatcher.utter_message("Request encountered an error")
@@ -714,10 +1358,18 @@ class ActionA2A(Action):
                 events.append(SlotSet("a2a_status", "error"))
                 return events
 
+        except CircuitOpenError as e:
+            # keep the checkpoint, the task can still be resumed once the agent is back
+            logger.warning(f"{str(e)}, not sending the request")
+            events.append(SlotSet("a2a_status", "error"))
+            return events
         except Exception as e:
-            logger.error(f"Agent call failed: {str(e)}, {task.status.message}")
+            status_message = task.status.message if isinstance(task, Task) else None
+            logger.error(f"Agent call failed: {str(e)}, {status_message}")
+            # the remote task may be gone, start over on the next turn
+            await self.save_checkpoint(session_id, agent_name, None)
             dispatcher.utter_message(
-                text=f"Agent call failed: {str(e)}, {task.status.message}"
+                text=f"Agent call failed: {str(e)}, {status_message}"
             )
             events.append(SlotSet("a2a_status", "error"))
             return events
@@ -0,0 +1,112 @@
+"""On-disk cache of A2A agent cards.
+
+Cards are keyed by agent `base_url` and stored together with the `ETag` and
+`Cache-Control: max-age` the agent sent. On restart the last good card can be
+used straight away while a conditional request refreshes it in the background.
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+import httpx
+from a2a.types import AgentCard
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "orchestrator_demo", "a2a_cards.json")
+DEFAULT_MAX_AGE = 300.0
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CachedCard:
+    card: dict[str, Any]
+    fetched_at: float
+    max_age: float = DEFAULT_MAX_AGE
+    etag: Optional[str] = None
+
+    @property
+    def agent_card(self) -> AgentCard:
+        return AgentCard.model_validate(self.card)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return ((now or time.time()) - self.fetched_at) < self.max_age
+
+
+class CardCache:
+    """JSON file backed map of base_url -> `CachedCard`."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get("A2A_CARD_CACHE", DEFAULT_CACHE_PATH)
+        self._entries: dict[str, CachedCard] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+            self._entries = {url: CachedCard(**entry) for url, entry in data.items()}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable A2A card cache {self.path}: {e}")
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {url: asdict(entry) for url, entry in self._entries.items()}
+        # write to a temp file first so a crash never leaves a truncated cache behind
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, self.path)
+
+    def get(self, base_url: str) -> Optional[CachedCard]:
+        return self._entries.get(base_url)
+
+    def put(self, base_url: str, entry: CachedCard) -> None:
+        self._entries[base_url] = entry
+        try:
+            self._save()
+        except OSError as e:
+            logger.warning(f"Failed to write A2A card cache {self.path}: {e}")
+
+
+def _max_age(response: httpx.Response) -> float:
+    match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+    return float(match.group(1)) if match else DEFAULT_MAX_AGE
+
+
+async def fetch_card(
+    client: httpx.AsyncClient,
+    base_url: str,
+    agent_card_path: str,
+    cached: Optional[CachedCard] = None,
+    http_kwargs: Optional[dict[str, Any]] = None,
+) -> CachedCard:
+    """Fetch an agent card, revalidating `cached` with If-None-Match when possible."""
+    url = f"{base_url.rstrip('/')}/{agent_card_path.lstrip('/')}"
+    headers = {}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    response = await client.get(url, headers=headers, **(http_kwargs or {}))
+    if response.status_code == 304 and cached:
+        return CachedCard(
+            card=cached.card,
+            fetched_at=time.time(),
+            max_age=_max_age(response),
+            etag=response.headers.get("etag", cached.etag),
+        )
+    response.raise_for_status()
+    card = AgentCard.model_validate(response.json())
+    return CachedCard(
+        card=card.model_dump(mode="json", exclude_none=True),
+        fetched_at=time.time(),
+        max_age=_max_age(response),
+        etag=response.headers.get("etag"),
+    )
@@ -0,0 +1,185 @@
+"""Persistent checkpoints of open A2A tasks.
+
+When a remote agent answers with `input-required`, the task and context ids
+are checkpointed per (sender_id, agent). On the user's next turn the message
+is sent with those ids, so the agent continues the same task. This also works
+after an action server restart or on another replica sharing the store.
+
+`CheckpointStore` is the interface. `SQLiteCheckpointStore` (the default) keeps
+checkpoints in a local SQLite file and `InMemoryCheckpointStore` keeps them in
+the process. Another backend can be plugged in from `a2a.yml` with its dotted
+class path:
+
+    checkpoints:
+      store: mypackage.checkpoints.RedisCheckpointStore
+      ttl: 3600
+
+Store calls are blocking; the A2A action runs them in a worker thread.
+"""
+import importlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from actions.api import server_hooks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(
+    tempfile.gettempdir(), "orchestrator_demo", "a2a_checkpoints.db"
+)
+DEFAULT_CHECKPOINT_TTL = 3600.0
+
+
+@dataclass
+class TaskCheckpoint:
+    sender_id: str
+    agent_name: str
+    task_id: str
+    context_id: Optional[str] = None
+    state: Optional[str] = None
+    updated: float = 0.0
+
+
+class CheckpointStore(ABC):
+    """Base class for checkpoint stores; checkpoints older than `ttl` seconds are ignored."""
+
+    def __init__(self, ttl: float = DEFAULT_CHECKPOINT_TTL, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self._clock = clock
+
+    def get(self, sender_id: str, agent_name: str) -> Optional[TaskCheckpoint]:
+        checkpoint = self._get(sender_id, agent_name)
+        if checkpoint is not None and checkpoint.updated < self._clock() - self.ttl:
+            self.delete(sender_id, agent_name)
+            return None
+        return checkpoint
+
+    def put(self, checkpoint: TaskCheckpoint) -> None:
+        checkpoint.updated = self._clock()
+        self._put(checkpoint)
+
+    @abstractmethod
+    def delete(self, sender_id: str, agent_name: str) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def _get(self, sender_id: str, agent_name: str) -> Optional[TaskCheckpoint]:
+        ...
+
+    @abstractmethod
+    def _put(self, checkpoint: TaskCheckpoint) -> None:
+        ...
+
+
+class InMemoryCheckpointStore(CheckpointStore):
+    def __init__(self, ttl: float = DEFAULT_CHECKPOINT_TTL, clock: Callable[[], float] = time.time):
+        super().__init__(ttl, clock)
+        self._checkpoints: dict[tuple[str, str], TaskCheckpoint] = {}
+
+    def delete(self, sender_id: str, agent_name: str) -> None:
+        self._checkpoints.pop((sender_id, agent_name), None)
+
+    def _get(self, sender_id: str, agent_name: str) -> Optional[TaskCheckpoint]:
+        return self._checkpoints.get((sender_id, agent_name))
+
+    def _put(self, checkpoint: TaskCheckpoint) -> None:
+        self._checkpoints[(checkpoint.sender_id, checkpoint.agent_name)] = checkpoint
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Checkpoints in a local SQLite file, shared by every process that opens the same path."""
+
+    _open: list["SQLiteCheckpointStore"] = []
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_CHECKPOINT_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(ttl, clock)
+        self.path = path or os.environ.get("A2A_CHECKPOINT_DB", DEFAULT_CHECKPOINT_PATH)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # the connection is shared by the worker threads the store is called from
+        self._lock = threading.Lock()
+        # WAL lets several action server processes read while one writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS a2a_task_checkpoints (
+                sender_id TEXT NOT NULL,
+                agent_name TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                context_id TEXT,
+                state TEXT,
+                updated REAL NOT NULL,
+                PRIMARY KEY (sender_id, agent_name)
+            )"""
+        )
+        self._open.append(self)
+
+    def delete(self, sender_id: str, agent_name: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM a2a_task_checkpoints WHERE sender_id = ? AND agent_name = ?",
+                (sender_id, agent_name),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+        if self in self._open:
+            self._open.remove(self)
+
+    def _get(self, sender_id: str, agent_name: str) -> Optional[TaskCheckpoint]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sender_id, agent_name, task_id, context_id, state, updated "
+                "FROM a2a_task_checkpoints WHERE sender_id = ? AND agent_name = ?",
+                (sender_id, agent_name),
+            ).fetchone()
+        return TaskCheckpoint(*row) if row else None
+
+    def _put(self, checkpoint: TaskCheckpoint) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO a2a_task_checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    checkpoint.sender_id,
+                    checkpoint.agent_name,
+                    checkpoint.task_id,
+                    checkpoint.context_id,
+                    checkpoint.state,
+                    checkpoint.updated,
+                ),
+            )
+
+
+@server_hooks.on_shutdown
+async def close_checkpoint_stores() -> None:
+    for store in list(SQLiteCheckpointStore._open):
+        store.close()
+
+
+def create_checkpoint_store(config: dict) -> CheckpointStore:
+    """Build the store configured under `checkpoints` in a2a.yml."""
+    store = config.get("store", "sqlite")
+    ttl = float(config.get("ttl", DEFAULT_CHECKPOINT_TTL))
+    if store == "sqlite":
+        return SQLiteCheckpointStore(config.get("path"), ttl=ttl)
+    if store == "memory":
+        return InMemoryCheckpointStore(ttl=ttl)
+    module_name, _, class_name = store.rpartition(".")
+    store_class = getattr(importlib.import_module(module_name), class_name)
+    options = {k: v for k, v in config.items() if k not in ("store", "ttl")}
+    return store_class(ttl=ttl, **options)
@@ -0,0 +1,160 @@
+"""Health tracking and background refresh scheduling for A2A agents.
+
+`AgentHealthTracker` turns the outcome of each agent card poll into a
+healthy / degraded / down state. `JitteredScheduler` runs a coroutine on a
+randomised interval so that several action server replicas do not poll the
+same agents in lock step. Running schedulers are stopped when the action
+server shuts down.
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+from actions.api import server_hooks
+
+logger = logging.getLogger(__name__)
+
+
+class AgentHealth(str, Enum):
+    healthy = "healthy"
+    degraded = "degraded"
+    down = "down"
+
+
+@dataclass
+class AgentHealthState:
+    # not confirmed until the first poll completes
+    status: AgentHealth = AgentHealth.degraded
+    consecutive_failures: int = 0
+    last_checked: Optional[float] = None
+    last_ok: Optional[float] = None
+    last_latency: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class AgentHealthTracker:
+    """Keeps an `AgentHealthState` per agent name.
+
+    An agent is `healthy` when its last poll succeeded within
+    `degraded_latency` seconds, `degraded` when the poll was slow or has failed
+    fewer than `failure_threshold` times in a row, and `down` after that.
+    """
+
+    def __init__(self, degraded_latency: float = 2.0, failure_threshold: int = 3):
+        self.degraded_latency = degraded_latency
+        self.failure_threshold = failure_threshold
+        self._states: dict[str, AgentHealthState] = {}
+
+    def get(self, agent_name: str) -> AgentHealthState:
+        return self._states.setdefault(agent_name, AgentHealthState())
+
+    def status(self, agent_name: str) -> AgentHealth:
+        return self.get(agent_name).status
+
+    def record_success(self, agent_name: str, latency: float) -> AgentHealthState:
+        state = self.get(agent_name)
+        previous = state.status
+        state.consecutive_failures = 0
+        state.last_checked = state.last_ok = time.time()
+        state.last_latency = latency
+        state.last_error = None
+        state.status = AgentHealth.degraded if latency > self.degraded_latency else AgentHealth.healthy
+        self._log_transition(agent_name, previous, state)
+        return state
+
+    def record_failure(self, agent_name: str, error: str) -> AgentHealthState:
+        state = self.get(agent_name)
+        previous = state.status
+        state.consecutive_failures += 1
+        state.last_checked = time.time()
+        state.last_error = error
+        if state.consecutive_failures >= self.failure_threshold or state.last_ok is None:
+            state.status = AgentHealth.down
+        else:
+            state.status = AgentHealth.degraded
+        self._log_transition(agent_name, previous, state)
+        return state
+
+    def forget(self, agent_name: str) -> None:
+        self._states.pop(agent_name, None)
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            name: {
+                "status": state.status.value,
+                "consecutive_failures": state.consecutive_failures,
+                "last_checked": state.last_checked,
+                "last_ok": state.last_ok,
+                "last_latency": state.last_latency,
+                "last_error": state.last_error,
+            }
+            for name, state in self._states.items()
+        }
+
+    @staticmethod
+    def _log_transition(agent_name: str, previous: AgentHealth, state: AgentHealthState):
+        if previous != state.status:
+            logger.info(f"A2A agent {agent_name} is now {state.status.value} (was {previous.value})")
+
+
+class JitteredScheduler:
+    """Runs `callback` forever, sleeping `interval` +/- `jitter` (a fraction) between runs."""
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        callback: Callable[[], Awaitable[None]],
+        jitter: float = 0.2,
+    ):
+        self.name = name
+        self.interval = interval
+        self.jitter = jitter
+        self.callback = callback
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def next_delay(self) -> float:
+        return max(0.0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def start(self) -> None:
+        if self.running or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run(), name=self.name)
+        _schedulers.add(self)
+        logger.info(f"Started scheduler {self.name}, interval {self.interval}s")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.next_delay())
+            try:
+                await self.callback()
+            except Exception as e:
+                logger.error(f"Scheduler {self.name} run failed: {e}")
+
+    async def stop(self) -> None:
+        _schedulers.discard(self)
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+_schedulers: set[JitteredScheduler] = set()
+
+
+@server_hooks.on_shutdown
+async def stop_schedulers() -> None:
+    for scheduler in list(_schedulers):
+        await scheduler.stop()
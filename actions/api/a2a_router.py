@@ -0,0 +1,240 @@
+"""Skill-based routing of user messages to A2A agents.
+
+`SkillRouter` indexes every loaded `AgentCard`: the card's name and
+description and each skill's name, description, tags and examples are
+tokenised into an inverted index of token -> {agent: weight}. Routing a
+message only touches the postings of its own tokens, so picking an agent takes
+microseconds and needs no LLM call.
+
+Scores are IDF weighted and normalised by the best score each query token
+could reach, so they fall in [0, 1] and `min_score` has the same meaning
+whatever the message length. When an `embed` function is given (for example a
+local sentence-transformers model) the router also keeps one unit vector per
+agent and blends cosine similarity into the score with `embedding_weight`.
+
+Every decision, with the score of each candidate, is kept in `decisions` for
+tuning the field weights and threshold.
+"""
+import logging
+import math
+import re
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+from a2a.types import AgentCard
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SCORE = 0.2
+DEFAULT_EMBEDDING_WEIGHT = 0.5
+
+# weight of a token by the card field it came from
+FIELD_WEIGHTS = {
+    "agent_name": 3.0,
+    "skill_name": 3.0,
+    "tag": 3.0,
+    "example": 2.0,
+    "skill_description": 1.0,
+    "agent_description": 1.0,
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can could do does for from get give have how i if in is it "
+    "me my of on or please should so that the this to what when where which who will with "
+    "would you your".split()
+)
+
+Embed = Callable[[Sequence[str]], np.ndarray]
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        # cheap plural folding so "rates" matches "rate"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _card_fields(card: AgentCard) -> list[tuple[str, str]]:
+    fields = [("agent_name", card.name or ""), ("agent_description", card.description or "")]
+    for skill in card.skills or []:
+        fields.append(("skill_name", skill.name or ""))
+        fields.append(("skill_description", skill.description or ""))
+        fields.extend(("tag", tag) for tag in skill.tags or [])
+        fields.extend(("example", example) for example in skill.examples or [])
+    return fields
+
+
+def _modes(card: AgentCard, attr: str) -> set[str]:
+    modes = set(getattr(card, f"default{attr}") or [])
+    for skill in card.skills or []:
+        modes.update(getattr(skill, attr[0].lower() + attr[1:]) or [])
+    return modes
+
+
+def _accepts(modes: set[str], mode: Optional[str]) -> bool:
+    if mode is None or not modes:
+        return True
+    # "text" and "text/plain" are used interchangeably by agents
+    family = mode.split("/")[0]
+    return any(m == mode or m.split("/")[0] == family for m in modes)
+
+
+@dataclass
+class RoutingDecision:
+    text: str
+    agent: Optional[str]
+    score: float
+    scores: dict[str, float] = field(default_factory=dict)
+    method: str = "keyword"
+    elapsed_us: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class SkillRouter:
+    def __init__(
+        self,
+        min_score: float = DEFAULT_MIN_SCORE,
+        embed: Optional[Embed] = None,
+        embedding_weight: float = DEFAULT_EMBEDDING_WEIGHT,
+        history: int = 100,
+    ):
+        self.min_score = min_score
+        self.embed = embed
+        self.embedding_weight = embedding_weight
+        self.decisions: deque[RoutingDecision] = deque(maxlen=history)
+        self._postings: dict[str, dict[str, float]] = {}
+        self._idf: dict[str, float] = {}
+        self._best: dict[str, float] = {}
+        self._input_modes: dict[str, set[str]] = {}
+        self._output_modes: dict[str, set[str]] = {}
+        self._agents: list[str] = []
+        self._vectors: Optional[np.ndarray] = None
+
+    @property
+    def agents(self) -> list[str]:
+        return list(self._agents)
+
+    def build(self, cards: dict[str, AgentCard]) -> None:
+        """Rebuild the index from the cards of all loaded agents, keyed by agent name."""
+        postings: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        documents = {}
+        self._input_modes, self._output_modes = {}, {}
+        for name, card in cards.items():
+            fields = _card_fields(card)
+            documents[name] = " ".join(text for _, text in fields)
+            for field_name, text in [("agent_name", name)] + fields:
+                for token in tokenize(text):
+                    postings[token][name] += FIELD_WEIGHTS[field_name]
+            self._input_modes[name] = _modes(card, "InputModes")
+            self._output_modes[name] = _modes(card, "OutputModes")
+
+        count = len(cards)
+        self._postings = {token: dict(agents) for token, agents in postings.items()}
+        self._idf = {
+            token: math.log(1 + count / len(agents)) for token, agents in self._postings.items()
+        }
+        # repeated mentions help, with diminishing returns
+        self._best = {
+            token: self._idf[token] * math.log1p(max(agents.values()))
+            for token, agents in self._postings.items()
+        }
+        self._agents = list(cards)
+        self._vectors = None
+        if self.embed is not None and cards:
+            try:
+                self._vectors = _normalise(self.embed([documents[name] for name in self._agents]))
+            except Exception as e:
+                logger.warning(f"Failed to build A2A routing embeddings, using keywords only: {e}")
+        logger.debug(f"Built A2A routing index: {count} agents, {len(self._postings)} tokens")
+
+    def keyword_scores(self, text: str) -> dict[str, float]:
+        tokens = [token for token in set(tokenize(text)) if token in self._postings]
+        best = sum(self._best[token] for token in tokens)
+        if not best:
+            return {}
+        scores: dict[str, float] = defaultdict(float)
+        for token in tokens:
+            idf = self._idf[token]
+            for agent, weight in self._postings[token].items():
+                scores[agent] += idf * math.log1p(weight)
+        return {agent: score / best for agent, score in scores.items()}
+
+    def embedding_scores(self, text: str) -> dict[str, float]:
+        if self._vectors is None:
+            return {}
+        try:
+            query = _normalise(self.embed([text]))[0]
+        except Exception as e:
+            logger.warning(f"Failed to embed message for A2A routing: {e}")
+            return {}
+        similarities = self._vectors @ query
+        return {agent: max(0.0, float(s)) for agent, s in zip(self._agents, similarities)}
+
+    def route(
+        self,
+        text: str,
+        input_mode: Optional[str] = "text",
+        output_mode: Optional[str] = None,
+    ) -> RoutingDecision:
+        """Pick the best agent for `text`; `agent` is None when no score reaches `min_score`."""
+        started = time.perf_counter()
+        scores = self.keyword_scores(text)
+        method = "keyword"
+        similarities = self.embedding_scores(text)
+        if similarities:
+            method = "hybrid"
+            w = self.embedding_weight
+            scores = {
+                agent: (1 - w) * scores.get(agent, 0.0) + w * similarities.get(agent, 0.0)
+                for agent in self._agents
+            }
+        scores = {
+            agent: round(score, 4)
+            for agent, score in scores.items()
+            if _accepts(self._input_modes.get(agent, set()), input_mode)
+            and _accepts(self._output_modes.get(agent, set()), output_mode)
+        }
+        agent, score = max(scores.items(), key=lambda item: item[1], default=(None, 0.0))
+        if score < self.min_score:
+            agent = None
+        decision = RoutingDecision(
+            text=text,
+            agent=agent,
+            score=score,
+            scores=dict(sorted(scores.items(), key=lambda item: -item[1])),
+            method=method,
+            elapsed_us=round((time.perf_counter() - started) * 1e6, 1),
+        )
+        self.decisions.append(decision)
+        logger.debug(f"A2A routing decision: {decision}")
+        return decision
+
+
+def _normalise(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def sentence_transformer_embed(
+    model_name: str, fallback: str = "A2A routing uses keywords only"
+) -> Optional[Embed]:
+    """Embedding function backed by a local sentence-transformers model, if it is installed."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning(f"sentence-transformers is not installed, {fallback} (model {model_name})")
+        return None
+    model = SentenceTransformer(model_name)
+    return lambda texts: model.encode(list(texts))
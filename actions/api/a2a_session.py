@@ -0,0 +1,190 @@
+"""Per-conversation A2A state.
+
+rasa_sdk creates one `ActionA2A` instance and shares it between every
+conversation, so anything tied to a conversation (dispatcher, tasks, events,
+partial artifacts) lives in an `A2ASession` keyed by `tracker.sender_id`.
+`SessionStore` evicts sessions that have been idle for `ttl` seconds, keeps at
+most `max_sessions` of them (least recently used go first) and enforces a cap
+on the estimated memory held by all sessions together.
+"""
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from a2a.types import Artifact, Message, Task
+
+from actions.api.a2a_task_store import TaskStore
+from actions.api.artifact_assembler import (
+    DEFAULT_MAX_BYTES as DEFAULT_ARTIFACT_MAX_BYTES,
+    DEFAULT_TIMEOUT as DEFAULT_ARTIFACT_TIMEOUT,
+    ArtifactAssembler,
+)
+from actions.api.event_log import DEFAULT_EVENT_LOG_CAPACITY, EventLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_SESSION_TTL = 1800.0
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# rough per-object overhead of the pydantic models, on top of their text payload
+_OBJECT_OVERHEAD = 512
+
+
+def _parts_size(parts) -> int:
+    size = 0
+    for part in parts or []:
+        root = getattr(part, "root", part)
+        text = getattr(root, "text", None)
+        if text:
+            size += len(text)
+        data = getattr(root, "data", None)
+        if data:
+            size += len(str(data))
+        file = getattr(root, "file", None)
+        if file is not None:
+            size += len(getattr(file, "bytes", None) or "")
+    return size + _OBJECT_OVERHEAD
+
+
+def estimate_size(obj: Any) -> int:
+    """Cheap estimate of the memory held by an A2A message, artifact or task."""
+    if isinstance(obj, (Message, Artifact)):
+        return _parts_size(obj.parts)
+    if isinstance(obj, Task):
+        size = _OBJECT_OVERHEAD
+        size += sum(estimate_size(m) for m in obj.history or [])
+        size += sum(estimate_size(a) for a in obj.artifacts or [])
+        if obj.status.message:
+            size += estimate_size(obj.status.message)
+        return size
+    content = getattr(obj, "content", None)
+    if content is not None:
+        return estimate_size(content)
+    return _OBJECT_OVERHEAD
+
+
+@dataclass
+class A2ASession:
+    sender_id: str
+    dispatcher: Any = None
+    # buffers streamed text per task before it is sent with the dispatcher
+    coalescer: Any = None
+    tasks: TaskStore = field(default_factory=TaskStore)
+    task_map: dict[str, str] = field(default_factory=dict)
+    events: EventLog = field(default_factory=EventLog)
+    artifacts: ArtifactAssembler = field(default_factory=ArtifactAssembler)
+    next_id: dict[str, str] = field(default_factory=dict)
+    last_used: float = 0.0
+    size: int = 0
+
+    def estimate_size(self) -> int:
+        size = _OBJECT_OVERHEAD
+        size += sum(estimate_size(task) for task in self.tasks)
+        size += sum(estimate_size(event) for event in self.events)
+        size += self.artifacts.size
+        size += 128 * (len(self.task_map) + len(self.next_id))
+        return size
+
+
+class SessionStore:
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        ttl: float = DEFAULT_SESSION_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        event_log_capacity: int = DEFAULT_EVENT_LOG_CAPACITY,
+        event_spill_path: Optional[str] = None,
+        artifact_max_bytes: int = DEFAULT_ARTIFACT_MAX_BYTES,
+        artifact_timeout: float = DEFAULT_ARTIFACT_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.event_log_capacity = event_log_capacity
+        self.event_spill_path = event_spill_path
+        self.artifact_max_bytes = artifact_max_bytes
+        self.artifact_timeout = artifact_timeout
+        self._clock = clock
+        self._sessions: OrderedDict[str, A2ASession] = OrderedDict()
+        self._total_bytes = 0
+        # sessions currently inside run(), never evicted
+        self._active: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, sender_id: str) -> bool:
+        return sender_id in self._sessions
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, sender_id: str) -> A2ASession:
+        session = self._sessions.get(sender_id)
+        if session is None:
+            session = A2ASession(
+                sender_id=sender_id,
+                events=EventLog(self.event_log_capacity, self.event_spill_path, sender_id),
+                artifacts=ArtifactAssembler(self.artifact_max_bytes, self.artifact_timeout),
+            )
+            self._sessions[sender_id] = session
+        session.last_used = self._clock()
+        self._sessions.move_to_end(sender_id)
+        return session
+
+    def acquire(self, sender_id: str) -> A2ASession:
+        """Get the session for a run() call and protect it from eviction until `release`."""
+        self._active[sender_id] = self._active.get(sender_id, 0) + 1
+        return self.get(sender_id)
+
+    def release(self, session: A2ASession) -> None:
+        count = self._active.get(session.sender_id, 1) - 1
+        if count > 0:
+            # another run() of this conversation is still using the dispatcher and coalescer
+            self._active[session.sender_id] = count
+            return
+        self._active.pop(session.sender_id, None)
+        session.dispatcher = None
+        session.coalescer = None
+        session.tasks.evict_expired()
+        session.artifacts.expire()
+        new_size = session.estimate_size()
+        if session.sender_id in self._sessions:
+            self._total_bytes += new_size - session.size
+        session.size = new_size
+        self.evict()
+
+    def remove(self, sender_id: str) -> None:
+        session = self._sessions.pop(sender_id, None)
+        if session is not None:
+            self._total_bytes -= session.size
+            session.artifacts.clear()
+
+    def evict(self) -> int:
+        """Drop expired sessions, then least recently used ones until under both limits."""
+        deadline = self._clock() - self.ttl
+        victims = []
+        sessions = len(self._sessions)
+        total_bytes = self._total_bytes
+        # sessions are kept in least recently used order, so only the head needs checking
+        for sender_id, session in self._sessions.items():
+            expired = session.last_used <= deadline
+            if not expired and sessions <= self.max_sessions and total_bytes <= self.max_bytes:
+                break
+            if sender_id not in self._active:
+                victims.append(sender_id)
+                sessions -= 1
+                total_bytes -= session.size
+        for sender_id in victims:
+            self.remove(sender_id)
+        evicted = len(victims)
+        if evicted:
+            logger.debug(
+                f"Evicted {evicted} A2A sessions, {len(self._sessions)} left, ~{self._total_bytes} bytes"
+            )
+        return evicted
@@ -0,0 +1,105 @@
+"""Indexed in-memory store for A2A tasks.
+
+Tasks are indexed by task id and by context id, and each task keeps the set
+of message ids already in its history, so every streamed event is handled in
+O(1). Entries that have not been touched for `ttl` seconds are evicted.
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Iterator, Optional
+
+from a2a.types import Message, Task
+
+DEFAULT_TASK_TTL = 3600.0
+
+
+def get_message_id(m: Message | None) -> str | None:
+    if not m or not m.metadata or "message_id" not in m.metadata:
+        return None
+    return m.metadata["message_id"]
+
+
+class TaskStore:
+    def __init__(self, ttl: float = DEFAULT_TASK_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        # task id -> (task, last touched); kept in touch order so eviction only looks at the head
+        self._tasks: OrderedDict[str, tuple[Task, float]] = OrderedDict()
+        self._by_context: dict[str, set[str]] = {}
+        self._message_ids: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    def __iter__(self) -> Iterator[Task]:
+        return (task for task, _ in self._tasks.values())
+
+    def get(self, task_id: str) -> Optional[Task]:
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return None
+        self._touch(task_id, entry[0])
+        return entry[0]
+
+    def put(self, task: Task) -> None:
+        """Add or replace a task, indexing its context id and message history."""
+        self.evict_expired()
+        previous = self._tasks.get(task.id)
+        if previous is None or previous[0] is not task:
+            self.index_history(task)
+        if previous is not None and previous[0].contextId != task.contextId:
+            self._unlink_context(task.id, previous[0].contextId)
+        if task.contextId:
+            self._by_context.setdefault(task.contextId, set()).add(task.id)
+        self._touch(task.id, task)
+
+    def by_context(self, context_id: str) -> list[Task]:
+        return [self._tasks[task_id][0] for task_id in self._by_context.get(context_id, ())]
+
+    def index_history(self, task: Task) -> None:
+        """Rebuild the message id set from `task.history`, e.g. after it was replaced."""
+        self._message_ids[task.id] = {
+            message_id
+            for message_id in (get_message_id(m) for m in task.history or [])
+            if message_id
+        }
+
+    def has_message(self, task_id: str, message_id: str | None) -> bool:
+        return message_id in self._message_ids.get(task_id, ())
+
+    def add_message_id(self, task_id: str, message_id: str | None) -> None:
+        if message_id:
+            self._message_ids.setdefault(task_id, set()).add(message_id)
+
+    def remove(self, task_id: str) -> None:
+        entry = self._tasks.pop(task_id, None)
+        self._message_ids.pop(task_id, None)
+        if entry is not None:
+            self._unlink_context(task_id, entry[0].contextId)
+
+    def evict_expired(self) -> int:
+        deadline = self._clock() - self.ttl
+        evicted = 0
+        while self._tasks:
+            task_id, (_, touched) = next(iter(self._tasks.items()))
+            if touched > deadline:
+                break
+            self.remove(task_id)
+            evicted += 1
+        return evicted
+
+    def _touch(self, task_id: str, task: Task) -> None:
+        self._tasks[task_id] = (task, self._clock())
+        self._tasks.move_to_end(task_id)
+
+    def _unlink_context(self, task_id: str, context_id: str | None) -> None:
+        if not context_id:
+            return
+        task_ids = self._by_context.get(context_id)
+        if task_ids is not None:
+            task_ids.discard(task_id)
+            if not task_ids:
+                del self._by_context[context_id]
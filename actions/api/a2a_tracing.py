@@ -0,0 +1,70 @@
+"""Structured, lazily evaluated tracing of streamed A2A events.
+
+The streaming path calls `A2ATracer.trace()` for every event. Nothing is
+formatted or serialised unless the record will actually be written: either
+the `actions.api.a2a_tracing` logger is enabled for DEBUG or a JSON-lines sink
+is configured, and the event type passes its sample rate. Field values that
+are callables are only called at that point, so expensive dumps can be passed
+as `lambda: model.model_dump(...)`. The `payload` field is additionally
+dropped unless full payload tracing is enabled for that agent in `a2a.yml`:
+
+    tracing:
+      sink_path: logs/a2a_trace.jsonl
+      sample_rates:
+        status_update: 0.1
+    remote_agents:
+      - name: "Reimbursement Agent"
+        trace_payloads: true
+"""
+import logging
+import random
+import time
+from typing import Any, Optional
+
+from actions.api.event_log import JsonlFile
+
+logger = logging.getLogger(__name__)
+
+
+class A2ATracer:
+    def __init__(
+        self,
+        sink_path: Optional[str] = None,
+        sample_rates: Optional[dict[str, float]] = None,
+        default_sample_rate: float = 1.0,
+        payload_agents: Optional[set[str]] = None,
+    ):
+        self.sink_path = sink_path
+        self.sample_rates = sample_rates or {}
+        self.default_sample_rate = default_sample_rate
+        self.payload_agents = payload_agents or set()
+
+    @classmethod
+    def from_config(cls, tracing_config: dict, agents: list[dict]) -> "A2ATracer":
+        return cls(
+            sink_path=tracing_config.get("sink_path"),
+            sample_rates={k: float(v) for k, v in (tracing_config.get("sample_rates") or {}).items()},
+            default_sample_rate=float(tracing_config.get("default_sample_rate", 1.0)),
+            payload_agents={agent["name"] for agent in agents if agent.get("trace_payloads")},
+        )
+
+    def enabled(self, event_type: str) -> bool:
+        if self.sink_path is None and not logger.isEnabledFor(logging.DEBUG):
+            return False
+        rate = self.sample_rates.get(event_type, self.default_sample_rate)
+        return rate >= 1.0 or random.random() < rate
+
+    def trace(self, event_type: str, agent_name: str, **fields: Any) -> None:
+        if not self.enabled(event_type):
+            return
+        record = {"ts": time.time(), "type": event_type, "agent": agent_name}
+        for key, value in fields.items():
+            if key == "payload" and agent_name not in self.payload_agents:
+                continue
+            record[key] = value() if callable(value) else value
+        if self.sink_path:
+            try:
+                JsonlFile.get(self.sink_path).write(record)
+            except Exception as e:
+                logger.warning(f"Failed to write A2A trace to {self.sink_path}: {e}")
+        logger.debug("%s", record)
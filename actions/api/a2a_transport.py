@@ -0,0 +1,238 @@
+"""Process-wide pooled HTTP transport for A2A remote agent connections.
+
+Every `RemoteAgentConnections` and every agent card fetch goes through the
+`A2ATransport` returned by `get_transport()`. Agents that share the same pool
+limits share one `httpx.AsyncClient`, so keep-alive connections and TLS
+sessions are reused across agents and across turns. Timeouts are applied per
+request, which lets each agent in `a2a.yml` carry its own connect/read timeout
+without needing its own pool.
+
+Per-agent settings in `a2a.yml` (all optional):
+
+    remote_agents:
+      - name: "Currency Agent"
+        base_url: http://localhost:10000
+        agent_card_path: /.well-known/agent.json
+        connect_timeout: 5
+        read_timeout: 30
+        max_connections: 20
+        max_keepalive_connections: 10
+        keepalive_expiry: 30
+"""
+import logging
+import time
+from dataclasses import dataclass, fields
+from typing import Any, Optional
+
+import httpx
+
+from actions.api import server_hooks
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class AgentTransportConfig:
+    """Transport settings for one remote agent, read from its `a2a.yml` entry."""
+
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+
+    @classmethod
+    def from_dict(cls, agent: dict[str, Any]) -> "AgentTransportConfig":
+        values = {f.name: agent[f.name] for f in fields(cls) if agent.get(f.name) is not None}
+        return cls(**values)
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def pool_key(self) -> tuple:
+        return (
+            self.max_connections,
+            self.max_keepalive_connections,
+            self.keepalive_expiry,
+            self.http2 and HTTP2_AVAILABLE,
+        )
+
+    @property
+    def http_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments passed to every `A2AClient` call for this agent."""
+        return {"timeout": self.timeout}
+
+
+@dataclass
+class PoolMetrics:
+    requests_total: int = 0
+    requests_in_flight: int = 0
+    connections_reused: int = 0
+    connections_opened: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+
+    def record_wait(self, wait_time: float, reused: bool) -> None:
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+        if reused:
+            self.connections_reused += 1
+        else:
+            self.connections_opened += 1
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, metrics: PoolMetrics):
+        self._stream = stream
+        self._metrics = metrics
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._metrics.requests_in_flight -= 1
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Wraps `httpx.AsyncHTTPTransport` and records pool usage.
+
+    Wait time is measured from the moment a request is handed to the pool until
+    httpcore reports the first trace event on a connection, i.e. either opening
+    a new TCP connection or writing headers on a reused one.
+    """
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+        self.metrics = PoolMetrics()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = self.metrics
+        started = time.perf_counter()
+        acquired = False
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal acquired
+            if not acquired and event_name.endswith(".started"):
+                acquired = True
+                reused = not event_name.startswith("connection.")
+                metrics.record_wait(time.perf_counter() - started, reused)
+            if outer_trace is not None:
+                await outer_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        metrics.requests_total += 1
+        metrics.requests_in_flight += 1
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            metrics.requests_in_flight -= 1
+            raise
+
+        # Streaming responses (SSE) keep the connection busy until the body is closed.
+        response.stream = _MeteredStream(response.stream, metrics)
+        return response
+
+    def pool_stats(self) -> dict[str, int]:
+        connections = self._transport._pool.connections
+        idle = sum(1 for c in connections if c.is_idle())
+        return {"connections": len(connections), "idle": idle, "active": len(connections) - idle}
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class A2ATransport:
+    """Owns the shared `httpx.AsyncClient` pools used for all A2A traffic."""
+
+    def __init__(self):
+        self._clients: dict[tuple, httpx.AsyncClient] = {}
+        self._transports: dict[tuple, MeteredTransport] = {}
+
+    def client_for(self, config: Optional[AgentTransportConfig] = None) -> httpx.AsyncClient:
+        config = config or AgentTransportConfig()
+        key = config.pool_key
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            http2 = config.http2 and HTTP2_AVAILABLE
+            if config.http2 and not HTTP2_AVAILABLE:
+                logger.warning("HTTP/2 requested for A2A transport but 'h2' is not installed, using HTTP/1.1")
+            transport = MeteredTransport(
+                httpx.AsyncHTTPTransport(http2=http2, limits=config.limits)
+            )
+            client = httpx.AsyncClient(transport=transport, timeout=config.timeout)
+            self._clients[key] = client
+            self._transports[key] = transport
+            logger.debug(f"Created A2A connection pool {key}")
+        return client
+
+    def metrics(self) -> list[dict[str, Any]]:
+        """Return per-pool usage: in-use/idle connections, requests and wait time."""
+        result = []
+        for key, transport in self._transports.items():
+            m = transport.metrics
+            waited = m.connections_reused + m.connections_opened
+            result.append(
+                {
+                    "pool": "max={}/keepalive={}/expiry={}/http2={}".format(*key),
+                    **transport.pool_stats(),
+                    "requests_total": m.requests_total,
+                    "requests_in_flight": m.requests_in_flight,
+                    "connections_opened": m.connections_opened,
+                    "connections_reused": m.connections_reused,
+                    "wait_time_avg": m.wait_time_total / waited if waited else 0.0,
+                    "wait_time_max": m.wait_time_max,
+                }
+            )
+        return result
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._transports.clear()
+        for client in clients:
+            await client.aclose()
+
+
+_transport: Optional[A2ATransport] = None
+
+
+def get_transport() -> A2ATransport:
+    global _transport
+    if _transport is None:
+        _transport = A2ATransport()
+    return _transport
+
+
+@server_hooks.on_shutdown
+async def close_transport() -> None:
+    global _transport
+    if _transport is not None:
+        logger.info("Closing A2A transport")
+        await _transport.aclose()
+        _transport = None
@@ -0,0 +1,204 @@
+"""Cache of final RAG answers, so repeated questions skip Kapa and the LLM.
+
+Lookups go through two levels, each namespaced per knowledge source:
+
+1. exact: the normalised question text (case, punctuation and whitespace
+   folded) maps straight to the cached answer.
+2. semantic: when an `embed` function is configured, the question vector is
+   compared by cosine similarity with the vectors of all cached questions of
+   the namespace. The closest one is a hit if it reaches `threshold`.
+
+Entries expire after `ttl` seconds, and each namespace keeps at most
+`max_entries`, evicting the least recently used. Question vectors live in one
+preallocated NumPy matrix per namespace, so a semantic lookup is a single
+matrix-vector product. Lookups are counted in `cache_requests_total` with
+cache="rag_answer" and result hit, semantic_hit or miss.
+"""
+import asyncio
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from actions.api import metrics
+from actions.api.a2a_router import Embed, sentence_transformer_embed
+from actions.api.search_cache import normalise_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL = 86400.0
+DEFAULT_THRESHOLD = 0.95
+
+RAG_ANSWER_CACHE_ENTRIES = metrics.gauge(
+    "rag_answer_cache_entries", "Answers held by the RAG answer cache", ["namespace"]
+)
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    answer: str
+    created: float
+    slot: int = -1
+
+
+class _Namespace:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, CachedAnswer] = OrderedDict()
+        self.vectors: Optional[np.ndarray] = None
+        self.created = np.zeros(max_entries, dtype=np.float64)
+        self.used = np.zeros(max_entries, dtype=bool)
+        self.keys: list[Optional[str]] = [None] * max_entries
+
+    def remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None and entry.slot >= 0:
+            self.used[entry.slot] = False
+            self.keys[entry.slot] = None
+
+    def free_slot(self) -> int:
+        free = np.flatnonzero(~self.used)
+        return int(free[0]) if len(free) else -1
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL,
+        threshold: float = DEFAULT_THRESHOLD,
+        embed: Optional[Embed] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.embed = embed
+        self._clock = clock
+        self._namespaces: dict[str, _Namespace] = {}
+        # weakly held, a replaced cache is not kept alive by the metrics registry
+        metrics.on_collect(weakref.WeakMethod(self.collect_metrics))
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["AnswerCache"]:
+        """Build the cache from the `answer_cache` section of rag.yml; None if it is disabled."""
+        if not config or not config.get("enabled", True):
+            return None
+        embed = None
+        if config.get("embedding_model"):
+            embed = sentence_transformer_embed(
+                config["embedding_model"], "the RAG answer cache matches exact questions only"
+            )
+        return cls(
+            max_entries=int(config.get("max_entries", DEFAULT_MAX_ENTRIES)),
+            ttl=float(config.get("ttl", DEFAULT_TTL)),
+            threshold=float(config.get("similarity_threshold", DEFAULT_THRESHOLD)),
+            embed=embed,
+        )
+
+    def _namespace(self, name: str) -> _Namespace:
+        namespace = self._namespaces.get(name)
+        if namespace is None:
+            namespace = self._namespaces[name] = _Namespace(self.max_entries)
+        return namespace
+
+    def _expired(self, entry: CachedAnswer, now: float) -> bool:
+        return now - entry.created >= self.ttl
+
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Unit vector of `query`, or None without an embedding function."""
+        if self.embed is None:
+            return None
+        try:
+            vector = np.asarray(self.embed([query]), dtype=np.float32)[0]
+        except Exception as e:
+            logger.warning(f"Failed to embed question for the RAG answer cache: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def get_exact(self, namespace: str, query: str) -> Optional[CachedAnswer]:
+        ns = self._namespace(namespace)
+        key = normalise_query(query)
+        entry = ns.entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry, self._clock()):
+            ns.remove(key)
+            return None
+        ns.entries.move_to_end(key)
+        return entry
+
+    def get_similar(self, namespace: str, vector: Optional[np.ndarray]) -> Optional[CachedAnswer]:
+        ns = self._namespace(namespace)
+        if vector is None or ns.vectors is None or not ns.entries:
+            return None
+        live = ns.used & (ns.created > self._clock() - self.ttl)
+        if not live.any():
+            return None
+        scores = np.where(live, ns.vectors @ vector, -1.0)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        key = ns.keys[best]
+        ns.entries.move_to_end(key)
+        return ns.entries[key]
+
+    async def lookup(self, namespace: str, query: str) -> tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Cached answer for `query`, or None. Also returns the question vector (if
+        one was computed) to pass on to `put` after a miss.
+        """
+        entry = self.get_exact(namespace, query)
+        if entry is not None:
+            metrics.record_cache("rag_answer", "hit")
+            return entry.answer, None
+        vector = None
+        if self.embed is not None:
+            # embedding models are CPU bound, keep them off the event loop
+            vector = await asyncio.to_thread(self.embed_query, query)
+            entry = self.get_similar(namespace, vector)
+            if entry is not None:
+                metrics.record_cache("rag_answer", "semantic_hit")
+                return entry.answer, vector
+        metrics.record_cache("rag_answer", "miss")
+        return None, vector
+
+    def put(self, namespace: str, query: str, answer: str, vector: Optional[np.ndarray] = None) -> None:
+        ns = self._namespace(namespace)
+        key = normalise_query(query)
+        if not key:
+            return
+        ns.remove(key)
+        while len(ns.entries) >= ns.max_entries:
+            ns.remove(next(iter(ns.entries)))
+        entry = CachedAnswer(query=query, answer=answer, created=self._clock())
+        if vector is not None:
+            if ns.vectors is None:
+                ns.vectors = np.zeros((ns.max_entries, len(vector)), dtype=np.float32)
+            slot = ns.free_slot()
+            ns.vectors[slot] = vector
+            ns.created[slot] = entry.created
+            ns.used[slot] = True
+            ns.keys[slot] = key
+            entry.slot = slot
+        ns.entries[key] = entry
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        if namespace is None:
+            self._namespaces.clear()
+        else:
+            self._namespaces.pop(namespace, None)
+
+    def __len__(self) -> int:
+        return sum(len(ns.entries) for ns in self._namespaces.values())
+
+    def collect_metrics(self) -> None:
+        for name, ns in self._namespaces.items():
+            RAG_ANSWER_CACHE_ENTRIES.set(len(ns.entries), namespace=name)
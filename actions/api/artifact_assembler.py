@@ -0,0 +1,241 @@
+"""Assembly of chunked A2A artifacts.
+
+Agents can stream a large artifact as a first chunk followed by `append`
+chunks until `lastChunk`. Instead of keeping every chunk's pydantic model
+alive and extending part lists, `ArtifactAssembler` writes each part into one
+growing buffer per artifactId: text is collected as strings and joined once,
+inline file bytes are decoded into a `SpooledTemporaryFile` that moves to disk
+past `spool_threshold`. Chunk boundaries need not fall on 4-character base64
+groups: the undecoded remainder of a chunk is kept for the next one.
+`finish()` builds a single `Artifact` from the buffers. Partial artifacts are
+dropped when they exceed `max_bytes`, have not received a chunk for `timeout`
+seconds, or carry file data that is not valid base64. The ids of dropped
+artifacts are remembered (up to `max_dropped` of them), so their remaining
+chunks are ignored and `finish()` returns None instead of a truncated artifact.
+"""
+import base64
+import binascii
+import logging
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from a2a.types import Artifact, FilePart, FileWithBytes, Part, TextPart
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_SPOOL_THRESHOLD = 1024 * 1024
+DEFAULT_MAX_DROPPED = 1000
+
+
+class ArtifactTooLarge(Exception):
+    """Raised when a chunked artifact grows past the assembler's byte budget."""
+
+
+@dataclass
+class _TextSegment:
+    chunks: list[str] = field(default_factory=list)
+
+    def to_part(self) -> Part:
+        return Part(root=TextPart(text="".join(self.chunks)))
+
+    def close(self) -> None:
+        pass
+
+
+def _decode_groups(data: str) -> bytes:
+    """Decode complete base64 groups, which may carry padding mid-string when chunks were encoded one by one."""
+    decoded = bytearray()
+    start = 0
+    while (pad := data.find("=", start)) != -1:
+        end = (pad // 4 + 1) * 4
+        decoded += base64.b64decode(data[start:end], validate=True)
+        start = end
+    decoded += base64.b64decode(data[start:], validate=True)
+    return bytes(decoded)
+
+
+@dataclass
+class _FileSegment:
+    spool: Any
+    name: Optional[str]
+    mime_type: Optional[str]
+    pending: str = ""
+
+    def write(self, data: str) -> int:
+        """Decode the complete base64 groups of `data`, keeping the rest for the next chunk."""
+        data = self.pending + "".join(data.split())
+        aligned = len(data) - len(data) % 4
+        self.pending = data[aligned:]
+        return self.spool.write(_decode_groups(data[:aligned]))
+
+    def to_part(self) -> Part:
+        if self.pending:
+            self.close()
+            raise binascii.Error(f"{len(self.pending)} base64 characters left after the last chunk")
+        self.spool.seek(0)
+        data = base64.b64encode(self.spool.read()).decode("ascii")
+        self.close()
+        return Part(root=FilePart(file=FileWithBytes(bytes=data, name=self.name, mimeType=self.mime_type)))
+
+    def close(self) -> None:
+        self.spool.close()
+
+
+@dataclass
+class _PartSegment:
+    part: Part
+
+    def to_part(self) -> Part:
+        return self.part
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class _Partial:
+    first_chunk: Artifact
+    segments: list = field(default_factory=list)
+    size: int = 0
+    updated: float = 0.0
+
+
+class ArtifactAssembler:
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        timeout: float = DEFAULT_TIMEOUT,
+        spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+        clock: Callable[[], float] = time.monotonic,
+        max_dropped: int = DEFAULT_MAX_DROPPED,
+    ):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.spool_threshold = spool_threshold
+        self.max_dropped = max_dropped
+        self._clock = clock
+        self._partials: dict[str, _Partial] = {}
+        self._dropped: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, artifact_id: str) -> bool:
+        return artifact_id in self._partials
+
+    def __len__(self) -> int:
+        return len(self._partials)
+
+    @property
+    def size(self) -> int:
+        """Bytes currently buffered across all partial artifacts."""
+        return sum(partial.size for partial in self._partials.values())
+
+    def dropped(self, artifact_id: str) -> bool:
+        """Whether the artifact was dropped and its remaining chunks are ignored."""
+        return artifact_id in self._dropped
+
+    def start(self, artifact: Artifact) -> None:
+        """Begin a new partial artifact from its first chunk."""
+        self.expire()
+        self.discard(artifact.artifactId)
+        # a new first chunk starts a new artifact, even under a dropped id
+        self._dropped.pop(artifact.artifactId, None)
+        # keep only the chunk's metadata, its parts go into the segment buffers
+        first_chunk = artifact.model_copy(update={"parts": []})
+        partial = self._partials[artifact.artifactId] = _Partial(first_chunk=first_chunk)
+        self._add_parts(partial, artifact, continuation=False)
+
+    def append(self, artifact: Artifact) -> None:
+        self.expire()
+        if artifact.artifactId in self._dropped:
+            return
+        partial = self._partials.get(artifact.artifactId)
+        if partial is None:
+            logger.warning(f"Received append chunk for unknown artifact {artifact.artifactId}, starting a new one")
+            self.start(artifact)
+            return
+        self._add_parts(partial, artifact, continuation=True)
+
+    def finish(self, artifact_id: str) -> Optional[Artifact]:
+        if artifact_id in self._dropped:
+            del self._dropped[artifact_id]
+            return None
+        partial = self._partials.pop(artifact_id, None)
+        if partial is None:
+            return None
+        try:
+            parts = [segment.to_part() for segment in partial.segments]
+        except binascii.Error as e:
+            logger.error(f"Dropping artifact {artifact_id}, its file data is not valid base64: {e}")
+            for segment in partial.segments:
+                segment.close()
+            return None
+        return partial.first_chunk.model_copy(update={"parts": parts})
+
+    def discard(self, artifact_id: str) -> None:
+        partial = self._partials.pop(artifact_id, None)
+        if partial is not None:
+            for segment in partial.segments:
+                segment.close()
+
+    def _drop(self, artifact_id: str) -> None:
+        self.discard(artifact_id)
+        self._dropped[artifact_id] = None
+        self._dropped.move_to_end(artifact_id)
+        while len(self._dropped) > self.max_dropped:
+            self._dropped.popitem(last=False)
+
+    def clear(self) -> None:
+        for artifact_id in list(self._partials):
+            self.discard(artifact_id)
+
+    def expire(self) -> list[str]:
+        deadline = self._clock() - self.timeout
+        expired = [aid for aid, partial in self._partials.items() if partial.updated < deadline]
+        for artifact_id in expired:
+            logger.warning(f"Dropping partial artifact {artifact_id}, no chunk for {self.timeout}s")
+            self._drop(artifact_id)
+        return expired
+
+    def _add_parts(self, partial: _Partial, artifact: Artifact, continuation: bool) -> None:
+        partial.updated = self._clock()
+        for i, part in enumerate(artifact.parts):
+            # only the first part of an append chunk continues the previous chunk's last part
+            last = partial.segments[-1] if partial.segments and continuation and i == 0 else None
+            root = part.root
+            if root.kind == "text":
+                if not isinstance(last, _TextSegment):
+                    last = _TextSegment()
+                    partial.segments.append(last)
+                last.chunks.append(root.text)
+                added = len(root.text)
+            elif root.kind == "file" and isinstance(root.file, FileWithBytes):
+                if not (
+                    isinstance(last, _FileSegment)
+                    and last.name == root.file.name
+                    and last.mime_type == root.file.mimeType
+                ):
+                    last = _FileSegment(
+                        spool=tempfile.SpooledTemporaryFile(max_size=self.spool_threshold),
+                        name=root.file.name,
+                        mime_type=root.file.mimeType,
+                    )
+                    partial.segments.append(last)
+                try:
+                    added = last.write(root.file.bytes)
+                except binascii.Error as e:
+                    logger.error(f"Dropping artifact {artifact.artifactId}, its file data is not valid base64: {e}")
+                    self._drop(artifact.artifactId)
+                    return
+            else:
+                partial.segments.append(_PartSegment(part))
+                added = len(part.model_dump_json())
+            partial.size += added
+            if partial.size > self.max_bytes:
+                self._drop(artifact.artifactId)
+                raise ArtifactTooLarge(
+                    f"Artifact {artifact.artifactId} exceeds {self.max_bytes} bytes, dropped"
+                )
@@ -0,0 +1,179 @@
+"""Per-agent circuit breaker with adaptive timeouts.
+
+Every A2A request reports its outcome and duration to the `CircuitBreaker` of
+its agent. The breaker is
+
+- `closed` while the agent behaves: requests go through,
+- `open` once the recent error rate, slow call rate or number of consecutive
+  failures crosses its threshold: requests fail immediately with
+  `CircuitOpenError` instead of waiting for a timeout,
+- `half_open` after `open_timeout` seconds: a few probe requests are let
+  through, their outcome closes or re-opens the circuit.
+
+The request timeout follows the agent: once `min_requests` calls have been
+seen it is the observed p99 (`percentile`) times `timeout_multiplier`, clamped
+to [`min_timeout`, `max_timeout`]. Until then `max_timeout` is used.
+"""
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while an agent's circuit is open."""
+
+
+@dataclass
+class _Outcome:
+    latency: float
+    ok: bool
+
+
+@dataclass
+class CircuitBreakerConfig:
+    window: int = 50
+    min_requests: int = 10
+    error_rate: float = 0.5
+    # calls slower than slow_call_latency count towards slow_call_rate
+    slow_call_latency: float = 20.0
+    slow_call_rate: float = 0.8
+    consecutive_failures: int = 3
+    open_timeout: float = 30.0
+    half_open_max_calls: int = 1
+    percentile: float = 0.99
+    timeout_multiplier: float = 1.5
+    min_timeout: float = 5.0
+    max_timeout: float = 60.0
+
+    @classmethod
+    def from_dict(cls, config: Optional[dict]) -> "CircuitBreakerConfig":
+        config = config or {}
+        return cls(**{
+            name: type(default)(config[name])
+            for name, default in cls().__dict__.items()
+            if name in config
+        })
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        config: Optional[CircuitBreakerConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.config = config or CircuitBreakerConfig()
+        self._clock = clock
+        self.state = CircuitState.closed
+        self._outcomes: deque[_Outcome] = deque(maxlen=self.config.window)
+        # successful call durations for the adaptive timeout, kept across state changes
+        self._latencies: deque[float] = deque(maxlen=self.config.window)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; counts a probe slot when half-open."""
+        if self.state == CircuitState.open:
+            if self._clock() - self._opened_at < self.config.open_timeout:
+                self.rejected += 1
+                return False
+            self._transition(CircuitState.half_open)
+        if self.state == CircuitState.half_open:
+            if self._probes >= self.config.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self._probes += 1
+        return True
+
+    def release(self) -> None:
+        """Give back a probe slot for a request that was cancelled without an outcome."""
+        if self.state == CircuitState.half_open and self._probes:
+            self._probes -= 1
+
+    def record_success(self, latency: float) -> None:
+        self._outcomes.append(_Outcome(latency, True))
+        self._latencies.append(latency)
+        self._consecutive_failures = 0
+        if self.state == CircuitState.half_open:
+            self._transition(CircuitState.closed)
+        elif self._should_open():
+            self._transition(CircuitState.open)
+
+    def record_failure(self, latency: float, error: Any = None) -> None:
+        self._outcomes.append(_Outcome(latency, False))
+        self._consecutive_failures += 1
+        logger.debug(f"A2A request to {self.name} failed after {latency:.2f}s: {error}")
+        if self.state == CircuitState.half_open or self._should_open():
+            self._transition(CircuitState.open)
+
+    def timeout(self) -> float:
+        latencies = sorted(self._latencies)
+        if len(latencies) < self.config.min_requests:
+            return self.config.max_timeout
+        index = min(len(latencies) - 1, math.ceil(self.config.percentile * len(latencies)) - 1)
+        adaptive = latencies[index] * self.config.timeout_multiplier
+        return min(self.config.max_timeout, max(self.config.min_timeout, adaptive))
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for o in self._outcomes if not o.ok) / len(self._outcomes)
+
+    @property
+    def slow_call_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        slow = self.config.slow_call_latency
+        return sum(1 for o in self._outcomes if o.latency >= slow) / len(self._outcomes)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "error_rate": round(self.error_rate, 3),
+            "slow_call_rate": round(self.slow_call_rate, 3),
+            "consecutive_failures": self._consecutive_failures,
+            "timeout": round(self.timeout(), 3),
+            "requests": len(self._outcomes),
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
+
+    def _should_open(self) -> bool:
+        if self._consecutive_failures >= self.config.consecutive_failures:
+            return True
+        if len(self._outcomes) < self.config.min_requests:
+            return False
+        return (
+            self.error_rate >= self.config.error_rate
+            or self.slow_call_rate >= self.config.slow_call_rate
+        )
+
+    def _transition(self, state: CircuitState) -> None:
+        previous, self.state = self.state, state
+        self._probes = 0
+        if state == CircuitState.open:
+            self._opened_at = self._clock()
+            self.opened += 1
+        elif state == CircuitState.closed:
+            # start over so the failures that opened the circuit do not re-open it
+            self._outcomes.clear()
+            self._consecutive_failures = 0
+        log = logger.warning if state == CircuitState.open else logger.info
+        log(f"A2A agent {self.name} circuit {previous.value} -> {state.value}")
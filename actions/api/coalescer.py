@@ -0,0 +1,108 @@
+"""Coalesce streamed text chunks into fewer, larger bot messages.
+
+Streaming agents and LLMs deliver text in many small chunks. Sending each one
+with `dispatcher.utter_message` floods the channel and the tracker with tiny
+bot events. `MessageCoalescer` buffers chunks per key (an A2A task id, a RAG
+request, ...) and emits the buffered text as one message when
+
+- the caller marks the end of a logical reply with `flush(key)`,
+- the buffer grows past `max_chars` (cut at the last sentence boundary), or
+- `window` seconds have passed since the first buffered chunk and the text
+  ends on a sentence boundary.
+"""
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Hashable
+
+DEFAULT_MAX_CHARS = 1500
+DEFAULT_WINDOW = 2.0
+
+_SENTENCE_END_RE = re.compile(r"[.!?:](\s|$)|\n")
+
+
+def last_sentence_boundary(text: str) -> int:
+    """Index just after the last sentence end in `text`, or 0 if there is none."""
+    end = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        end = match.end()
+    return end
+
+
+@dataclass
+class _Buffer:
+    chunks: list[str] = field(default_factory=list)
+    size: int = 0
+    started: float = 0.0
+
+
+class MessageCoalescer:
+    def __init__(
+        self,
+        emit: Callable[[str], None],
+        max_chars: int = DEFAULT_MAX_CHARS,
+        window: float = DEFAULT_WINDOW,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.emit = emit
+        self.max_chars = max_chars
+        self.window = window
+        self.enabled = enabled
+        self._clock = clock
+        self._buffers: dict[Hashable, _Buffer] = {}
+        self.chunks_in = 0
+        self.messages_out = 0
+
+    def add(self, key: Hashable, text: str, separator: str = "\n") -> None:
+        """Buffer `text` for `key`. `separator` joins it to previously buffered text."""
+        if not text:
+            return
+        self.chunks_in += 1
+        if not self.enabled:
+            self._emit(text)
+            return
+        buffer = self._buffers.get(key)
+        if buffer is None or not buffer.chunks:
+            buffer = self._buffers[key] = _Buffer(started=self._clock())
+        elif separator:
+            buffer.chunks.append(separator)
+            buffer.size += len(separator)
+        buffer.chunks.append(text)
+        buffer.size += len(text)
+
+        if buffer.size >= self.max_chars:
+            self._flush_to_boundary(key, buffer, force=True)
+        elif self._clock() - buffer.started >= self.window:
+            self._flush_to_boundary(key, buffer, force=False)
+
+    def flush(self, key: Hashable) -> None:
+        buffer = self._buffers.pop(key, None)
+        if buffer and buffer.chunks:
+            self._emit("".join(buffer.chunks))
+
+    def flush_all(self) -> None:
+        for key in list(self._buffers):
+            self.flush(key)
+
+    def _flush_to_boundary(self, key: Hashable, buffer: _Buffer, force: bool) -> None:
+        text = "".join(buffer.chunks)
+        cut = last_sentence_boundary(text)
+        if cut == 0:
+            if not force:
+                return
+            cut = len(text)
+        head, tail = text[:cut].rstrip(), text[cut:].lstrip()
+        if head:
+            self._emit(head)
+        buffer.chunks = [tail] if tail else []
+        buffer.size = len(tail)
+        buffer.started = self._clock()
+
+    def _emit(self, text: str) -> None:
+        self.messages_out += 1
+        self.emit(text)
+
+    @property
+    def pending(self) -> int:
+        return sum(buffer.size for buffer in self._buffers.values())
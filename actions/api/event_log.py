@@ -0,0 +1,166 @@
+"""Bounded, time-ordered log of A2A events.
+
+`RingBuffer` keeps the newest `capacity` items in a preallocated list: append
+is O(1), "last N" is O(N) and "since T" is a binary search over the
+timestamps, which are non-decreasing because events are appended as they
+arrive. `EventLog` keeps one buffer for the whole session plus one per actor
+(agent). Events that fall out of the session buffer can be spilled to an
+append-only JSONL file so history costs constant memory.
+"""
+import json
+import logging
+import os
+from typing import Any, Callable, Generic, Iterator, Optional, TypeVar
+
+from actions.api import server_hooks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENT_LOG_CAPACITY = 256
+
+T = TypeVar("T")
+
+
+class RingBuffer(Generic[T]):
+    def __init__(self, capacity: int, key: Callable[[T], float]):
+        if capacity <= 0:
+            raise ValueError("RingBuffer capacity must be positive")
+        self.capacity = capacity
+        self._key = key
+        self._items: list[Optional[T]] = [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> T:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("RingBuffer index out of range")
+        return self._items[(self._start + index) % self.capacity]
+
+    def __iter__(self) -> Iterator[T]:
+        for i in range(self._size):
+            yield self._items[(self._start + i) % self.capacity]
+
+    def append(self, item: T) -> Optional[T]:
+        """Append `item`, returning the oldest item if it had to be dropped."""
+        dropped = None
+        if self._size < self.capacity:
+            self._items[(self._start + self._size) % self.capacity] = item
+            self._size += 1
+        else:
+            dropped = self._items[self._start]
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self.capacity
+        return dropped
+
+    def last(self, n: int) -> list[T]:
+        n = max(0, min(n, self._size))
+        return [self[i] for i in range(self._size - n, self._size)]
+
+    def since(self, timestamp: float) -> list[T]:
+        """Items with key >= `timestamp`, oldest first."""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(self[mid]) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return [self[i] for i in range(lo, self._size)]
+
+
+class JsonlFile:
+    """Shared append-only JSON-lines file; one open handle per path."""
+
+    _open: dict[str, "JsonlFile"] = {}
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def get(cls, path: str) -> "JsonlFile":
+        spill = cls._open.get(path)
+        if spill is None:
+            spill = cls._open[path] = cls(path)
+        return spill
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+        self._open.pop(self.path, None)
+
+
+@server_hooks.on_shutdown
+async def close_jsonl_files() -> None:
+    for spill in list(JsonlFile._open.values()):
+        spill.close()
+
+
+class EventLog:
+    """Per-session event history with per-actor views.
+
+    Events must have `id`, `actor` and `timestamp` attributes and a
+    `model_dump(mode="json")` method (the pydantic `Event` model in
+    `actions.a2a`).
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_EVENT_LOG_CAPACITY,
+        spill_path: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.session_id = session_id
+        self._events: RingBuffer = RingBuffer(capacity, key=_timestamp)
+        self._by_actor: dict[str, RingBuffer] = {}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._events)
+
+    def append(self, event: Any) -> None:
+        actor_events = self._by_actor.get(event.actor)
+        if actor_events is None:
+            actor_events = self._by_actor[event.actor] = RingBuffer(self.capacity, key=_timestamp)
+        actor_events.append(event)
+        dropped = self._events.append(event)
+        if dropped is not None and self.spill_path:
+            self._spill(dropped)
+
+    def last(self, n: int, actor: Optional[str] = None) -> list[Any]:
+        return self._buffer(actor).last(n)
+
+    def since(self, timestamp: float, actor: Optional[str] = None) -> list[Any]:
+        return self._buffer(actor).since(timestamp)
+
+    def for_actor(self, actor: str) -> list[Any]:
+        return list(self._buffer(actor))
+
+    def _buffer(self, actor: Optional[str]) -> RingBuffer:
+        if actor is None:
+            return self._events
+        return self._by_actor.get(actor) or RingBuffer(1, key=_timestamp)
+
+    def _spill(self, event: Any) -> None:
+        try:
+            record = event.model_dump(mode="json", exclude_none=True)
+            record["session_id"] = self.session_id
+            JsonlFile.get(self.spill_path).write(record)
+        except Exception as e:
+            logger.warning(f"Failed to spill A2A event to {self.spill_path}: {e}")
+
+
+def _timestamp(event: Any) -> float:
+    return event.timestamp
@@ -0,0 +1,125 @@
+"""Retrieval from several knowledge sources at once.
+
+`FederatedSearch` asks every member (Kapa projects, local indexes, anything
+with `async search_results(query) -> list[dict]`) concurrently. Each member
+gets its own `deadline`; a member that is slower or fails is left out of the
+answer instead of holding it up. The rankings are merged with reciprocal-rank
+fusion, where a result scores `sum(1 / (rrf_k + rank))` over the members that
+returned it, and results with the same `source_url` are merged into one.
+
+Outcomes per member are counted in `federated_search_sources_total`.
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from actions.api import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE = 5.0
+DEFAULT_RRF_K = 60
+DEFAULT_NUM_RESULTS = 5
+
+FEDERATED_SEARCH_SOURCES_TOTAL = metrics.counter(
+    "federated_search_sources_total",
+    "Member searches of federated retrieval, by outcome (ok, timeout, error)",
+    ["search", "source", "outcome"],
+)
+
+
+class FederatedSearchError(Exception):
+    """No member of a federated search returned results."""
+
+
+@dataclass
+class FederatedMember:
+    name: str
+    search_api: Any
+    deadline: float = DEFAULT_DEADLINE
+
+
+def result_key(result: dict) -> str:
+    # results without a url are only merged when their content is identical
+    return result.get("source_url") or f"content:{result.get('content', '')}"
+
+
+def reciprocal_rank_fusion(
+    rankings: dict[str, list[dict]], k: int = DEFAULT_RRF_K, num_results: Optional[int] = None
+) -> list[dict]:
+    """Fuse ranked result lists, keeping one result per `source_url`.
+
+    A result keeps the fields of its best ranked occurrence and records the
+    members that returned it in `knowledge_sources`.
+    """
+    fused: dict[str, dict] = {}
+    scores: dict[str, float] = {}
+    best_rank: dict[str, int] = {}
+    for name, results in rankings.items():
+        seen = set()
+        for rank, result in enumerate(results, start=1):
+            key = result_key(result)
+            # a member listing the same url twice counts once, at its best rank
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            if key not in fused or rank < best_rank[key]:
+                sources = fused[key]["knowledge_sources"] if key in fused else []
+                fused[key] = {**result, "knowledge_sources": sources}
+                best_rank[key] = rank
+            fused[key]["knowledge_sources"].append(name)
+    ranked = sorted(fused, key=lambda key: (-scores[key], best_rank[key]))
+    if num_results is not None:
+        ranked = ranked[:num_results]
+    return [{**fused[key], "rrf_score": scores[key]} for key in ranked]
+
+
+class FederatedSearch:
+    def __init__(
+        self,
+        name: str,
+        members: list[FederatedMember],
+        num_results: int = DEFAULT_NUM_RESULTS,
+        rrf_k: int = DEFAULT_RRF_K,
+    ):
+        if not members:
+            raise ValueError(f"federated search {name} has no members")
+        names = [member.name for member in members]
+        duplicates = sorted({member for member in names if names.count(member) > 1})
+        if duplicates:
+            # rankings are keyed by member name, a duplicate would silently replace the other's results
+            raise ValueError(f"federated search {name} lists members more than once: {', '.join(duplicates)}")
+        self.name = name
+        self.members = members
+        self.num_results = num_results
+        self.rrf_k = rrf_k
+
+    async def _member_results(self, member: FederatedMember, query_string: str) -> Optional[list[dict]]:
+        try:
+            # the member's own request may keep running for other callers sharing it (single flight),
+            # this search only stops waiting for it
+            results = await asyncio.wait_for(member.search_api.search_results(query_string), member.deadline)
+        except asyncio.TimeoutError:
+            FEDERATED_SEARCH_SOURCES_TOTAL.inc(search=self.name, source=member.name, outcome="timeout")
+            logger.warning(f"Federated search {self.name}: {member.name} missed its {member.deadline}s deadline")
+            return None
+        except Exception as e:
+            FEDERATED_SEARCH_SOURCES_TOTAL.inc(search=self.name, source=member.name, outcome="error")
+            logger.warning(f"Federated search {self.name}: {member.name} failed: {e}")
+            return None
+        FEDERATED_SEARCH_SOURCES_TOTAL.inc(search=self.name, source=member.name, outcome="ok")
+        return results
+
+    async def search_results(self, query_string: str) -> list[dict]:
+        answers = await asyncio.gather(*(self._member_results(member, query_string) for member in self.members))
+        rankings = {member.name: results for member, results in zip(self.members, answers) if results is not None}
+        if not rankings:
+            raise FederatedSearchError(f"no source of {self.name} answered")
+        return reciprocal_rank_fusion(rankings, self.rrf_k, self.num_results)
+
+    async def search(self, query_string: str) -> str:
+        """Fused results in the JSON format of `KapaSearchAPI.search`."""
+        return json.dumps(await self.search_results(query_string), indent=4, ensure_ascii=False)
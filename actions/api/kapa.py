@@ -1,13 +1,15 @@
 from typing import TYPE_CHECKING, Any, List, Text, Dict, Optional
 from dataclasses import dataclass
 
-import time
-import aiohttp
 import json
 import asyncio
 import urllib.parse
 
 import structlog
+from actions.api.kapa_client import KapaHTTPError, get_kapa_client, query_url
+from actions.api.request_policy import RequestPolicy
+from actions.api.search_cache import search_cache_key
+from actions.api.single_flight import SingleFlight
 from rasa.utils.endpoints import EndpointConfig
 from rasa.core.information_retrieval import (
     SearchResultList,
@@ -21,6 +23,9 @@ if TYPE_CHECKING:
 
 structlogger = structlog.get_logger()
 
+# identical searches in flight at the same time, from any RAG action, share one Kapa request
+_search_flight = SingleFlight("kapa_search_api")
+
 class SearchResult:
     def __init__(self, text: str, metadata: Dict, score: Optional[float] = None):
         self.text = text
@@ -33,7 +38,9 @@ class SearchResultList:
     metadata: Dict
 
 class KapaSearchAPI:
-    def __init__(self, project_id: str, token: str, num_results: int = 3):
+    def __init__(
+        self, project_id: str, token: str, num_results: int = 3, policy: Optional[RequestPolicy] = None
+    ):
         self.project_id = project_id
         if not self.project_id:
             raise KapaInformationRetrievalException(
@@ -45,7 +52,10 @@ class KapaSearchAPI:
                 "Kapa token not set."
             )
         self.num_results = num_results
-        self.url = f"https://api.kapa.ai/query/v1/projects/{self.project_id}/search/"
+        self.url = query_url(self.project_id, "search")
+        self.client = get_kapa_client()
+        # latency budget, hedging and retries of the RAG actions' searches
+        self.policy = policy or RequestPolicy(name="kapa_rag")
 
     @staticmethod
     def _create_search_results(response_json: dict) -> SearchResultList:
@@ -72,46 +82,34 @@ class KapaSearchAPI:
         return results
 
     async def search(self, query_string: str):
-        structlogger.debug("kapa.kapa_query_search", url=self.url, query_string=query_string)
-        headers = {
-            'X-API-KEY': self.token,
-            'Content-Type': 'application/json'
-        }
-        # set payload body, value for query to query_string
-        payload = json.dumps({
-            "query": query_string,
-            "num_results": self.num_results
-        })
+        return json.dumps(await self.search_results(query_string), indent=4, ensure_ascii=False)
 
+    async def search_results(self, query_string: str) -> list:
+        """The ranked `search_results` of the Kapa response."""
+        key = search_cache_key(self.project_id, "search", self.num_results, query_string)
+        if _search_flight.in_flight(key):
+            structlogger.debug("kapa.kapa_query_search.coalesced", url=self.url, query_string=query_string)
+        return await _search_flight.do(key, lambda: self._search(query_string))
+
+    async def _search(self, query_string: str) -> list:
+        structlogger.debug("kapa.kapa_query_search", url=self.url, query_string=query_string)
         try:
-            start_time = time.time()
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.url, headers=headers, data=payload, timeout=18) as response:
-                    response_json = await response.json()
-                    # calc trans time in ms
-                    trans_time = (time.time() - start_time) * 1000
-                    structlogger.debug("kapa.kapa_query_search.kapa_response", status=response.status, trans_time=trans_time, response_json=response_json, response_type=type(response_json), response_json_type=type(response_json))
-                    # Check if the response status is OK
-                    if response.status == 200:
-                        response = await response.json()  # Assuming the response is in JSON format
-                        return json.dumps(response['search_results'], indent=4, ensure_ascii=False)
-                        # answer = self._create_search_results(response)
-                        # return answer
-                    else:
-                        # Handle HTTP errors
-                        raise KapaInformationRetrievalException(
-                            f"Kapa search http error. HTTP Error when calling the knowledge base: {response.status}, url: {self.url}, headers: {headers}, response: {response}"
-                        ) from e
-                        return f"HTTP Error when calling the knowledge base"
-                    # return response_json
+            response = await self.client.query(
+                self.url, self.token, query_string, self.num_results, endpoint="search", policy=self.policy
+            )
+            structlogger.debug("kapa.kapa_query_search.kapa_response", response_json=response)
+            return response['search_results']
+        except KapaHTTPError as e:
+            raise KapaInformationRetrievalException(
+                f"Kapa search http error. HTTP Error when calling the knowledge base: {e.status}, url: {self.url}, response: {e.body}"
+            ) from e
         except asyncio.TimeoutError as e:
-            # return "Kapa timeout"
             raise KapaInformationRetrievalException(
-                f"Kapa search timeout. Encountered error: {str(e)}, url: {self.url}, headers: {headers}"
+                f"Kapa search timeout. Encountered error: {str(e)}, url: {self.url}"
             ) from e
         except Exception as e:
             raise KapaInformationRetrievalException(
-                f"Kapa search failed. Encountered error: {str(e)}, url: {self.url}, headers: {headers}"
+                f"Kapa search failed. Encountered error: {str(e)}, url: {self.url}"
             ) from e
 
 class KapaInformationRetrievalException(Exception):
@@ -139,6 +137,8 @@ class Kapa(InformationRetrieval):
         self.url = None
         self.project_id = None
         self.endpoint_type = None
+        # pooled connections shared with the RAG actions, see actions/api/kapa_client.py
+        self.client = get_kapa_client()
 
     def connect(self, config: EndpointConfig) -> None:
         """Setup to Kapa values."""
@@ -167,11 +167,11 @@ class Kapa(InformationRetrieval):
         if self.endpoint_type == "search":
             # Docs: https://docs.kapa.ai/api#tag/Search
             # https://api.kapa.ai/query/v1/projects/{project_id}/search/
-            self.url = f"https://api.kapa.ai/query/v1/projects/{self.project_id}/search/"
+            self.url = query_url(self.project_id, "search")
         if self.endpoint_type == "chat":
             # Docs: https://docs.kapa.ai/api#tag/Chat/operation/query_v1_projects_chat
             # https://api.kapa.ai/query/v1/projects/{project_id}/chat/
-            self.url = f"https://api.kapa.ai/query/v1/projects/{self.project_id}/chat/"
+            self.url = query_url(self.project_id, "chat")
         if kapa_args.get("kapa_num_results"):
             self.num_results = int(kapa_args.get("kapa_num_results"))
         else:
@@ -199,44 +199,23 @@ class Kapa(InformationRetrieval):
 
     async def kapa_query_chat(self, query_string: str):
         structlogger.debug("kapa.kapa_query_chat", url=self.url, query_string=query_string)
-        headers = {
-            'X-API-KEY': self.token,
-            'Content-Type': 'application/json'
-        }
-        # set payload body, value for query to query_string
-        payload = json.dumps({
-            "query": query_string,
-            "num_results": self.num_results
-        })
-
         try:
-            start_time = time.time()
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.url, headers=headers, data=payload, timeout=18) as response:
-                    response_json = await response.json()
-                    # calc trans time in ms
-                    trans_time = (time.time() - start_time) * 1000
-                    structlogger.debug("kapa.kapa_query_chat.kapa_response", trans_time=trans_time, response_json=response_json, response_type=type(response_json), response_json_type=type(response_json))
-                    # Check if the response status is OK
-                    if response.status == 200:
-                        response = await response.json()  # Assuming the response is in JSON format
-                        answer = self._create_chat_results(response)
-                        return answer
-                    else:
-                        # Handle HTTP errors
-                        raise KapaInformationRetrievalException(
-                            f"Kapa search http error. HTTP Error when calling the knowledge base: {response.status}, url: {self.url}, headers: {headers}, response: {response}"
-                        ) from e
-                        return f"HTTP Error when calling the knowledge base"
-                    # return response_json
+            response = await self.client.query(
+                self.url, self.token, query_string, self.num_results, endpoint="chat"
+            )
+            structlogger.debug("kapa.kapa_query_chat.kapa_response", response_json=response)
+            return self._create_chat_results(response)
+        except KapaHTTPError as e:
+            raise KapaInformationRetrievalException(
+                f"Kapa search http error. HTTP Error when calling the knowledge base: {e.status}, url: {self.url}, response: {e.body}"
+            ) from e
         except asyncio.TimeoutError as e:
-            # return "Kapa timeout"
             raise KapaInformationRetrievalException(
-                f"Kapa search timeout. Encountered error: {str(e)}, url: {self.url}, headers: {headers}"
+                f"Kapa search timeout. Encountered error: {str(e)}, url: {self.url}"
             ) from e
         except Exception as e:
             raise KapaInformationRetrievalException(
-                f"Kapa search failed. Encountered error: {str(e)}, url: {self.url}, headers: {headers}"
+                f"Kapa search failed. Encountered error: {str(e)}, url: {self.url}"
             ) from e
 
     async def search(
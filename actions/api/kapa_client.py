@@ -0,0 +1,184 @@
+"""Long-lived HTTP client for the Kapa query API.
+
+Opening an `aiohttp.ClientSession` per query pays for DNS, TCP and TLS setup
+on every knowledge lookup. `KapaClient` keeps one session per event loop with
+a pooled keep-alive connector and a DNS cache, and is shared by the Kapa
+InformationRetrieval component and the RAG actions through
+`get_kapa_client()`. Each response body is parsed once.
+
+Passing a `RequestPolicy` runs the query within its latency budget, hedged
+and retried (see actions/api/request_policy.py).
+
+New and reused connections are counted in `kapa_connections_total`, and
+`kapa_connection_reuse_ratio` is the share of requests served on a reused
+connection. The action server closes the session on shutdown.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+import aiohttp
+
+from actions.api import metrics, server_hooks
+from actions.api.request_policy import RequestPolicy
+
+logger = logging.getLogger(__name__)
+
+KAPA_API_URL = "https://api.kapa.ai/query/v1"
+DEFAULT_TIMEOUT = 18.0
+DEFAULT_POOL_SIZE = 32
+DEFAULT_DNS_TTL = 300
+DEFAULT_KEEPALIVE = 60.0
+
+KAPA_QUERY_SECONDS = metrics.histogram(
+    "kapa_query_seconds", "Latency of Kapa API queries", ["endpoint", "outcome"]
+)
+KAPA_CONNECTIONS_TOTAL = metrics.counter(
+    "kapa_connections_total", "Connections used for Kapa queries, new or reused from the pool", ["result"]
+)
+KAPA_CONNECTION_REUSE_RATIO = metrics.gauge(
+    "kapa_connection_reuse_ratio", "Share of Kapa queries sent on a reused pooled connection"
+)
+
+
+class KapaHTTPError(Exception):
+    """Kapa answered with a non-200 status."""
+
+    def __init__(self, status: int, body: Any):
+        super().__init__(f"HTTP {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+def query_url(project_id: str, endpoint_type: str = "search") -> str:
+    # Docs: https://docs.kapa.ai/api#tag/Search and https://docs.kapa.ai/api#tag/Chat
+    return f"{KAPA_API_URL}/projects/{project_id}/{endpoint_type}/"
+
+
+async def _on_connection_create(session, context, params) -> None:
+    KAPA_CONNECTIONS_TOTAL.inc(result="new")
+
+
+async def _on_connection_reuse(session, context, params) -> None:
+    KAPA_CONNECTIONS_TOTAL.inc(result="reused")
+
+
+class KapaClient:
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        dns_ttl: int = DEFAULT_DNS_TTL,
+        keepalive: float = DEFAULT_KEEPALIVE,
+    ):
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(_on_connection_create)
+        trace.on_connection_reuseconn.append(_on_connection_reuse)
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[trace],
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # sessions are bound to the loop they were created on
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = self._new_session()
+            self._loop = loop
+        return self._session
+
+    async def query(
+        self,
+        url: str,
+        token: str,
+        query_string: str,
+        num_results: int,
+        endpoint: str = "search",
+        timeout: Optional[float] = None,
+        policy: Optional[RequestPolicy] = None,
+    ) -> dict:
+        """POST a query and return the parsed JSON body; raises `KapaHTTPError` on non-200 answers."""
+        if policy is not None:
+            return await policy.run(
+                lambda remaining: self._query(url, token, query_string, num_results, endpoint, remaining)
+            )
+        return await self._query(url, token, query_string, num_results, endpoint, timeout)
+
+    async def _query(
+        self,
+        url: str,
+        token: str,
+        query_string: str,
+        num_results: int,
+        endpoint: str,
+        timeout: Optional[float],
+    ) -> dict:
+        headers = {"X-API-KEY": token, "Content-Type": "application/json"}
+        payload = {"query": query_string, "num_results": int(num_results)}
+        options = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+        start_time = time.time()
+        outcome = "error"
+        try:
+            async with self.session.post(url, headers=headers, json=payload, **options) as response:
+                if response.status != 200:
+                    outcome = "http_error"
+                    raise KapaHTTPError(response.status, await response.text())
+                body = await response.json()
+                outcome = "ok"
+                return body
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        except asyncio.CancelledError:
+            # e.g. the slower one of a hedged pair
+            outcome = "cancelled"
+            raise
+        finally:
+            KAPA_QUERY_SECONDS.observe(time.time() - start_time, endpoint=endpoint, outcome=outcome)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+def collect_metrics() -> None:
+    new = KAPA_CONNECTIONS_TOTAL.value(result="new")
+    reused = KAPA_CONNECTIONS_TOTAL.value(result="reused")
+    if new + reused:
+        KAPA_CONNECTION_REUSE_RATIO.set(reused / (new + reused))
+
+
+metrics.on_collect(collect_metrics)
+
+_client: Optional[KapaClient] = None
+
+
+def get_kapa_client() -> KapaClient:
+    global _client
+    if _client is None:
+        _client = KapaClient()
+    return _client
+
+
+@server_hooks.on_shutdown
+async def close_kapa_client() -> None:
+    if _client is not None:
+        await _client.close()
@@ -0,0 +1,220 @@
+"""LLM completion helpers shared by the RAG actions.
+
+`LLMClient.complete()` never blocks the action server's event loop. It uses
+litellm's native `acompletion` and falls back to running the synchronous
+`completion` on a dedicated thread pool when async is disabled or not
+supported. A semaphore bounds the number of concurrent completions, and each
+call is cancelled after `timeout` seconds. `stream()` yields the answer as it
+is generated and reports the time to first token. Settings come from the
+environment:
+
+    LLM_MAX_CONCURRENCY=16   # completions in flight, further calls wait
+    LLM_TIMEOUT=60           # seconds per completion
+    LLM_ASYNC=true           # false: always use the thread pool
+"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Optional
+
+from actions.api import metrics, server_hooks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 60.0
+
+LLM_COMPLETION_SECONDS = metrics.histogram(
+    "llm_completion_seconds", "Latency of LLM completion calls", ["model", "outcome"]
+)
+LLM_TOKENS_TOTAL = metrics.counter(
+    "llm_tokens_total", "Tokens used by LLM completions", ["model", "kind"]
+)
+LLM_QUEUE_SECONDS = metrics.histogram(
+    "llm_queue_seconds", "Time LLM completions waited for a concurrency slot", ["model"]
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = metrics.histogram(
+    "llm_time_to_first_token_seconds", "Time from starting a streamed LLM completion to its first token", ["model"]
+)
+LLM_IN_FLIGHT = metrics.gauge("llm_completions_in_flight", "LLM completions currently running")
+
+
+def record_completion(model: str, seconds: float, response: Any = None, outcome: str = "ok") -> None:
+    """Record latency and, when the response carries `usage`, prompt and completion tokens."""
+    LLM_COMPLETION_SECONDS.observe(seconds, model=model, outcome=outcome)
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = getattr(usage, kind, None)
+        if tokens:
+            LLM_TOKENS_TOTAL.inc(tokens, model=model, kind=kind.split("_")[0])
+
+
+class LLMClient:
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        use_async: bool = True,
+        acompletion: Optional[Callable[..., Any]] = None,
+        completion: Optional[Callable[..., Any]] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.use_async = use_async
+        self._acompletion = acompletion
+        self._completion = completion
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # models whose provider has no async completion, they run on the thread pool
+        self._sync_models: set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "LLMClient":
+        return cls(
+            max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+            timeout=float(os.environ.get("LLM_TIMEOUT", DEFAULT_TIMEOUT)),
+            use_async=os.environ.get("LLM_ASYNC", "true").lower() not in ("0", "false", "no"),
+        )
+
+    async def complete(self, model: str, messages: list[dict], **kwargs) -> Any:
+        """Run one completion under the concurrency limit and timeout."""
+        kwargs.setdefault("timeout", self.timeout)
+        queued = time.perf_counter()
+        async with self._semaphore:
+            LLM_QUEUE_SECONDS.observe(time.perf_counter() - queued, model=model)
+            LLM_IN_FLIGHT.inc()
+            started = time.perf_counter()
+            outcome = "error"
+            response = None
+            try:
+                response = await asyncio.wait_for(self._call(model, messages, kwargs), self.timeout)
+                outcome = "ok"
+                return response
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                raise TimeoutError(f"LLM completion with {model} took longer than {self.timeout}s")
+            finally:
+                LLM_IN_FLIGHT.dec()
+                record_completion(model, time.perf_counter() - started, response, outcome)
+
+    async def stream(self, model: str, messages: list[dict], **kwargs) -> AsyncIterator[str]:
+        """
+        Yield the completion text as it is generated, under the same concurrency
+        limit; `timeout` applies to the whole stream. Without async support the
+        completion runs on the thread pool and is yielded in one piece.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        loop = asyncio.get_running_loop()
+        queued = time.perf_counter()
+        async with self._semaphore:
+            LLM_QUEUE_SECONDS.observe(time.perf_counter() - queued, model=model)
+            LLM_IN_FLIGHT.inc()
+            started = time.perf_counter()
+            deadline = loop.time() + self.timeout
+            outcome = "error"
+            first = True
+            try:
+                async for text in self._stream_chunks(model, messages, kwargs, deadline):
+                    if not text:
+                        continue
+                    if first:
+                        LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started, model=model)
+                        first = False
+                    yield text
+                outcome = "ok"
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                raise TimeoutError(f"LLM completion with {model} took longer than {self.timeout}s")
+            finally:
+                LLM_IN_FLIGHT.dec()
+                record_completion(model, time.perf_counter() - started, outcome=outcome)
+
+    async def _stream_chunks(
+        self, model: str, messages: list[dict], kwargs: dict, deadline: float
+    ) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        acompletion = self._async_completion(model)
+        stream = None
+        if acompletion is not None:
+            try:
+                stream = await asyncio.wait_for(
+                    acompletion(model=model, messages=messages, stream=True, **kwargs), deadline - loop.time()
+                )
+            except NotImplementedError:
+                self._use_thread_pool(model)
+        if stream is None:
+            response = await asyncio.wait_for(self._call(model, messages, kwargs), deadline - loop.time())
+            yield response.choices[0].message.content or ""
+            return
+        chunks = stream.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+            except StopAsyncIteration:
+                return
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+    def _async_completion(self, model: str) -> Optional[Callable[..., Any]]:
+        if not self.use_async or model in self._sync_models:
+            return None
+        return self._acompletion or _litellm_function("acompletion")
+
+    def _use_thread_pool(self, model: str) -> None:
+        # only this model's provider lacks async support, other models keep using it
+        logger.warning(f"Async completion not supported for {model}, using the thread pool")
+        self._sync_models.add(model)
+
+    async def _call(self, model: str, messages: list[dict], kwargs: dict) -> Any:
+        acompletion = self._async_completion(model)
+        if acompletion is not None:
+            try:
+                return await acompletion(model=model, messages=messages, **kwargs)
+            except NotImplementedError:
+                self._use_thread_pool(model)
+        completion = self._completion or _litellm_function("completion")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._thread_pool(), lambda: completion(model=model, messages=messages, **kwargs)
+        )
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        # dedicated pool so blocking LLM calls never starve the loop's default executor
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="llm-completion"
+            )
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _litellm_function(name: str) -> Optional[Callable[..., Any]]:
+    import litellm
+
+    return getattr(litellm, name, None)
+
+
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    global _client
+    if _client is None:
+        _client = LLMClient.from_env()
+    return _client
+
+
+@server_hooks.on_shutdown
+async def close_llm_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,422 @@
+"""Local, offline knowledge index as an alternative to the Kapa API.
+
+Documents (Markdown, HTML and JSONL) are split into chunks of at most
+`max_chars` along their headings and paragraphs. `LocalIndex.build` writes an
+index directory with
+
+    chunks.jsonl     one {"content", "title", "source_url", "source_type"} per chunk
+    vectors.npy      unit embedding per chunk (float32), if an embed function is given
+    postings.npy     BM25 inverted index: chunk ids and term frequencies per term,
+    terms.json       with each term's offset, length and document frequency
+    doc_len.npy      token count per chunk
+    meta.json        chunk count, vector dimension, embedding model
+
+`LocalIndex.load` memory-maps the arrays, so opening a large index is cheap
+and pages are only read when a search touches them. A search scores BM25
+over the query's postings and cosine similarity against the vector matrix in
+NumPy. The two are blended with `alpha` (1.0 is vectors only) after scaling
+each to [0, 1].
+
+Build an index from the command line, optionally with a local
+sentence-transformers model:
+
+    python -m actions.api.local_index docs/ index/ --embedding-model all-MiniLM-L6-v2
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+from dataclasses import asdict, dataclass
+from html.parser import HTMLParser
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from actions.api.a2a_router import Embed, sentence_transformer_embed, tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CHARS = 1500
+DEFAULT_ALPHA = 0.5
+DEFAULT_NUM_RESULTS = 5
+BM25_K1 = 1.5
+BM25_B = 0.75
+EMBED_BATCH_SIZE = 64
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)")
+
+
+@dataclass
+class Chunk:
+    content: str
+    title: str = ""
+    source_url: str = ""
+    source_type: str = "local"
+
+
+def _pack(paragraphs: Iterable[str], max_chars: int) -> Iterator[str]:
+    """Join paragraphs into pieces of at most `max_chars`, splitting oversized paragraphs."""
+    current = ""
+    for paragraph in paragraphs:
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if current:
+                yield current
+                current = ""
+            yield paragraph[:max_chars]
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            yield current
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        yield current
+
+
+def _sections_to_chunks(
+    sections: list[tuple[str, list[str]]], source_url: str, source_type: str, max_chars: int
+) -> list[Chunk]:
+    return [
+        Chunk(content=content, title=title, source_url=source_url, source_type=source_type)
+        for title, paragraphs in sections
+        for content in _pack(paragraphs, max_chars)
+    ]
+
+
+def markdown_chunks(text: str, source_url: str, max_chars: int = DEFAULT_MAX_CHARS) -> list[Chunk]:
+    sections: list[tuple[str, list[str]]] = [("", [])]
+    paragraph: list[str] = []
+    for line in text.splitlines():
+        heading = _HEADING_RE.match(line)
+        if heading or not line.strip():
+            if paragraph:
+                sections[-1][1].append("\n".join(paragraph))
+                paragraph = []
+            if heading:
+                sections.append((heading.group(2).strip(), []))
+            continue
+        paragraph.append(line)
+    if paragraph:
+        sections[-1][1].append("\n".join(paragraph))
+    return _sections_to_chunks(sections, source_url, "markdown", max_chars)
+
+
+class _HTMLSections(HTMLParser):
+    SKIP = {"script", "style", "nav", "header", "footer"}
+    HEADINGS = {"h1", "h2", "h3", "h4"}
+    BLOCKS = {"p", "li", "pre", "tr", "div", "br", "section", "article"}
+
+    def __init__(self):
+        super().__init__()
+        self.sections: list[tuple[str, list[str]]] = [("", [])]
+        self._text: list[str] = []
+        self._skip = 0
+        self._heading = False
+
+    def _end_block(self) -> None:
+        text = " ".join("".join(self._text).split())
+        self._text = []
+        if not text:
+            return
+        if self._heading:
+            self.sections.append((text, []))
+        else:
+            self.sections[-1][1].append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag in self.HEADINGS or tag in self.BLOCKS:
+            self._end_block()
+            self._heading = tag in self.HEADINGS
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.HEADINGS or tag in self.BLOCKS:
+            self._end_block()
+            self._heading = False
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._text.append(data)
+
+
+def html_chunks(text: str, source_url: str, max_chars: int = DEFAULT_MAX_CHARS) -> list[Chunk]:
+    parser = _HTMLSections()
+    parser.feed(text)
+    parser.close()
+    parser._end_block()
+    return _sections_to_chunks(parser.sections, source_url, "html", max_chars)
+
+
+def jsonl_chunks(text: str, source_url: str, max_chars: int = DEFAULT_MAX_CHARS) -> list[Chunk]:
+    """One record per line with `content` (or `text`) and optional `title`, `source_url`."""
+    chunks = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        content = record.get("content") or record.get("text") or ""
+        for piece in _pack([content], max_chars):
+            chunks.append(
+                Chunk(
+                    content=piece,
+                    title=record.get("title", ""),
+                    source_url=record.get("source_url", source_url),
+                    source_type=record.get("source_type", "jsonl"),
+                )
+            )
+    return chunks
+
+
+READERS = {".md": markdown_chunks, ".markdown": markdown_chunks, ".html": html_chunks, ".htm": html_chunks, ".jsonl": jsonl_chunks}
+
+
+def load_documents(path: str, max_chars: int = DEFAULT_MAX_CHARS) -> list[Chunk]:
+    """Chunks of every supported file under `path` (a file or a directory)."""
+    if os.path.isfile(path):
+        files = [path]
+        root = os.path.dirname(path)
+    else:
+        root = path
+        files = sorted(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(path)
+            # an index kept next to its documents is not a document
+            if not {"meta.json", "chunks.jsonl"} <= set(names)
+            for name in names
+        )
+    chunks = []
+    for file_path in files:
+        reader = READERS.get(os.path.splitext(file_path)[1].lower())
+        if reader is None:
+            continue
+        with open(file_path, "r", encoding="utf-8") as file:
+            chunks.extend(reader(file.read(), os.path.relpath(file_path, root), max_chars))
+    return chunks
+
+
+def _unit_rows(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _scale(scores: np.ndarray) -> np.ndarray:
+    top = scores.max() if len(scores) else 0.0
+    return scores / top if top > 0 else scores
+
+
+@dataclass
+class LocalHit:
+    chunk: Chunk
+    score: float
+    bm25: float
+    cosine: float
+
+
+class LocalIndex:
+    def __init__(
+        self,
+        chunks: list[Chunk],
+        terms: dict[str, list[int]],
+        postings: np.ndarray,
+        doc_len: np.ndarray,
+        vectors: Optional[np.ndarray] = None,
+        meta: Optional[dict] = None,
+    ):
+        self.chunks = chunks
+        self.terms = terms
+        self.postings = postings
+        self.doc_len = doc_len
+        self.vectors = vectors
+        self.meta = meta or {}
+        self.avg_len = float(doc_len.mean()) if len(doc_len) else 0.0
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @classmethod
+    def build(
+        cls,
+        chunks: list[Chunk],
+        directory: str,
+        embed: Optional[Embed] = None,
+        embedding_model: str = "",
+    ) -> "LocalIndex":
+        postings_by_term: dict[str, list[tuple[int, int]]] = {}
+        doc_len = np.zeros(len(chunks), dtype=np.int32)
+        for doc_id, chunk in enumerate(chunks):
+            tokens = tokenize(f"{chunk.title} {chunk.content}")
+            doc_len[doc_id] = len(tokens)
+            counts: dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings_by_term.setdefault(token, []).append((doc_id, count))
+
+        terms = {}
+        rows = []
+        for term, postings in sorted(postings_by_term.items()):
+            terms[term] = [len(rows), len(postings)]
+            rows.extend(postings)
+        postings = np.array(rows, dtype=np.int32).reshape(-1, 2)
+
+        os.makedirs(directory, exist_ok=True)
+        meta = {"chunks": len(chunks), "dimension": 0, "embedding_model": embedding_model}
+        if embed is not None and chunks:
+            texts = [f"{chunk.title}\n{chunk.content}" for chunk in chunks]
+            batches = [embed(texts[i : i + EMBED_BATCH_SIZE]) for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+            vectors = _unit_rows(np.concatenate([np.asarray(b, dtype=np.float32) for b in batches]))
+            np.save(os.path.join(directory, "vectors.npy"), vectors)
+            meta["dimension"] = int(vectors.shape[1])
+        elif os.path.exists(os.path.join(directory, "vectors.npy")):
+            os.remove(os.path.join(directory, "vectors.npy"))
+        np.save(os.path.join(directory, "postings.npy"), postings)
+        np.save(os.path.join(directory, "doc_len.npy"), doc_len)
+        with open(os.path.join(directory, "terms.json"), "w", encoding="utf-8") as file:
+            json.dump(terms, file)
+        with open(os.path.join(directory, "chunks.jsonl"), "w", encoding="utf-8") as file:
+            for chunk in chunks:
+                file.write(json.dumps(asdict(chunk), ensure_ascii=False) + "\n")
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        logger.info(f"Built local index of {len(chunks)} chunks in {directory}")
+        return cls.load(directory)
+
+    @classmethod
+    def load(cls, directory: str) -> "LocalIndex":
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        with open(os.path.join(directory, "terms.json"), "r", encoding="utf-8") as file:
+            terms = json.load(file)
+        with open(os.path.join(directory, "chunks.jsonl"), "r", encoding="utf-8") as file:
+            chunks = [Chunk(**json.loads(line)) for line in file if line.strip()]
+        vectors_path = os.path.join(directory, "vectors.npy")
+        vectors = np.load(vectors_path, mmap_mode="r") if os.path.exists(vectors_path) else None
+        return cls(
+            chunks,
+            terms,
+            np.load(os.path.join(directory, "postings.npy"), mmap_mode="r"),
+            np.load(os.path.join(directory, "doc_len.npy"), mmap_mode="r"),
+            vectors,
+            meta,
+        )
+
+    def bm25_scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        n = len(self.chunks)
+        for token in set(tokenize(query)):
+            entry = self.terms.get(token)
+            if entry is None:
+                continue
+            offset, length = entry
+            rows = np.asarray(self.postings[offset : offset + length])
+            ids, tf = rows[:, 0], rows[:, 1].astype(np.float32)
+            idf = np.log(1 + (n - length + 0.5) / (length + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * np.asarray(self.doc_len[ids]) / (self.avg_len or 1))
+            scores[ids] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def cosine_scores(self, query_vector) -> Optional[np.ndarray]:
+        if self.vectors is None or query_vector is None:
+            return None
+        query_vector = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        if query_vector.shape[0] != self.vectors.shape[1]:
+            logger.warning(
+                f"Query embedding has dimension {query_vector.shape[0]}, the local index "
+                f"{self.vectors.shape[1]}, searching with BM25 only"
+            )
+            return None
+        norm = np.linalg.norm(query_vector)
+        return np.asarray(self.vectors @ (query_vector / norm)) if norm else None
+
+    def search(
+        self,
+        query: str,
+        query_vector=None,
+        num_results: int = DEFAULT_NUM_RESULTS,
+        alpha: float = DEFAULT_ALPHA,
+        threshold: float = 0.0,
+    ) -> list[LocalHit]:
+        if not self.chunks:
+            return []
+        bm25 = self.bm25_scores(query)
+        cosine = self.cosine_scores(query_vector)
+        if cosine is None:
+            scores = _scale(bm25)
+            cosine = np.zeros_like(bm25)
+        else:
+            scores = alpha * _scale(np.clip(cosine, 0, None)) + (1 - alpha) * _scale(bm25)
+        k = min(num_results, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            LocalHit(self.chunks[i], float(scores[i]), float(bm25[i]), float(cosine[i]))
+            for i in top
+            if scores[i] > threshold
+        ]
+
+
+def open_or_build_index(
+    index_path: str, docs_path: Optional[str] = None, embed: Optional[Embed] = None,
+    embedding_model: str = "", rebuild: bool = False,
+) -> LocalIndex:
+    """Load the index at `index_path`, building it from `docs_path` first if needed."""
+    if not rebuild and os.path.exists(os.path.join(index_path, "meta.json")):
+        return LocalIndex.load(index_path)
+    if not docs_path:
+        raise FileNotFoundError(f"No local index at {index_path} and no docs path to build it from")
+    return LocalIndex.build(load_documents(docs_path), index_path, embed, embedding_model)
+
+
+class LocalSearchAPI:
+    """Drop-in for `KapaSearchAPI` in the RAG actions, searching a local index."""
+
+    def __init__(
+        self,
+        index: LocalIndex,
+        embed_query: Optional[Callable[[str], Sequence[float]]] = None,
+        num_results: int = DEFAULT_NUM_RESULTS,
+        alpha: float = DEFAULT_ALPHA,
+    ):
+        self.index = index
+        self.embed_query = embed_query
+        self.num_results = num_results
+        self.alpha = alpha
+
+    async def search_results(self, query_string: str) -> list[dict]:
+        vector = None
+        if self.embed_query is not None and self.index.vectors is not None:
+            # embedding models are CPU bound, keep them off the event loop
+            vector = await asyncio.to_thread(self.embed_query, query_string)
+        hits = self.index.search(query_string, vector, self.num_results, self.alpha)
+        return [{**asdict(hit.chunk), "score": hit.score} for hit in hits]
+
+    async def search(self, query_string: str) -> str:
+        """Results in the JSON format of `KapaSearchAPI.search`."""
+        return json.dumps(await self.search_results(query_string), indent=4, ensure_ascii=False)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build a local knowledge index for the RAG actions")
+    parser.add_argument("docs", help="Markdown, HTML or JSONL file or directory")
+    parser.add_argument("index", help="output directory")
+    parser.add_argument("--embedding-model", default="", help="sentence-transformers model, BM25 only if unset")
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_MAX_CHARS)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    embed = None
+    if args.embedding_model:
+        embed = sentence_transformer_embed(args.embedding_model, "the index is built for BM25 only")
+    chunks = load_documents(args.docs, args.max_chars)
+    LocalIndex.build(chunks, args.index, embed, args.embedding_model if embed else "")
+
+
+if __name__ == "__main__":
+    main()
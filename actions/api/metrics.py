@@ -0,0 +1,317 @@
+"""Prometheus-style metrics for the action server.
+
+Modules declare their metrics once, at import time, on the shared registry:
+
+    KAPA_QUERY_SECONDS = metrics.histogram(
+        "kapa_query_seconds", "Kapa API query latency", ["endpoint", "outcome"]
+    )
+    KAPA_QUERY_SECONDS.observe(0.42, endpoint="search", outcome="ok")
+
+Values that are cheaper to read at scrape time than to keep up to date (pool
+sizes, circuit breaker states, ...) are refreshed by callbacks registered
+with `on_collect`. Objects that may be replaced (action instances, caches)
+register their bound method through `weakref.WeakMethod`, so the registry
+does not keep them alive and drops the callback once they are gone:
+
+    metrics.on_collect(weakref.WeakMethod(self.collect_metrics))
+
+The registry is rendered in the Prometheus text format on `GET /metrics` of
+the action server. The same route times every `/webhook` call per action.
+Processes without the action server's Sanic app (the Rasa server running
+`components/kapa.py`) can serve it with `start_http_server`, which is called
+automatically when `METRICS_PORT` is set.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, Optional, Sequence, Union
+
+from actions.api import server_hooks
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PATH = "/metrics"
+# Prometheus client defaults, extended for LLM calls and slow agents
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: tuple[str, ...], value) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class _HistogramValue:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = _HistogramValue(len(self.buckets))
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry.counts[index] += 1
+            entry.sum += value
+            entry.count += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry.count if entry else 0
+
+    def _render_sample(self, key: tuple[str, ...], value: _HistogramValue) -> list[str]:
+        names = self.labelnames + ("le",)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, value.counts):
+            cumulative += count
+            labels = _format_labels(names, key + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(names, key + ('+Inf',))} {value.count}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(value.sum)}")
+        lines.append(f"{self.name}_count{labels} {value.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Union[Callable[[], None], weakref.WeakMethod]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def on_collect(self, callback):
+        """Register a callback that refreshes gauges right before each scrape, or a `WeakMethod` of one."""
+        with self._lock:
+            self._collectors.append(callback)
+        return callback
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            callback = collector() if isinstance(collector, weakref.WeakMethod) else collector
+            if callback is None:
+                # the object owning the method is gone
+                with self._lock:
+                    self._collectors = [c for c in self._collectors if c is not collector]
+                continue
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Metrics collector {callback.__qualname__} failed: {e}")
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+on_collect = REGISTRY.on_collect
+
+ACTION_RUN_SECONDS = histogram(
+    "action_run_seconds", "Latency of custom action runs", ["action", "status"]
+)
+CACHE_REQUESTS_TOTAL = counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit, miss, ...)", ["cache", "result"]
+)
+
+
+def record_cache(cache: str, result: str) -> None:
+    CACHE_REQUESTS_TOTAL.inc(cache=cache, result=result)
+
+
+@server_hooks.on_attach
+def attach_metrics(app) -> None:
+    """Serve the registry on the action server and time each action call."""
+    from sanic import response
+
+    async def metrics_endpoint(request):
+        return response.text(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+    async def start_timer(request):
+        request.ctx.metrics_started = time.perf_counter()
+
+    async def observe_action(request, resp):
+        started = getattr(request.ctx, "metrics_started", None)
+        if started is None or request.path != "/webhook":
+            return
+        try:
+            action = (request.json or {}).get("next_action", "unknown")
+        except Exception:
+            action = "unknown"
+        ACTION_RUN_SECONDS.observe(
+            time.perf_counter() - started, action=action, status=str(resp.status)
+        )
+
+    app.add_route(metrics_endpoint, METRICS_PATH, methods=["GET"], name="metrics")
+    app.register_middleware(start_timer, "request")
+    app.register_middleware(observe_action, "response")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_http_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve `/metrics` from a daemon thread, for processes without the action server app."""
+    global _http_server
+    if _http_server is None:
+        _http_server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+        threading.Thread(target=_http_server.serve_forever, name="metrics", daemon=True).start()
+        logger.info(f"Serving metrics on http://{addr}:{port}{METRICS_PATH}")
+    return _http_server
+
+
+def start_http_server_from_env() -> None:
+    port = os.environ.get("METRICS_PORT")
+    if not port:
+        return
+    try:
+        start_http_server(int(port))
+    except OSError as e:
+        logger.warning(f"Could not serve metrics on port {port}: {e}")
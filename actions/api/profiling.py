@@ -0,0 +1,261 @@
+"""Opt-in profiling of action runs.
+
+Code marks the phases of a run with `span()`:
+
+    with profiling.span("kapa_search"):
+        result = await self.kapa_api.search(query_string=latest_message)
+
+Nothing is recorded unless the current run is being profiled, so with
+profiling off `span()` costs one ContextVar lookup. A run is profiled when its
+action is listed in `PROFILE_ACTIONS` or its sender falls into
+`PROFILE_SAMPLE_RATE` (decided per sender_id, so a sampled conversation is
+profiled on every turn):
+
+    export PROFILE_ACTIONS="action_a2a,action_kubernetes_rag"
+    export PROFILE_SAMPLE_RATE=0.01
+    export PROFILE_DIR=profiles
+    export PROFILE_FORMAT=chrome      # or "collapsed"
+
+Each span records wall time and the CPU time of the event loop thread while it
+was open (which includes other coroutines running on the loop meanwhile).
+`chrome` writes one Chrome trace JSON file per run, to open in
+chrome://tracing or Perfetto. `collapsed` appends self times as folded stacks
+to `<action>.folded`, the input format of flamegraph.pl and speedscope.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from actions.api import server_hooks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = "profiles"
+
+
+@dataclass
+class ProfilerConfig:
+    actions: set[str] = field(default_factory=set)
+    sample_rate: float = 0.0
+    output_dir: str = DEFAULT_PROFILE_DIR
+    fmt: str = "chrome"
+
+    @classmethod
+    def from_env(cls) -> "ProfilerConfig":
+        return cls(
+            actions={a.strip() for a in os.environ.get("PROFILE_ACTIONS", "").split(",") if a.strip()},
+            sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", 0.0)),
+            output_dir=os.environ.get("PROFILE_DIR", DEFAULT_PROFILE_DIR),
+            fmt=os.environ.get("PROFILE_FORMAT", "chrome"),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.actions) or self.sample_rate > 0
+
+    def should_profile(self, action: str, sender_id: Optional[str]) -> bool:
+        if action in self.actions:
+            return True
+        if self.sample_rate <= 0 or sender_id is None:
+            return False
+        return zlib.crc32(sender_id.encode("utf-8")) % 10_000 < self.sample_rate * 10_000
+
+
+@dataclass
+class SpanRecord:
+    path: tuple[str, ...]
+    start: float
+    end: float
+    cpu: float
+    lane: int
+
+
+class Profile:
+    def __init__(self, action: str, sender_id: Optional[str]):
+        self.action = action
+        self.sender_id = sender_id
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: list[SpanRecord] = []
+        self._lanes: dict[int, int] = {}
+
+    def record(self, path: tuple[str, ...], start: float, end: float, cpu: float) -> None:
+        self.spans.append(SpanRecord(path, start, end, cpu, self._lane()))
+
+    def _lane(self) -> int:
+        # spans from concurrent tasks (e.g. an A2A fan-out) get their own trace row
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return self._lanes.setdefault(id(task), len(self._lanes) + 1)
+
+    def chrome_trace(self) -> dict:
+        events = [
+            {
+                "name": span.path[-1],
+                "cat": self.action,
+                "ph": "X",
+                "ts": round((span.start - self.started) * 1e6, 1),
+                "dur": round((span.end - span.start) * 1e6, 1),
+                "pid": os.getpid(),
+                "tid": span.lane,
+                "args": {"cpu_ms": round(span.cpu * 1e3, 3), "stack": ";".join(span.path)},
+            }
+            for span in self.spans
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"action": self.action, "sender_id": self.sender_id, "started_at": self.started_at},
+        }
+
+    def collapsed_stacks(self) -> list[str]:
+        """Folded stacks with self time in microseconds, one line per distinct stack."""
+        total: dict[tuple[str, ...], float] = {}
+        children: dict[tuple[str, ...], float] = {}
+        for span in self.spans:
+            duration = span.end - span.start
+            total[span.path] = total.get(span.path, 0.0) + duration
+            if len(span.path) > 1:
+                children[span.path[:-1]] = children.get(span.path[:-1], 0.0) + duration
+        lines = []
+        for path, duration in total.items():
+            # concurrent children can add up to more than their parent
+            self_time = max(0.0, duration - children.get(path, 0.0))
+            lines.append(f"{';'.join(path)} {int(self_time * 1e6)}")
+        return lines
+
+    def write(self, output_dir: str, fmt: str) -> str:
+        os.makedirs(output_dir, exist_ok=True)
+        if fmt == "collapsed":
+            path = os.path.join(output_dir, f"{self.action}.folded")
+            with open(path, "a", encoding="utf-8") as file:
+                file.write("\n".join(self.collapsed_stacks()) + "\n")
+        else:
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+            sender = "".join(c if c.isalnum() else "_" for c in (self.sender_id or "unknown"))[:40]
+            path = os.path.join(output_dir, f"{self.action}-{sender}-{stamp}-{os.getpid()}.json")
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(self.chrome_trace(), file)
+        return path
+
+
+_current_profile: ContextVar[Optional[Profile]] = ContextVar("profile", default=None)
+_current_path: ContextVar[tuple[str, ...]] = ContextVar("profile_path", default=())
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("profile", "name", "path", "token", "wall", "cpu")
+
+    def __init__(self, profile: Profile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.path = _current_path.get() + (self.name,)
+        self.token = _current_path.set(self.path)
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.record(self.path, self.wall, time.perf_counter(), time.thread_time() - self.cpu)
+        _current_path.reset(self.token)
+        return False
+
+
+def span(name: str):
+    """Time a phase of the current run; a no-op unless the run is being profiled."""
+    profile = _current_profile.get()
+    if profile is None:
+        return _NOOP_SPAN
+    return _Span(profile, name)
+
+
+config = ProfilerConfig.from_env()
+
+
+def start_profile(action: str, sender_id: Optional[str]) -> Optional[tuple]:
+    """Start profiling a run if the config selects it; pass the result to `finish_profile`."""
+    if not config.should_profile(action, sender_id):
+        return None
+    profile = Profile(action, sender_id)
+    root = _Span(profile, action)
+    token = _current_profile.set(profile)
+    root.__enter__()
+    return profile, token, root
+
+
+def finish_profile(state: Optional[tuple]) -> Optional[str]:
+    if state is None:
+        return None
+    profile, token, root = state
+    try:
+        root.__exit__(None, None, None)
+        _current_profile.reset(token)
+    except ValueError:
+        # finished from another context than it was started in, nothing to reset here
+        pass
+    try:
+        path = profile.write(config.output_dir, config.fmt)
+        logger.debug(f"Wrote profile of {profile.action} to {path}")
+        return path
+    except OSError as e:
+        logger.warning(f"Failed to write profile of {profile.action}: {e}")
+        return None
+
+
+@contextmanager
+def profile_action(action: str, sender_id: Optional[str] = None) -> Iterator[Optional[Profile]]:
+    state = start_profile(action, sender_id)
+    try:
+        yield state[0] if state else None
+    finally:
+        finish_profile(state)
+
+
+@server_hooks.on_attach
+def attach_profiler(app) -> None:
+    """Profile selected /webhook calls; nothing is attached when profiling is off."""
+    if not config.enabled:
+        return
+    logger.info(
+        f"Profiling actions {sorted(config.actions)}, sender sample rate {config.sample_rate}, "
+        f"writing {config.fmt} output to {config.output_dir}"
+    )
+
+    async def start(request):
+        if request.path != "/webhook":
+            return
+        try:
+            payload = request.json or {}
+        except Exception:
+            return
+        request.ctx.profile = start_profile(payload.get("next_action", "unknown"), payload.get("sender_id"))
+
+    async def finish(request, response):
+        finish_profile(getattr(request.ctx, "profile", None))
+
+    app.register_middleware(start, "request")
+    app.register_middleware(finish, "response")
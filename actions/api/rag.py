@@ -0,0 +1,259 @@
+"""Knowledge sources of the RAG actions.
+
+Every source in rag.yml becomes one RAG action (see actions/rag.py). Adding a
+knowledge base is a config entry:
+
+    sources:
+      - name: kubernetes
+        action: action_kubernetes_rag
+        project_id_env: KAPA_K8S_PROJECT_ID
+        token_env: KAPA_K8S_TOKEN
+        num_results: 5
+        template: prompts/rag_completion.jinja2
+        model: gpt-4o
+
+Settings missing from a source are taken from `defaults`. Any setting can also
+be read from the environment with a `<setting>_env` key; a set variable wins
+over the literal value. `request_policy` sets the latency budget, hedging and
+retries of the source's Kapa searches (see actions/api/request_policy.py).
+
+A source with `backend: local` searches a local index instead of Kapa and
+keeps working offline (see actions/api/local_index.py):
+
+      - name: rasa_offline
+        backend: local
+        index_path: .cache/rasa_docs_index
+        docs_path: docs/rasa        # built from here when there is no index yet
+        embedding_model: all-MiniLM-L6-v2
+        hybrid_alpha: 0.5
+
+A source with `backend: federated` searches several sources at once and fuses
+their results (see actions/api/federated_search.py). A member is the name of
+another source, whose search client is shared, or an inline source config.
+Every member has `deadline` seconds to answer:
+
+      - name: rasa_on_kubernetes
+        backend: federated
+        members: [rasa, kubernetes, rasa_offline]
+        deadline: 4
+        rrf_k: 60
+
+The search client, the compiled template and the LLM client of a source are
+built once when the action server loads and shared by all requests.
+"""
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import yaml
+
+from actions.api.a2a_router import sentence_transformer_embed
+from actions.api.federated_search import DEFAULT_DEADLINE, DEFAULT_RRF_K, FederatedMember, FederatedSearch
+from actions.api.llm import LLMClient, get_llm_client
+from actions.api.local_index import DEFAULT_ALPHA, LocalSearchAPI, open_or_build_index
+from actions.api.request_policy import RequestPolicy
+from actions.api.template_renderer import TemplateRenderer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = "rag.yml"
+DEFAULT_TEMPLATE = "prompts/rag_completion.jinja2"
+DEFAULT_MODEL = "gpt-4o"
+DEFAULT_NUM_RESULTS = 5
+
+SETTINGS = (
+    "action",
+    "backend",
+    "project_id",
+    "token",
+    "num_results",
+    "template",
+    "model",
+    "index_path",
+    "docs_path",
+    "embedding_model",
+    "hybrid_alpha",
+    "deadline",
+    "rrf_k",
+)
+
+
+def _setting(name: str, source: dict, defaults: dict) -> Any:
+    for data in (source, defaults):
+        env = data.get(f"{name}_env")
+        if env and os.environ.get(env):
+            return os.environ[env]
+        if data.get(name) is not None:
+            return data[name]
+    return None
+
+
+@dataclass
+class RAGSourceConfig:
+    name: str
+    action: str
+    project_id: str = ""
+    token: str = ""
+    num_results: int = DEFAULT_NUM_RESULTS
+    template: str = DEFAULT_TEMPLATE
+    model: str = DEFAULT_MODEL
+    backend: str = "kapa"
+    index_path: str = ""
+    docs_path: str = ""
+    embedding_model: str = ""
+    hybrid_alpha: float = DEFAULT_ALPHA
+    # federated sources: names of other sources or inline source configs
+    members: list = field(default_factory=list)
+    deadline: float = DEFAULT_DEADLINE
+    rrf_k: int = DEFAULT_RRF_K
+    request_policy: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict, defaults: Optional[dict] = None) -> "RAGSourceConfig":
+        defaults = defaults or {}
+        values = {name: _setting(name, data, defaults) for name in SETTINGS}
+        values = {name: value for name, value in values.items() if value is not None}
+        if "num_results" in values:
+            values["num_results"] = int(values["num_results"])
+        if "hybrid_alpha" in values:
+            values["hybrid_alpha"] = float(values["hybrid_alpha"])
+        if "deadline" in values:
+            values["deadline"] = float(values["deadline"])
+        if "rrf_k" in values:
+            values["rrf_k"] = int(values["rrf_k"])
+        # inline members inherit the defaults and the deadline of their federated source
+        member_defaults = {**defaults, **({"deadline": values["deadline"]} if "deadline" in values else {})}
+        values["members"] = [
+            member if isinstance(member, str) else cls.from_dict(member, member_defaults)
+            for member in data.get("members") or []
+        ]
+        values.setdefault("action", f"action_{data['name']}_rag")
+        values["request_policy"] = {**(defaults.get("request_policy") or {}), **(data.get("request_policy") or {})}
+        return cls(name=data["name"], **values)
+
+
+def load_config(path: str = DEFAULT_CONFIG_PATH) -> dict:
+    if not os.path.isfile(path):
+        logger.warning(f"RAG config {path} not found, no RAG actions registered")
+        return {}
+    with open(path, "r") as file:
+        return yaml.safe_load(file) or {}
+
+
+def load_source_configs(path: str = DEFAULT_CONFIG_PATH, config: Optional[dict] = None) -> list[RAGSourceConfig]:
+    if config is None:
+        config = load_config(path)
+    defaults = config.get("defaults") or {}
+    return [RAGSourceConfig.from_dict(source, defaults) for source in config.get("sources") or []]
+
+
+def kapa_search_api(config: RAGSourceConfig):
+    # imported here so the source config can be used without the Rasa dependencies of actions.api.kapa
+    from actions.api.kapa import KapaSearchAPI
+
+    return KapaSearchAPI(
+        project_id=config.project_id,
+        token=config.token,
+        num_results=config.num_results,
+        policy=RequestPolicy.from_config(config.request_policy, name=f"kapa_rag_{config.name}"),
+    )
+
+
+def local_search_api(config: RAGSourceConfig) -> LocalSearchAPI:
+    if not config.index_path:
+        raise ValueError("a local source needs an index_path")
+    embed = None
+    if config.embedding_model:
+        embed = sentence_transformer_embed(config.embedding_model, "the local index is searched with BM25 only")
+    index = open_or_build_index(config.index_path, config.docs_path, embed, config.embedding_model if embed else "")
+    embedding_model = index.meta.get("embedding_model", "")
+    if embed is not None and embedding_model and embedding_model != config.embedding_model:
+        logger.warning(
+            f"RAG source {config.name}: index built with {embedding_model}, not {config.embedding_model}, "
+            "searching with BM25 only"
+        )
+        embed = None
+    embed_query = (lambda text: embed([text])[0]) if embed is not None else None
+    return LocalSearchAPI(index, embed_query, num_results=config.num_results, alpha=config.hybrid_alpha)
+
+
+def federated_search_api(config: RAGSourceConfig, sources: Optional[dict[str, "RAGSource"]] = None) -> FederatedSearch:
+    """Search the members of `config`; named members share the search client of the built `sources`."""
+    sources = sources or {}
+    members = []
+    for member in config.members:
+        if isinstance(member, RAGSourceConfig):
+            members.append(FederatedMember(member.name, create_search_api(member), member.deadline))
+        elif member in sources:
+            members.append(FederatedMember(member, sources[member].search_api, config.deadline))
+        else:
+            logger.error(f"RAG source {config.name}: member {member} is not an available source, left out")
+    return FederatedSearch(config.name, members, num_results=config.num_results, rrf_k=config.rrf_k)
+
+
+def create_search_api(config: RAGSourceConfig, sources: Optional[dict[str, "RAGSource"]] = None):
+    if config.backend == "local":
+        return local_search_api(config)
+    if config.backend == "kapa":
+        return kapa_search_api(config)
+    if config.backend == "federated":
+        return federated_search_api(config, sources)
+    raise ValueError(f"unknown RAG backend {config.backend}")
+
+
+class RAGSource:
+    """The shared, long-lived resources of one knowledge source."""
+
+    def __init__(
+        self,
+        config: RAGSourceConfig,
+        search_api: Any = None,
+        renderer: Optional[TemplateRenderer] = None,
+        llm: Optional[LLMClient] = None,
+    ):
+        self.config = config
+        self.search_api = search_api if search_api is not None else create_search_api(config)
+        self.renderer = renderer or TemplateRenderer(config.template)
+        self.llm = llm or get_llm_client()
+        self.warmed = False
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    @property
+    def model(self) -> str:
+        return self.config.model
+
+    def warm(self) -> None:
+        """Render the template once so the first request does not pay for it."""
+        if self.warmed:
+            return
+        self.renderer.render(results="[]", user_message="")
+        self.warmed = True
+
+
+def build_sources(
+    configs: list[RAGSourceConfig], factory: Callable[..., RAGSource] = RAGSource
+) -> list[RAGSource]:
+    """Build each source once; a source that cannot be built is logged and left out.
+
+    Federated sources are built last, from the search clients of the sources
+    built before them, and passed to `factory` as `search_api`.
+    """
+    built: dict[int, RAGSource] = {}
+    by_name: dict[str, RAGSource] = {}
+    ordered = sorted(enumerate(configs), key=lambda item: item[1].backend == "federated")
+    for position, config in ordered:
+        try:
+            if config.backend == "federated":
+                source = factory(config, search_api=federated_search_api(config, by_name))
+            else:
+                source = factory(config)
+        except Exception as e:
+            logger.error(f"RAG source {config.name} ({config.action}) not available: {e}")
+            continue
+        built[position] = source
+        by_name[config.name] = source
+    return [built[position] for position in sorted(built)]
@@ -0,0 +1,196 @@
+"""Latency-budget aware execution of idempotent upstream requests.
+
+`RequestPolicy.run(call)` gives a request `budget` seconds in total:
+
+- hedging: when an attempt has not answered after the observed p95 latency
+  (`hedge_percentile`, once `min_samples` latencies were seen; `hedge_delay`
+  before that), a duplicate is sent and whichever answers first wins. The
+  loser is cancelled.
+- retries: an attempt failing with a retryable error (5xx, 429, connection
+  errors) is retried up to `max_retries` times with exponential backoff and
+  jitter, as long as the backoff still leaves budget for another attempt.
+
+`call(timeout)` starts one attempt and must finish within `timeout` seconds,
+the budget left. Each call site keeps its own policy, and so its own latency
+window:
+
+    policy = RequestPolicy.from_config({"budget": 8, "hedge": True, "max_retries": 2}, name="kapa_rag")
+    response = await policy.run(lambda timeout: client.query(..., timeout=timeout))
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Iterable, Optional, TypeVar
+
+import aiohttp
+import numpy as np
+
+from actions.api import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_BUDGET = 18.0
+DEFAULT_HEDGE_PERCENTILE = 0.95
+DEFAULT_HEDGE_DELAY = 2.0
+DEFAULT_MIN_HEDGE_DELAY = 0.1
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_WINDOW = 200
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF = 0.2
+DEFAULT_MAX_BACKOFF = 2.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+REQUEST_HEDGES_TOTAL = metrics.counter(
+    "request_hedges_total", "Hedged duplicate requests sent, and how many of them won", ["policy", "result"]
+)
+REQUEST_RETRIES_TOTAL = metrics.counter(
+    "request_retries_total", "Requests retried after a retryable error", ["policy"]
+)
+REQUEST_BUDGET_EXHAUSTED_TOTAL = metrics.counter(
+    "request_budget_exhausted_total", "Requests that ran out of latency budget", ["policy"]
+)
+
+
+class BudgetExhaustedError(asyncio.TimeoutError):
+    """No answer within the latency budget."""
+
+
+def is_retryable(error: BaseException, statuses: Iterable[int] = RETRY_STATUSES) -> bool:
+    status = getattr(error, "status", None)
+    if status is not None:
+        return status in statuses
+    return isinstance(error, (ConnectionError, aiohttp.ClientConnectionError))
+
+
+class RequestPolicy:
+    def __init__(
+        self,
+        name: str = "default",
+        budget: float = DEFAULT_BUDGET,
+        hedge: bool = True,
+        hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+        min_hedge_delay: float = DEFAULT_MIN_HEDGE_DELAY,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        window: int = DEFAULT_WINDOW,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        retryable: Callable[[BaseException], bool] = is_retryable,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.budget = budget
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retryable = retryable
+        self._clock = clock
+        self._latencies: deque[float] = deque(maxlen=window)
+
+    @classmethod
+    def from_config(cls, config: Optional[dict], name: str = "default", prefix: str = "") -> "RequestPolicy":
+        """Build from `budget`, `hedge`, `max_retries`, ... keys, each optionally prefixed."""
+        config = config or {}
+        options = {
+            "budget": float,
+            "hedge": bool,
+            "hedge_percentile": float,
+            "hedge_delay": float,
+            "min_hedge_delay": float,
+            "min_samples": int,
+            "window": int,
+            "max_retries": int,
+            "backoff": float,
+            "max_backoff": float,
+        }
+        kwargs = {
+            option: convert(config[prefix + option])
+            for option, convert in options.items()
+            if config.get(prefix + option) is not None
+        }
+        return cls(name=name, **kwargs)
+
+    def observe(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def hedge_after(self) -> float:
+        """Seconds to wait for an attempt before sending its hedge."""
+        if len(self._latencies) < self.min_samples:
+            return self.initial_hedge_delay
+        return max(self.min_hedge_delay, float(np.quantile(self._latencies, self.hedge_percentile)))
+
+    def backoff_delay(self, retry: int) -> float:
+        # full jitter keeps retries of concurrent requests from arriving together
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**retry))
+
+    async def run(self, call: Callable[[float], Awaitable[T]]) -> T:
+        deadline = self._clock() + self.budget
+        retry = 0
+        while True:
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                REQUEST_BUDGET_EXHAUSTED_TOTAL.inc(policy=self.name)
+                raise BudgetExhaustedError(f"{self.name} request exceeded its {self.budget}s budget")
+            try:
+                return await self._attempt(call, deadline)
+            except BudgetExhaustedError:
+                raise
+            except Exception as e:
+                if retry >= self.max_retries or not self.retryable(e):
+                    raise
+                delay = self.backoff_delay(retry)
+                if self._clock() + delay >= deadline:
+                    raise
+                retry += 1
+                REQUEST_RETRIES_TOTAL.inc(policy=self.name)
+                logger.info(f"Retrying {self.name} request in {delay:.2f}s after: {e}")
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, call: Callable[[float], Awaitable[T]], deadline: float) -> T:
+        started = self._clock()
+        primary = asyncio.ensure_future(call(deadline - started))
+        tasks = [primary]
+        # a winning hedge is observed from its own start, not the primary's
+        task_started = {primary: started}
+        hedge_at = started + self.hedge_after() if self.hedge else None
+        error: Optional[BaseException] = None
+        try:
+            while tasks:
+                now = self._clock()
+                if now >= deadline:
+                    REQUEST_BUDGET_EXHAUSTED_TOTAL.inc(policy=self.name)
+                    raise BudgetExhaustedError(f"{self.name} request exceeded its {self.budget}s budget")
+                timeout = deadline - now
+                if hedge_at is not None:
+                    timeout = min(timeout, max(0.0, hedge_at - now))
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is None:
+                        self.observe(self._clock() - task_started[task])
+                        if task is not primary:
+                            REQUEST_HEDGES_TOTAL.inc(policy=self.name, result="won")
+                        return task.result()
+                    error = task.exception()
+                if tasks and hedge_at is not None and self._clock() >= hedge_at:
+                    # the first attempt is slower than usual, race a duplicate against it
+                    hedge_at = None
+                    REQUEST_HEDGES_TOTAL.inc(policy=self.name, result="sent")
+                    hedge_started = self._clock()
+                    hedge = asyncio.ensure_future(call(deadline - hedge_started))
+                    task_started[hedge] = hedge_started
+                    tasks.append(hedge)
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
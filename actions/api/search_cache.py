@@ -0,0 +1,198 @@
+"""Cache of knowledge base search responses.
+
+Entries are keyed by `search_cache_key` (project, endpoint type, number of
+results and the normalised query) and hold the parsed JSON response, so a hit
+skips the HTTP round-trip but still builds fresh result objects. Entries are
+ignored once they are older than `ttl` seconds.
+
+`MemorySearchCache` is an in-process LRU. `SQLiteSearchCache` adds a local
+SQLite file behind it, so cached responses survive restarts and are shared by
+processes opening the same path. Async callers use `aget`/`aput`, which run
+the SQLite queries in a worker thread. Another backend can be plugged in with its
+dotted class path. For the Kapa component the cache is configured under
+`vector_store` in endpoints.yml:
+
+    vector_store:
+      kapa_cache: sqlite          # memory (default), sqlite, off or a class path
+      kapa_cache_ttl: 3600
+      kapa_cache_max_entries: 1000
+      kapa_cache_path: .cache/kapa_search.db
+"""
+import asyncio
+import importlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from actions.api import server_hooks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_CACHE_PATH = os.path.join(tempfile.gettempdir(), "orchestrator_demo", "kapa_search.db")
+DEFAULT_SEARCH_CACHE_TTL = 3600.0
+DEFAULT_SEARCH_CACHE_MAX_ENTRIES = 1000
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def normalise_query(text: str) -> str:
+    """Fold case, punctuation and whitespace, so trivially different questions share a key."""
+    return " ".join(_PUNCTUATION_RE.sub(" ", text.lower()).split())
+
+
+def search_cache_key(project_id: str, endpoint_type: str, num_results: int, query: str) -> str:
+    return json.dumps([project_id, endpoint_type, int(num_results), normalise_query(query)])
+
+
+class SearchCache(ABC):
+    """Base class for search caches; entries older than `ttl` seconds are ignored."""
+
+    def __init__(self, ttl: float = DEFAULT_SEARCH_CACHE_TTL, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self._clock = clock
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, value: Any) -> None:
+        ...
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return self.get(key)
+
+    async def aput(self, key: str, value: Any) -> None:
+        self.put(key, value)
+
+    def close(self) -> None:
+        pass
+
+    def _fresh(self, stored: float) -> bool:
+        return stored > self._clock() - self.ttl
+
+
+class MemorySearchCache(SearchCache):
+    def __init__(
+        self,
+        ttl: float = DEFAULT_SEARCH_CACHE_TTL,
+        max_entries: int = DEFAULT_SEARCH_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(ttl, clock)
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not self._fresh(entry[0]):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, value: Any, stored: Optional[float] = None) -> None:
+        self._entries[key] = (self._clock() if stored is None else stored, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteSearchCache(MemorySearchCache):
+    """In-memory LRU in front of a SQLite file, responses must be JSON serialisable."""
+
+    _open: list["SQLiteSearchCache"] = []
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_SEARCH_CACHE_TTL,
+        max_entries: int = DEFAULT_SEARCH_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(ttl, max_entries, clock)
+        self.path = path or os.environ.get("KAPA_SEARCH_CACHE_DB", DEFAULT_SEARCH_CACHE_PATH)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # get/put run in worker threads, see aget/aput
+        self._lock = threading.RLock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                stored REAL NOT NULL
+            )"""
+        )
+        self._db.execute("DELETE FROM search_cache WHERE stored <= ?", (self._clock() - self.ttl,))
+        self._open.append(self)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = super().get(key)
+            if value is not None:
+                return value
+            row = self._db.execute("SELECT value, stored FROM search_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or not self._fresh(row[1]):
+                return None
+            value = json.loads(row[0])
+            super().put(key, value, stored=row[1])
+            return value
+
+    def put(self, key: str, value: Any, stored: Optional[float] = None) -> None:
+        stored = self._clock() if stored is None else stored
+        with self._lock:
+            super().put(key, value, stored=stored)
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), stored),
+            )
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, value: Any) -> None:
+        await asyncio.to_thread(self.put, key, value)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+        if self in self._open:
+            self._open.remove(self)
+
+
+@server_hooks.on_shutdown
+async def close_search_caches() -> None:
+    for cache in list(SQLiteSearchCache._open):
+        cache.close()
+
+
+def create_search_cache(config: dict, prefix: str = "kapa_") -> Optional[SearchCache]:
+    """Build the cache configured by `<prefix>cache*` keys, or None when it is turned off."""
+    store = str(config.get(f"{prefix}cache", "memory"))
+    if store.lower() in ("off", "none", "false"):
+        return None
+    ttl = float(config.get(f"{prefix}cache_ttl", DEFAULT_SEARCH_CACHE_TTL))
+    max_entries = int(config.get(f"{prefix}cache_max_entries", DEFAULT_SEARCH_CACHE_MAX_ENTRIES))
+    if ttl <= 0:
+        return None
+    if store == "memory":
+        return MemorySearchCache(ttl=ttl, max_entries=max_entries)
+    if store == "sqlite":
+        return SQLiteSearchCache(config.get(f"{prefix}cache_path"), ttl=ttl, max_entries=max_entries)
+    module_name, _, class_name = store.rpartition(".")
+    cache_class = getattr(importlib.import_module(module_name), class_name)
+    return cache_class(ttl=ttl)
@@ -0,0 +1,72 @@
+"""Action server lifecycle hooks.
+
+rasa_sdk builds its Sanic app after the actions package has been imported, so
+modules here cannot register listeners on it directly. Instead this module
+registers itself with the rasa_sdk plugin manager and attaches the collected
+callbacks once `attach_sanic_app_extensions` is fired for the new app.
+"""
+import logging
+import sys
+from typing import Any, Awaitable, Callable
+
+import pluggy
+
+logger = logging.getLogger(__name__)
+
+hookimpl = pluggy.HookimplMarker("rasa_sdk")
+
+ShutdownCallback = Callable[[], Awaitable[None]]
+AttachCallback = Callable[[Any], None]
+
+_shutdown_callbacks: list[ShutdownCallback] = []
+_attach_callbacks: list[AttachCallback] = []
+
+
+def on_shutdown(callback: ShutdownCallback) -> ShutdownCallback:
+    """Register a coroutine function to run when the action server stops."""
+    if callback not in _shutdown_callbacks:
+        _shutdown_callbacks.append(callback)
+    return callback
+
+
+def on_attach(callback: AttachCallback) -> AttachCallback:
+    """Register a function called with the Sanic app to add routes or middleware."""
+    if callback not in _attach_callbacks:
+        _attach_callbacks.append(callback)
+    return callback
+
+
+async def run_shutdown_callbacks() -> None:
+    for callback in list(_shutdown_callbacks):
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"Shutdown callback {callback.__qualname__} failed: {e}")
+
+
+@hookimpl
+def attach_sanic_app_extensions(app) -> None:
+    async def _after_server_stop(app, loop):
+        await run_shutdown_callbacks()
+
+    app.register_listener(_after_server_stop, "after_server_stop")
+    for callback in list(_attach_callbacks):
+        try:
+            callback(app)
+        except Exception as e:
+            logger.error(f"Attaching {callback.__qualname__} to the action server failed: {e}")
+
+
+def _register_plugin() -> None:
+    try:
+        from rasa_sdk.plugin import plugin_manager
+    except ImportError:
+        logger.debug("rasa_sdk plugin manager not available, server hooks disabled")
+        return
+    manager = plugin_manager()
+    module = sys.modules[__name__]
+    if not manager.is_registered(module):
+        manager.register(module)
+
+
+_register_plugin()
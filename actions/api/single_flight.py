@@ -0,0 +1,56 @@
+"""Coalescing of identical concurrent requests.
+
+`SingleFlight.do(key, fn)` runs `fn()` once per key at a time. Callers that
+arrive while a call for the same key is in flight wait for that call and get
+its result or its exception instead of starting their own. The shared call
+runs in its own task, so a caller being cancelled does not fail the others.
+Requests saved this way are counted in `single_flight_saved_total` by the
+`name` given to the `SingleFlight`.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from actions.api import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_CALLS_TOTAL = metrics.counter(
+    "single_flight_calls_total", "Upstream calls started by single-flight groups", ["name"]
+)
+SINGLE_FLIGHT_SAVED_TOTAL = metrics.counter(
+    "single_flight_saved_total", "Calls that joined an identical call already in flight", ["name"]
+)
+
+
+class SingleFlight:
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.saved = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            SINGLE_FLIGHT_CALLS_TOTAL.inc(name=self.name)
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.saved += 1
+            SINGLE_FLIGHT_SAVED_TOTAL.inc(name=self.name)
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # every waiter may have been cancelled, don't leave the exception unretrieved
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,165 @@
+"""Streaming partial bot messages to clients that support it.
+
+A custom action's reply only reaches the user once the whole action has
+finished. Rasa's own API cannot help here, because pushing events into a
+conversation waits for the lock that the running action holds. Instead, when
+`STREAMING_ENABLED` is set, the action server serves Server-Sent Events on
+
+    GET /stream/<sender_id>
+
+and actions publish partial text for that sender while they are still running.
+Each event is JSON: `{"event": "partial", "text": ...}` for every coalesced
+sentence and `{"event": "done", "text": <full answer>}` at the end. The final
+answer is still sent as a normal bot message, so channels without a stream
+subscriber behave exactly as before; streaming clients replace the partial
+text with it.
+
+The stream carries conversation content, so each subscription needs the
+conversation's token, an HMAC of the sender id under `STREAM_SECRET`, as
+`?token=` or in the `X-Stream-Token` header. Whatever hands out sender ids to
+clients (the channel or the web backend) computes it with `stream_token()`.
+Without a secret the endpoint is not served.
+
+Subscribers are kept in the memory of one process, so the stream is only
+served with a single Sanic worker (`ACTION_SERVER_SANIC_WORKERS=1`). With more
+workers the endpoint is not attached and every answer arrives as one message.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+from typing import AsyncIterator, Optional
+
+from rasa_sdk.utils import number_of_sanic_workers
+from sanic.response import HTTPResponse
+
+from actions.api import server_hooks
+from actions.api.coalescer import MessageCoalescer
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATH = "/stream/<sender_id>"
+HEARTBEAT_INTERVAL = 15.0
+DEFAULT_QUEUE_SIZE = 256
+TOKEN_HEADER = "X-Stream-Token"
+
+
+class StreamHub:
+    """Fan-out of published events to the SSE subscribers of each sender."""
+
+    def __init__(self, enabled: bool = False, queue_size: int = DEFAULT_QUEUE_SIZE, secret: str = ""):
+        self.enabled = enabled
+        self.queue_size = queue_size
+        self.secret = secret
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    def token_for(self, sender_id: str) -> str:
+        return hmac.new(self.secret.encode(), sender_id.encode(), hashlib.sha256).hexdigest()
+
+    def authorized(self, sender_id: str, token: Optional[str]) -> bool:
+        if not self.secret or not token:
+            return False
+        return hmac.compare_digest(self.token_for(sender_id), token)
+
+    def subscribe(self, sender_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(sender_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, sender_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(sender_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[sender_id]
+
+    def streaming_to(self, sender_id: str) -> bool:
+        return self.enabled and bool(self._subscribers.get(sender_id))
+
+    def publish(self, sender_id: str, event: dict) -> None:
+        for queue in list(self._subscribers.get(sender_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # a stalled client must not hold up the action, it still gets the final message
+                logger.warning(f"Dropping stream event for {sender_id}, subscriber is not reading")
+
+
+HUB = StreamHub(
+    enabled=os.environ.get("STREAMING_ENABLED", "").lower() in ("1", "true", "yes"),
+    secret=os.environ.get("STREAM_SECRET", ""),
+)
+
+
+def stream_token(sender_id: str) -> str:
+    """The token a client needs to subscribe to the stream of `sender_id`."""
+    return HUB.token_for(sender_id)
+
+
+async def stream_to_sender(
+    sender_id: str,
+    chunks: AsyncIterator[str],
+    max_chars: int = 400,
+    window: float = 0.0,
+    hub: Optional[StreamHub] = None,
+) -> str:
+    """
+    Publish `chunks` to the sender's stream subscribers, coalesced into whole
+    sentences (or `max_chars` pieces), and return the full text.
+    """
+    hub = hub or HUB
+    parts: list[str] = []
+    coalescer = MessageCoalescer(
+        emit=lambda text: hub.publish(sender_id, {"event": "partial", "text": text.strip()}),
+        max_chars=max_chars,
+        window=window,
+    )
+    async for chunk in chunks:
+        parts.append(chunk)
+        coalescer.add(sender_id, chunk, separator="")
+    coalescer.flush_all()
+    text = "".join(parts)
+    hub.publish(sender_id, {"event": "done", "text": text})
+    return text
+
+
+@server_hooks.on_attach
+def attach_stream_endpoint(app) -> None:
+    if not HUB.enabled:
+        return
+    if not HUB.secret:
+        logger.error("STREAMING_ENABLED is set without STREAM_SECRET, not serving the stream endpoint")
+        HUB.enabled = False
+        return
+    workers = number_of_sanic_workers()
+    if workers > 1:
+        # a subscriber and the action publishing for it would often land in different workers
+        logger.error(f"Streaming needs a single Sanic worker, not serving the stream endpoint with {workers}")
+        HUB.enabled = False
+        return
+
+    async def stream_endpoint(request, sender_id: str):
+        token = request.headers.get(TOKEN_HEADER) or request.args.get("token")
+        if not HUB.authorized(sender_id, token):
+            return HTTPResponse("Forbidden", status=403)
+        response = await request.respond(
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            content_type="text/event-stream",
+        )
+        queue = HUB.subscribe(sender_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    await response.send(": keep-alive\n\n")
+                    continue
+                await response.send(f"data: {json.dumps(event, ensure_ascii=False)}\n\n")
+        finally:
+            HUB.unsubscribe(sender_id, queue)
+
+    app.add_route(stream_endpoint, STREAM_PATH, methods=["GET"], name="stream")
+    logger.info(f"Streaming partial bot messages on {STREAM_PATH}")
@@ -0,0 +1,127 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Text
+
+from rasa_sdk import Action, Tracker
+from rasa_sdk.events import SlotSet
+from rasa_sdk.executor import CollectingDispatcher
+
+import structlog
+from actions.api import profiling, server_hooks, stream_hub
+from actions.api.answer_cache import AnswerCache
+from actions.api.rag import RAGSource, build_sources, load_config, load_source_configs
+
+# Configure structlog
+logger = structlog.get_logger()
+
+
+class RAGAction(Action, ABC):
+    """
+    Answer the latest user message from one knowledge source: search Kapa,
+    render the prompt template with the results and ask the LLM. Concrete
+    actions are created per source in rag.yml by `rag_action_class`.
+    """
+
+    source: RAGSource
+    answer_cache: Optional[AnswerCache] = None
+
+    @abstractmethod
+    def name(self) -> str:
+        ...
+
+    async def run(
+        self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[str, Any]
+    ) -> List[Dict[Text, Any]]:
+        events = []
+        events.append(SlotSet("return_value", "success"))
+        latest_message = tracker.latest_message["text"]
+        source = self.source
+
+        vector = None
+        if self.answer_cache is not None:
+            with profiling.span("answer_cache"):
+                cached, vector = await self.answer_cache.lookup(source.name, latest_message)
+            if cached is not None:
+                dispatcher.utter_message(text=cached)
+                return events
+
+        try:
+            with profiling.span("kapa_search"):
+                result = await source.search_api.search(query_string=latest_message)
+        except Exception as e:
+            logger.error(
+                "Error in KapaSearchAPI",
+                source=source.name,
+                error=str(e),
+                query=latest_message,
+            )
+            events.append(SlotSet("return_value", "failed"))
+            return events
+
+        try:
+            # Merge jinja2 template with results
+            with profiling.span("template_render"):
+                prompt = source.renderer.render(results=result, user_message=latest_message)
+            logger.debug("rag.prompt", source=source.name, prompt=prompt)
+
+            messages = [{"content": prompt, "role": "user"}]
+            with profiling.span("llm_completion"):
+                if stream_hub.HUB.streaming_to(tracker.sender_id):
+                    # the client listens on /stream/<sender_id>, send it the answer sentence by sentence
+                    content = await stream_hub.stream_to_sender(
+                        tracker.sender_id, source.llm.stream(model=source.model, messages=messages)
+                    )
+                else:
+                    # awaited off the event loop, bounded by LLM_MAX_CONCURRENCY and LLM_TIMEOUT
+                    response = await source.llm.complete(model=source.model, messages=messages)
+                    content = response.choices[0].message.content
+            dispatcher.utter_message(text=content)
+            if self.answer_cache is not None and content:
+                self.answer_cache.put(source.name, latest_message, content, vector)
+        except Exception as e:
+            logger.error(
+                "Error in litellm completion",
+                source=source.name,
+                error=str(e),
+                query=latest_message,
+            )
+            events.append(SlotSet("return_value", "failed"))
+
+        return events
+
+
+def rag_action_class(source: RAGSource, answer_cache: Optional[AnswerCache] = None) -> type:
+    """Create the action class of `source`, e.g. `KubernetesRAG` for source "kubernetes"."""
+    class_name = "".join(part.capitalize() for part in source.name.split("_")) + "RAG"
+    action_name = source.config.action
+    return type(
+        class_name,
+        (RAGAction,),
+        {
+            "source": source,
+            "answer_cache": answer_cache,
+            "name": lambda self: action_name,
+            "__module__": __name__,
+        },
+    )
+
+
+CONFIG = load_config()
+SOURCES = build_sources(load_source_configs(config=CONFIG))
+# one cache for all sources, answers are namespaced by source name
+ANSWER_CACHE = AnswerCache.from_config(CONFIG.get("answer_cache") or {})
+# module level names keep the classes alive for rasa_sdk's subclass scan
+for _source in SOURCES:
+    _action_class = rag_action_class(_source, ANSWER_CACHE)
+    globals()[_action_class.__name__] = _action_class
+
+
+@server_hooks.on_attach
+def warm_sources(app) -> None:
+    async def _warm(app, loop):
+        for source in SOURCES:
+            try:
+                source.warm()
+            except Exception as e:
+                logger.error("rag.warm_failed", source=source.name, error=str(e))
+
+    app.register_listener(_warm, "before_server_start")
@@ -1,13 +1,16 @@
 from typing import TYPE_CHECKING, Any, List, Text, Dict, Optional
 from dataclasses import dataclass
 
-import time
-import aiohttp
 import json
 import asyncio
 import urllib.parse
 
 import structlog
+from actions.api import metrics
+from actions.api.kapa_client import KapaHTTPError, get_kapa_client, query_url
+from actions.api.request_policy import RequestPolicy
+from actions.api.search_cache import create_search_cache, search_cache_key
+from actions.api.single_flight import SingleFlight
 from rasa.utils.endpoints import EndpointConfig
 from rasa.core.information_retrieval import (
     SearchResultList,
@@ -50,11 +53,19 @@ class Kapa(InformationRetrieval):
         embeddings: "Embeddings",
     ):
         structlogger.debug("kapa.__init__")
+        # the Rasa server has no /metrics route of its own, serve one if METRICS_PORT is set
+        metrics.start_http_server_from_env()
         self.embeddings = embeddings
         self.token = None
         self.url = None
         self.project_id = None
         self.endpoint_type = None
+        # pooled connections shared with the RAG actions, see actions/api/kapa_client.py
+        self.client = get_kapa_client()
+        self.cache = None
+        self.policy = None
+        # identical queries in flight at the same time share one Kapa request
+        self.single_flight = SingleFlight("kapa_component")
 
     def connect(self, config: EndpointConfig) -> None:
         """Setup to Kapa values."""
@@ -83,15 +94,19 @@ class Kapa(InformationRetrieval):
         if self.endpoint_type == "search":
             # Docs: https://docs.kapa.ai/api#tag/Search
             # https://api.kapa.ai/query/v1/projects/{project_id}/search/
-            self.url = f"https://api.kapa.ai/query/v1/projects/{self.project_id}/search/"
+            self.url = query_url(self.project_id, "search")
         if self.endpoint_type == "chat":
             # Docs: https://docs.kapa.ai/api#tag/Chat/operation/query_v1_projects_chat
             # https://api.kapa.ai/query/v1/projects/{project_id}/chat/
-            self.url = f"https://api.kapa.ai/query/v1/projects/{self.project_id}/chat/"
+            self.url = query_url(self.project_id, "chat")
         if kapa_args.get("kapa_num_results"):
             self.num_results = int(kapa_args.get("kapa_num_results"))
         else:
             self.num_results = 3
+        self.cache = create_search_cache(kapa_args)
+        # latency budget, hedging and retries for EnterpriseSearchPolicy lookups, kapa_budget etc. in endpoints.yml
+        self.policy = RequestPolicy.from_config(kapa_args, name="kapa_component", prefix="kapa_")
+        structlogger.debug("kapa.connect", cache=type(self.cache).__name__ if self.cache else None)
 
     def _create_chat_results(self, kapa_json: dict) -> SearchResultList:
         structlogger.debug("kapa._create_chat_results", kapa_json=kapa_json, type=type(kapa_json))
@@ -113,46 +128,26 @@ class Kapa(InformationRetrieval):
         
         return search_result_list
 
-    async def kapa_query_chat(self, query_string: str):
+    async def kapa_query_chat(self, query_string: str) -> dict:
+        """Query the chat endpoint, returns the JSON response for `_create_chat_results`."""
         structlogger.debug("kapa.kapa_query_chat", url=self.url, query_string=query_string)
-        headers = {
-            'X-API-KEY': self.token,
-            'Content-Type': 'application/json'
-        }
-        # set payload body, value for query to query_string
-        payload = json.dumps({
-            "query": query_string,
-            "num_results": self.num_results
-        })
-
         try:
-            start_time = time.time()
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.url, headers=headers, data=payload, timeout=18) as response:
-                    response_json = await response.json()
-                    # calc trans time in ms
-                    trans_time = (time.time() - start_time) * 1000
-                    structlogger.debug("kapa.kapa_query_chat.kapa_response", trans_time=trans_time, response_json=response_json, response_type=type(response_json), response_json_type=type(response_json))
-                    # Check if the response status is OK
-                    if response.status == 200:
-                        response = await response.json()  # Assuming the response is in JSON format
-                        answer = self._create_chat_results(response)
-                        return answer
-                    else:
-                        # Handle HTTP errors
-                        raise KapaInformationRetrievalException(
-                            f"Kapa search http error. HTTP Error when calling the knowledge base: {response.status}, url: {self.url}, headers: {headers}, response: {response}"
-                        ) from e
-                        return f"HTTP Error when calling the knowledge base"
-                    # return response_json
+            response = await self.client.query(
+                self.url, self.token, query_string, self.num_results, endpoint="chat", policy=self.policy
+            )
+            structlogger.debug("kapa.kapa_query_chat.kapa_response", response_json=response)
+            return response
+        except KapaHTTPError as e:
+            raise KapaInformationRetrievalException(
+                f"Kapa search http error. HTTP Error when calling the knowledge base: {e.status}, url: {self.url}, response: {e.body}"
+            ) from e
         except asyncio.TimeoutError as e:
-            # return "Kapa timeout"
             raise KapaInformationRetrievalException(
-                f"Kapa search timeout. Encountered error: {str(e)}, url: {self.url}, headers: {headers}"
+                f"Kapa search timeout. Encountered error: {str(e)}, url: {self.url}"
             ) from e
         except Exception as e:
             raise KapaInformationRetrievalException(
-                f"Kapa search failed. Encountered error: {str(e)}, url: {self.url}, headers: {headers}"
+                f"Kapa search failed. Encountered error: {str(e)}, url: {self.url}"
             ) from e
 
     @staticmethod
@@ -179,46 +174,26 @@ class Kapa(InformationRetrieval):
         )
         return results
 
-    async def kapa_query_search(self, query_string: str):
+    async def kapa_query_search(self, query_string: str) -> dict:
+        """Query the search endpoint, returns the JSON response for `_create_search_results`."""
         structlogger.debug("kapa.kapa_query_search", url=self.url, query_string=query_string)
-        headers = {
-            'X-API-KEY': self.token,
-            'Content-Type': 'application/json'
-        }
-        # set payload body, value for query to query_string
-        payload = json.dumps({
-            "query": query_string,
-            "num_results": self.num_results
-        })
-
         try:
-            start_time = time.time()
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.url, headers=headers, data=payload, timeout=18) as response:
-                    response_json = await response.json()
-                    # calc trans time in ms
-                    trans_time = (time.time() - start_time) * 1000
-                    structlogger.debug("kapa.kapa_query_search.kapa_response", trans_time=trans_time, response_json=response_json, response_type=type(response_json), response_json_type=type(response_json))
-                    # Check if the response status is OK
-                    if response.status == 200:
-                        response = await response.json()  # Assuming the response is in JSON format
-                        answer = self._create_search_results(response)
-                        return answer
-                    else:
-                        # Handle HTTP errors
-                        raise KapaInformationRetrievalException(
-                            f"Kapa search http error. HTTP Error when calling the knowledge base: {response.status}, url: {self.url}, headers: {headers}, response: {response}"
-                        ) from e
-                        return f"HTTP Error when calling the knowledge base"
-                    # return response_json
+            response = await self.client.query(
+                self.url, self.token, query_string, self.num_results, endpoint="search", policy=self.policy
+            )
+            structlogger.debug("kapa.kapa_query_search.kapa_response", response_json=response)
+            return response
+        except KapaHTTPError as e:
+            raise KapaInformationRetrievalException(
+                f"Kapa search http error. HTTP Error when calling the knowledge base: {e.status}, url: {self.url}, response: {e.body}"
+            ) from e
         except asyncio.TimeoutError as e:
-            # return "Kapa timeout"
             raise KapaInformationRetrievalException(
-                f"Kapa search timeout. Encountered error: {str(e)}, url: {self.url}, headers: {headers}"
+                f"Kapa search timeout. Encountered error: {str(e)}, url: {self.url}"
             ) from e
         except Exception as e:
             raise KapaInformationRetrievalException(
-                f"Kapa search failed. Encountered error: {str(e)}, url: {self.url}, headers: {headers}"
+                f"Kapa search failed. Encountered error: {str(e)}, url: {self.url}"
             ) from e
 
     async def search(
@@ -246,9 +221,29 @@ class Kapa(InformationRetrieval):
                 You can use the class method SearchResultList.from_document_list() to convert from a [Langchain Document](https://python.langchain.com/v0.2/docs/integrations/document_loaders/copypaste/) object type.
         """
         structlogger.debug("kapa.search", query=query)
+        key = search_cache_key(self.project_id, self.endpoint_type, self.num_results, query)
+        # SQLite backed caches query in a worker thread, off the Rasa server's event loop
+        response_json = await self.cache.aget(key) if self.cache is not None else None
+        if response_json is not None:
+            metrics.record_cache("kapa_search", "hit")
+        else:
+            if self.single_flight.in_flight(key):
+                metrics.record_cache("kapa_search", "coalesced")
+            elif self.cache is not None:
+                metrics.record_cache("kapa_search", "miss")
+            response_json = await self.single_flight.do(key, lambda: self._query_and_cache(key, query))
         if self.endpoint_type == "chat":
-            result = await self.kapa_query_chat(query)
+            result = self._create_chat_results(response_json)
         else:
-            result = await self.kapa_query_search(query)
+            result = self._create_search_results(response_json)
         structlogger.debug("kapa.search", result=result)
         return result
+
+    async def _query_and_cache(self, key: str, query: Text) -> dict:
+        if self.endpoint_type == "chat":
+            response_json = await self.kapa_query_chat(query)
+        else:
+            response_json = await self.kapa_query_search(query)
+        if self.cache is not None:
+            await self.cache.aput(key, response_json)
+        return response_json
@@ -0,0 +1,126 @@
+from typing import TYPE_CHECKING, Any, Text
+
+import asyncio
+
+import structlog
+from actions.api import metrics
+from actions.api.local_index import (
+    DEFAULT_ALPHA,
+    DEFAULT_NUM_RESULTS,
+    open_or_build_index,
+)
+from rasa.utils.endpoints import EndpointConfig
+from rasa.core.information_retrieval import (
+    SearchResult,
+    SearchResultList,
+    InformationRetrieval,
+    InformationRetrievalException,
+)
+
+if TYPE_CHECKING:
+    from langchain.schema.embeddings import Embeddings
+
+structlogger = structlog.get_logger()
+
+
+class LocalIndexInformationRetrievalException(InformationRetrievalException):
+    """Exception raised for errors in the local knowledge index."""
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+        super().__init__()
+
+    def __str__(self) -> str:
+        return self.base_message + self.message
+
+
+class LocalKnowledgeIndex(InformationRetrieval):
+    """Hybrid BM25 and vector search over a local index (see actions/api/local_index.py).
+
+    Answers without calling Kapa, so lookups stay in-process and work offline.
+    Configured under `vector_store` in endpoints.yml:
+
+        vector_store:
+          type: "components.local_index.LocalKnowledgeIndex"
+          index_path: .cache/knowledge_index
+          docs_path: docs/          # built from here when index_path has no index yet
+          num_results: 5
+          hybrid_alpha: 0.5         # weight of vector similarity against BM25
+    """
+
+    def __init__(
+        self,
+        embeddings: "Embeddings",
+    ):
+        structlogger.debug("local_index.__init__")
+        metrics.start_http_server_from_env()
+        self.embeddings = embeddings
+        self.index = None
+        self.use_vectors = False
+        self.num_results = DEFAULT_NUM_RESULTS
+        self.alpha = DEFAULT_ALPHA
+
+    def _embed_documents(self, texts):
+        return self.embeddings.embed_documents(list(texts))
+
+    def connect(self, config: EndpointConfig) -> None:
+        args = config.kwargs
+        structlogger.debug("local_index.connect", args=args)
+        index_path = args.get("index_path")
+        if not index_path:
+            raise LocalIndexInformationRetrievalException("index_path not set.")
+        embed = self._embed_documents if self.embeddings is not None else None
+        try:
+            self.index = open_or_build_index(
+                index_path,
+                args.get("docs_path"),
+                embed,
+                embedding_model=type(self.embeddings).__name__ if embed else "",
+                rebuild=bool(args.get("rebuild", False)),
+            )
+        except Exception as e:
+            raise LocalIndexInformationRetrievalException(
+                f"Local index could not be opened. index_path: {index_path}, error: {e}"
+            ) from e
+        self.use_vectors = embed is not None and self.index.vectors is not None
+        embedding_model = self.index.meta.get("embedding_model", "")
+        if self.use_vectors and embedding_model != type(self.embeddings).__name__:
+            # query vectors of another model are not comparable with the index's vectors
+            structlogger.warning(
+                "local_index.connect",
+                warning=f"index built with {embedding_model or 'an unknown model'}, "
+                f"not {type(self.embeddings).__name__}, searching with BM25 only. Set rebuild: true to re-embed it.",
+            )
+            self.use_vectors = False
+        self.num_results = int(args.get("num_results", DEFAULT_NUM_RESULTS))
+        self.alpha = float(args.get("hybrid_alpha", DEFAULT_ALPHA))
+        structlogger.debug(
+            "local_index.connect", chunks=len(self.index), vectors=self.use_vectors
+        )
+
+    async def search(
+        self, query: Text, tracker_state: dict[Text, Any], threshold: float = 0.0
+    ) -> SearchResultList:
+        structlogger.debug("local_index.search", query=query)
+        vector = None
+        if self.use_vectors:
+            # embedding models are CPU bound, keep them off the event loop
+            vector = await asyncio.to_thread(self.embeddings.embed_query, query)
+        hits = self.index.search(query, vector, self.num_results, self.alpha, threshold)
+        results = SearchResultList(
+            results=[
+                SearchResult(
+                    text=hit.chunk.content,
+                    metadata={
+                        "source_url": hit.chunk.source_url,
+                        "title": hit.chunk.title,
+                        "source_type": hit.chunk.source_type,
+                    },
+                    score=hit.score,
+                )
+                for hit in hits
+            ],
+            metadata={},
+        )
+        structlogger.debug("local_index.search", results=len(results.results))
+        return results
@@ -0,0 +1,52 @@
+import asyncio
+from pathlib import Path
+import sys
+
+import httpx
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.a2a_card_cache import CardCache, fetch_card
+
+AGENT_CARD = {
+    "name": "Currency Agent",
+    "description": "Converts currencies",
+    "url": "http://localhost:10000/",
+    "version": "1.0.0",
+    "capabilities": {"streaming": True},
+    "defaultInputModes": ["text"],
+    "defaultOutputModes": ["text"],
+    "skills": [],
+}
+
+
+def card_server(requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(
+            200, json=AGENT_CARD, headers={"etag": '"v1"', "cache-control": "max-age=60"}
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_fetch_card_revalidates_with_etag(tmp_path):
+    requests = []
+    client = card_server(requests)
+    cache = CardCache(str(tmp_path / "cards.json"))
+
+    entry = asyncio.run(fetch_card(client, "http://localhost:10000", "/.well-known/agent.json"))
+    assert entry.etag == '"v1"'
+    assert entry.max_age == 60
+    assert entry.agent_card.name == "Currency Agent"
+    cache.put("http://localhost:10000", entry)
+
+    # a new cache instance reads the last good card back from disk
+    cached = CardCache(str(tmp_path / "cards.json")).get("http://localhost:10000")
+    assert cached.is_fresh()
+    revalidated = asyncio.run(
+        fetch_card(client, "http://localhost:10000", "/.well-known/agent.json", cached=cached)
+    )
+    assert requests[-1].headers["if-none-match"] == '"v1"'
+    assert revalidated.card == cached.card
@@ -0,0 +1,102 @@
+import asyncio
+from pathlib import Path
+import sys
+import threading
+
+import pytest
+from a2a.types import Task, TaskState, TaskStatus
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.a2a import ActionA2A
+from actions.api.a2a_checkpoint import (
+    CheckpointStore,
+    InMemoryCheckpointStore,
+    SQLiteCheckpointStore,
+    TaskCheckpoint,
+    create_checkpoint_store,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sqlite_checkpoints_survive_reopening(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    store = SQLiteCheckpointStore(path)
+    store.put(TaskCheckpoint("user-1", "Currency Agent", "task-1", "ctx-1", "input-required"))
+    store.close()
+
+    reopened = SQLiteCheckpointStore(path)
+    checkpoint = reopened.get("user-1", "Currency Agent")
+    assert (checkpoint.task_id, checkpoint.context_id) == ("task-1", "ctx-1")
+    assert reopened.get("user-2", "Currency Agent") is None
+    reopened.delete("user-1", "Currency Agent")
+    assert reopened.get("user-1", "Currency Agent") is None
+    reopened.close()
+
+
+def test_expired_checkpoints_are_dropped():
+    clock = FakeClock()
+    store = InMemoryCheckpointStore(ttl=60, clock=clock)
+    store.put(TaskCheckpoint("user-1", "agent", "task-1"))
+    clock.now += 30
+    assert store.get("user-1", "agent").task_id == "task-1"
+    clock.now += 31
+    assert store.get("user-1", "agent") is None
+
+
+def test_store_is_chosen_from_config(tmp_path):
+    assert isinstance(create_checkpoint_store({"store": "memory"}), InMemoryCheckpointStore)
+    store = create_checkpoint_store(
+        {"store": "actions.api.a2a_checkpoint.SQLiteCheckpointStore", "path": str(tmp_path / "c.db"), "ttl": 5}
+    )
+    assert isinstance(store, SQLiteCheckpointStore) and store.ttl == 5
+    store.close()
+
+
+def test_checkpoint_store_is_abstract():
+    with pytest.raises(TypeError):
+        CheckpointStore()
+
+
+class RecordingStore(InMemoryCheckpointStore):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def delete(self, sender_id, agent_name):
+        self.calls.append(("delete", threading.current_thread() is threading.main_thread()))
+        super().delete(sender_id, agent_name)
+
+    def _put(self, checkpoint):
+        self.calls.append(("put", threading.current_thread() is threading.main_thread()))
+        super()._put(checkpoint)
+
+
+def test_action_checkpoints_off_the_event_loop_and_skips_needless_deletes():
+    action = ActionA2A()
+    store = action.checkpoints = RecordingStore()
+    waiting = Task(id="task-1", contextId="ctx-1", status=TaskStatus(state=TaskState.input_required))
+    done = Task(id="task-1", contextId="ctx-1", status=TaskStatus(state=TaskState.completed))
+
+    async def turns():
+        # a turn without a checkpoint does not touch the store
+        assert await action.resume_checkpoint("user-1", "agent", "completed") is None
+        await action.save_checkpoint("user-1", "agent", done)
+        assert store.calls == []
+
+        await action.save_checkpoint("user-1", "agent", waiting)
+        checkpoint = await action.resume_checkpoint("user-1", "agent", "input-required")
+        assert checkpoint.task_id == "task-1"
+        await action.save_checkpoint("user-1", "agent", done)
+        await action.save_checkpoint("user-1", "agent", done)
+
+    asyncio.run(turns())
+    # each store call ran in a worker thread
+    assert store.calls == [("put", False), ("delete", False)]
+    assert store.get("user-1", "agent") is None
@@ -0,0 +1,82 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from a2a.types import Message, TextPart
+from actions.a2a import ActionA2A
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.messages = []
+
+    def utter_message(self, text=None, **kwargs):
+        self.messages.append(text)
+
+
+class FakeAgent:
+    def __init__(self, reply, delay=0.0, tags=(), fail=False):
+        self.reply = reply
+        self.delay = delay
+        self.fail = fail
+        self.cancelled = False
+        self.agent_card = SimpleNamespace(skills=[SimpleNamespace(tags=list(tags))])
+
+    async def send_message(self, request, task_callback):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError("agent down")
+        return Message(role="agent", parts=[TextPart(text=self.reply)], messageId="m1")
+
+
+def make_action(**agents):
+    action = ActionA2A()
+    action.agents = agents
+    return action
+
+
+def run_fan_out(action, group):
+    dispatcher = FakeDispatcher()
+    events = asyncio.run(action.run_fan_out(dispatcher, group, "hello", "sender-1"))
+    return dispatcher.messages, {e["name"]: e["value"] for e in events}
+
+
+def test_merge_collects_replies_and_cancels_stragglers():
+    slow = FakeAgent("late", delay=5)
+    action = make_action(a=FakeAgent("from a"), b=FakeAgent("", fail=True), c=slow)
+    messages, slots = run_fan_out(action, {"name": "all", "agents": ["a", "b", "c"], "deadline": 0.2})
+    assert messages == ["from a"]
+    assert slots["a2a_status"] == "completed"
+    results = slots["a2a_fan_out_results"]
+    assert results["a"] == {"status": "completed", "text": "from a"}
+    assert results["b"]["status"] == "error"
+    assert results["c"]["status"] == "cancelled"
+    assert slow.cancelled
+
+
+def test_first_strategy_selects_by_skill_tag_and_stops_early():
+    slow = FakeAgent("slow rate", delay=5, tags=["Currency"])
+    action = make_action(
+        fast=FakeAgent("fast rate", delay=0.01, tags=["currency"]),
+        slow=slow,
+        other=FakeAgent("not asked"),
+    )
+    messages, slots = run_fan_out(
+        action, {"name": "any", "skill_tag": "currency", "strategy": "first", "deadline": 10}
+    )
+    assert messages == ["fast rate"]
+    assert set(slots["a2a_fan_out_results"]) == {"fast", "slow"}
+    assert slow.cancelled
+
+
+def test_no_reply_before_deadline_is_an_error():
+    action = make_action(a=FakeAgent("late", delay=5))
+    messages, slots = run_fan_out(action, {"name": "all", "agents": ["a"], "deadline": 0.05})
+    assert slots["a2a_status"] == "error"
+    assert len(messages) == 1
@@ -0,0 +1,102 @@
+import asyncio
+from pathlib import Path
+import sys
+import time
+
+import yaml
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions import a2a
+from actions.api.a2a_card_cache import CachedCard, CardCache
+from actions.api.a2a_health import AgentHealth, AgentHealthTracker, JitteredScheduler
+
+
+def test_agent_health_transitions():
+    tracker = AgentHealthTracker(degraded_latency=1.0, failure_threshold=2)
+    assert tracker.record_failure("agent", "refused").status == AgentHealth.down
+    assert tracker.record_success("agent", 0.1).status == AgentHealth.healthy
+    assert tracker.record_success("agent", 1.5).status == AgentHealth.degraded
+    assert tracker.record_failure("agent", "timeout").status == AgentHealth.degraded
+    assert tracker.record_failure("agent", "timeout").status == AgentHealth.down
+    assert tracker.snapshot()["agent"]["consecutive_failures"] == 2
+
+
+def test_scheduler_keeps_running_after_a_failed_refresh():
+    calls = []
+
+    async def refresh():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("registry down")
+
+    scheduler = JitteredScheduler("test_refresh", interval=0.01, jitter=0.5, callback=refresh)
+    assert all(0.005 <= scheduler.next_delay() <= 0.015 for _ in range(100))
+
+    async def run():
+        scheduler.start()
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        assert scheduler.running
+        await scheduler.stop()
+
+    asyncio.run(run())
+    assert len(calls) >= 3
+    assert not scheduler.running
+
+
+def agent_card(name, description):
+    return {
+        "name": name,
+        "description": description,
+        "url": f"http://{name}",
+        "version": "1.0",
+        "capabilities": {},
+        "defaultInputModes": ["text"],
+        "defaultOutputModes": ["text"],
+        "skills": [],
+    }
+
+
+def write_agents(path, names):
+    agents = [{"name": name, "base_url": f"http://{name}", "agent_card_path": "/card.json"} for name in names]
+    path.write_text(yaml.safe_dump({"remote_agents": agents}))
+
+
+def test_refresh_swaps_changed_cards_drops_removed_agents_and_survives_failures(tmp_path, monkeypatch):
+    cards = {name: agent_card(name, "v1") for name in ("alpha", "beta", "gamma")}
+    failing = set()
+
+    async def fake_fetch_card(client, base_url, agent_card_path, cached=None, http_kwargs=None):
+        name = base_url.removeprefix("http://")
+        if name in failing:
+            raise ConnectionError("refused")
+        return CachedCard(card=dict(cards[name]), fetched_at=time.time())
+
+    monkeypatch.setattr(a2a, "fetch_card", fake_fetch_card)
+    monkeypatch.chdir(tmp_path)
+    action = a2a.ActionA2A()
+    action.card_cache = CardCache(str(tmp_path / "cards.json"))
+
+    write_agents(tmp_path / "a2a.yml", ["alpha", "beta", "gamma"])
+    asyncio.run(action.refresh_agents())
+    alpha, beta = action.agents["alpha"], action.agents["beta"]
+    assert set(action.agents) == {"alpha", "beta", "gamma"}
+
+    # unchanged cards keep their connection
+    asyncio.run(action.refresh_agents())
+    assert action.agents["alpha"] is alpha
+
+    cards["alpha"] = agent_card("alpha", "v2")
+    failing.add("beta")
+    write_agents(tmp_path / "a2a.yml", ["alpha", "beta"])
+    asyncio.run(action.refresh_agents())
+
+    assert set(action.agents) == {"alpha", "beta"}
+    assert action.agents["alpha"] is not alpha
+    assert action.agents["alpha"].agent_card.description == "v2"
+    # the breaker outlives the swapped connection
+    assert action.agents["alpha"].breaker is alpha.breaker
+    # a failed poll keeps serving the current connection
+    assert action.agents["beta"] is beta
+    assert action.agent_health.get("beta").consecutive_failures == 1
+    assert "gamma" not in action.breakers and "gamma" not in action.agent_health.snapshot()
@@ -0,0 +1,104 @@
+import asyncio
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+from rasa_sdk.events import SlotSet
+from rasa_sdk.executor import CollectingDispatcher, Tracker
+
+sys.path.append(str(Path(__file__).parent.parent))
+from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from actions.a2a import ActionA2A
+from actions.api.a2a_router import SkillRouter, tokenize
+
+
+def card(name, description, skills, input_modes=("text",)):
+    return AgentCard(
+        name=name,
+        description=description,
+        url="http://localhost",
+        version="1.0",
+        capabilities=AgentCapabilities(),
+        defaultInputModes=list(input_modes),
+        defaultOutputModes=["text"],
+        skills=skills,
+    )
+
+
+CARDS = {
+    "Currency Agent": card(
+        "Currency Agent",
+        "Helps with exchange rates for currencies",
+        [AgentSkill(
+            id="convert", name="Currency Exchange Rates Tool",
+            description="Helps with exchange values between various currencies",
+            tags=["currency conversion", "currency exchange"],
+            examples=["What is exchange rate between USD and GBP?"],
+        )],
+    ),
+    "Reimbursement Agent": card(
+        "Reimbursement Agent",
+        "Handles the reimbursement process for employees",
+        [AgentSkill(
+            id="reimburse", name="Process Reimbursement Tool",
+            description="Helps with the reimbursement process given the amount and purpose",
+            tags=["reimbursement"],
+            examples=["Can you reimburse me $20 for my lunch with the clients?"],
+        )],
+    ),
+    "Image Agent": card(
+        "Image Agent",
+        "Generates images",
+        [AgentSkill(id="draw", name="Image generation", description="Draws pictures", tags=["image"])],
+        input_modes=("image/png",),
+    ),
+}
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("What are the exchange rates?") == ["exchange", "rate"]
+
+
+def test_routes_by_skill_keywords_and_records_decisions():
+    router = SkillRouter(min_score=0.2)
+    router.build(CARDS)
+
+    decision = router.route("please reimburse my taxi to the airport")
+    assert decision.agent == "Reimbursement Agent"
+    assert 0 < decision.score <= 1
+    assert decision.scores["Reimbursement Agent"] == decision.score
+
+    assert router.route("how many euros is 100 dollars, what's the exchange rate").agent == "Currency Agent"
+    # text messages are never routed to an agent that only accepts images
+    assert "Image Agent" not in router.route("generate an image").scores
+    assert router.route("tell me a joke").agent is None
+    assert len(router.decisions) == 4
+
+
+def test_embeddings_are_blended_into_the_score():
+    # fake embedding: a fixed direction per agent, queries mentioning "money" point at currency
+    def embed(texts):
+        return np.array([[1.0, 0.0] if ("exchange" in t or "money" in t) else [0.0, 1.0] for t in texts])
+
+    router = SkillRouter(min_score=0.3, embed=embed, embedding_weight=0.8)
+    router.build({name: c for name, c in CARDS.items() if name != "Image Agent"})
+    decision = router.route("I need money")
+    assert decision.method == "hybrid"
+    assert decision.agent == "Currency Agent"
+
+
+def test_auto_routed_message_that_matches_no_agent_gets_an_answer():
+    action = ActionA2A()
+    action.agents = {name: SimpleNamespace(agent_card=c) for name, c in CARDS.items()}
+    action.router.build(CARDS)
+    tracker = Tracker(
+        "sender-1", {"a2a_agent_name": "auto"}, {"text": "tell me a joke"}, [], False, None, {}, "action_listen"
+    )
+    dispatcher = CollectingDispatcher()
+
+    events = asyncio.run(action._run(dispatcher, tracker, {}))
+
+    assert [m["response"] for m in dispatcher.messages] == ["utter_no_a2a_agent"]
+    assert events[-1] == SlotSet("a2a_status", "error")
+    assert not any(event["name"] == "a2a_agent_name" for event in events)
@@ -0,0 +1,63 @@
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.a2a import DEFAULT_SESSION_ID, ActionA2A, _current_session
+from actions.api.a2a_session import SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sessions_are_isolated_per_sender():
+    store = SessionStore()
+    alice = store.acquire("alice")
+    bob = store.acquire("bob")
+    alice.task_map["m1"] = "t1"
+    assert bob.task_map == {}
+    assert store.get("alice") is alice
+    store.release(alice)
+    store.release(bob)
+    assert alice.dispatcher is None
+
+
+def test_sessions_are_evicted_by_ttl_count_and_size():
+    clock = FakeClock()
+    store = SessionStore(max_sessions=2, ttl=100, clock=clock)
+    for sender_id in ["a", "b", "c"]:
+        store.release(store.acquire(sender_id))
+    assert "a" not in store and len(store) == 2
+
+    clock.now = 150
+    store.release(store.acquire("d"))
+    assert "b" not in store and "c" not in store and "d" in store
+
+    store.max_bytes = 0
+    busy = store.acquire("e")
+    store.evict()
+    # sessions inside run() are never evicted
+    assert "e" in store and "d" not in store
+    store.release(busy)
+
+
+def test_concurrent_run_keeps_its_dispatcher_until_the_last_release():
+    store = SessionStore()
+    first = store.acquire("alice")
+    second = store.acquire("alice")
+    first.dispatcher = dispatcher = object()
+
+    store.release(first)
+    assert second.dispatcher is dispatcher
+    store.release(second)
+    assert second.dispatcher is None
+
+
+def test_session_lookup_outside_run_does_not_leak_into_the_context():
+    action = ActionA2A()
+    assert action.session is action.sessions.get(DEFAULT_SESSION_ID)
+    assert _current_session.get() is None
@@ -0,0 +1,59 @@
+from pathlib import Path
+import sys
+
+from a2a.types import Message, Part, Role, Task, TaskState, TaskStatus, TextPart
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.a2a_task_store import TaskStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_task(task_id, context_id="ctx-1", history=None):
+    return Task(
+        id=task_id,
+        contextId=context_id,
+        status=TaskStatus(state=TaskState.working),
+        history=history,
+    )
+
+
+def make_message(message_id):
+    return Message(
+        role=Role.agent,
+        parts=[Part(root=TextPart(text="hi"))],
+        messageId=message_id,
+        metadata={"message_id": message_id},
+    )
+
+
+def test_task_store_indexes_tasks_and_messages():
+    store = TaskStore()
+    store.put(make_task("t1", history=[make_message("m1")]))
+    store.put(make_task("t2"))
+    store.put(make_task("t3", context_id="ctx-2"))
+
+    assert store.get("t1").id == "t1"
+    assert {t.id for t in store.by_context("ctx-1")} == {"t1", "t2"}
+    assert store.has_message("t1", "m1")
+    assert not store.has_message("t2", "m1")
+    store.add_message_id("t2", "m2")
+    assert store.has_message("t2", "m2")
+
+
+def test_task_store_evicts_idle_tasks():
+    clock = FakeClock()
+    store = TaskStore(ttl=10, clock=clock)
+    store.put(make_task("old"))
+    clock.now = 5
+    store.put(make_task("recent"))
+    clock.now = 12
+    assert store.evict_expired() == 1
+    assert "old" not in store
+    assert store.by_context("ctx-1")[0].id == "recent"
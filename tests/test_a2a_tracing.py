@@ -0,0 +1,35 @@
+import asyncio
+import json
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.a2a_tracing import A2ATracer
+from actions.api.event_log import close_jsonl_files
+
+
+def test_tracer_is_lazy_and_payloads_are_opt_in(tmp_path):
+    calls = []
+
+    def payload():
+        calls.append(1)
+        return {"big": "dump"}
+
+    A2ATracer().trace("status_update", "Currency Agent", payload=payload)
+    assert calls == []
+
+    sink = tmp_path / "trace.jsonl"
+    tracer = A2ATracer.from_config(
+        {"sink_path": str(sink), "sample_rates": {"dispatch": 0.0}},
+        [{"name": "Reimbursement Agent", "trace_payloads": True}, {"name": "Currency Agent"}],
+    )
+    tracer.trace("status_update", "Currency Agent", state="working", payload=payload)
+    tracer.trace("status_update", "Reimbursement Agent", state="working", payload=payload)
+    tracer.trace("dispatch", "Reimbursement Agent", payload=payload)
+    asyncio.run(close_jsonl_files())
+
+    records = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert len(records) == 2
+    assert "payload" not in records[0]
+    assert records[1]["payload"] == {"big": "dump"}
+    assert calls == [1]
@@ -0,0 +1,28 @@
+import asyncio
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.a2a_transport import A2ATransport, AgentTransportConfig
+
+
+def test_agent_transport_config_from_dict():
+    config = AgentTransportConfig.from_dict(
+        {"name": "Currency Agent", "read_timeout": 12, "max_connections": 4}
+    )
+    assert config.read_timeout == 12
+    assert config.max_connections == 4
+    assert config.timeout.read == 12
+    assert config.timeout.connect == AgentTransportConfig.connect_timeout
+
+
+def test_agents_with_same_limits_share_a_pool():
+    transport = A2ATransport()
+    fast = transport.client_for(AgentTransportConfig(read_timeout=5))
+    slow = transport.client_for(AgentTransportConfig(read_timeout=60))
+    small = transport.client_for(AgentTransportConfig(max_connections=2))
+    assert fast is slow
+    assert small is not fast
+    assert len(transport.metrics()) == 2
+    asyncio.run(transport.aclose())
+    assert fast.is_closed and small.is_closed
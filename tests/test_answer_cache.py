@@ -0,0 +1,75 @@
+import asyncio
+import gc
+from pathlib import Path
+import sys
+import weakref
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.answer_cache import AnswerCache, normalise_query
+from actions.api.metrics import CACHE_REQUESTS_TOTAL
+
+VOCABULARY = ["show", "list", "running", "pods", "delete", "deployment", "kubectl"]
+
+
+def embed(texts):
+    # bag of words over a tiny vocabulary, "show" and "list" count as the same word
+    vectors = []
+    for text in texts:
+        words = normalise_query(text).replace("list", "show").split()
+        vectors.append([words.count(word) for word in VOCABULARY])
+    return np.array(vectors, dtype=np.float32)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_exact_match_on_normalised_question():
+    cache = AnswerCache()
+    cache.put("kubernetes", "How do I show running pods?", "kubectl get pods")
+
+    hits = CACHE_REQUESTS_TOTAL.value(cache="rag_answer", result="hit")
+    assert asyncio.run(cache.lookup("kubernetes", "  how do i SHOW running pods ")) == ("kubectl get pods", None)
+    assert CACHE_REQUESTS_TOTAL.value(cache="rag_answer", result="hit") == hits + 1
+    # namespaces are separate
+    assert asyncio.run(cache.lookup("rasa", "How do I show running pods?"))[0] is None
+
+
+def test_similar_question_hits_the_semantic_level():
+    cache = AnswerCache(embed=embed, threshold=0.9)
+    answer, vector = asyncio.run(cache.lookup("kubernetes", "show running pods"))
+    assert answer is None
+    cache.put("kubernetes", "show running pods", "kubectl get pods", vector)
+
+    assert asyncio.run(cache.lookup("kubernetes", "list running pods"))[0] == "kubectl get pods"
+    assert asyncio.run(cache.lookup("kubernetes", "delete deployment"))[0] is None
+
+
+def test_entries_expire_and_least_recently_used_are_evicted():
+    clock = FakeClock()
+    cache = AnswerCache(max_entries=2, ttl=60, embed=embed, clock=clock)
+    for question in ("show pods", "delete deployment"):
+        cache.put("kubernetes", question, f"answer to {question}", cache.embed_query(question))
+    assert cache.get_exact("kubernetes", "show pods") is not None
+    cache.put("kubernetes", "kubectl", "answer to kubectl", cache.embed_query("kubectl"))
+
+    assert len(cache) == 2
+    assert cache.get_exact("kubernetes", "delete deployment") is None
+    assert cache.get_similar("kubernetes", cache.embed_query("delete deployment")) is None
+    assert cache.get_similar("kubernetes", cache.embed_query("list pods")).answer == "answer to show pods"
+
+    clock.now += 61
+    assert cache.get_exact("kubernetes", "kubectl") is None
+    assert cache.get_similar("kubernetes", cache.embed_query("list pods")) is None
+
+
+def test_caches_are_not_kept_alive_by_the_metrics_registry():
+    cache = weakref.ref(AnswerCache())
+    gc.collect()
+    assert cache() is None
@@ -0,0 +1,146 @@
+import base64
+from pathlib import Path
+import sys
+
+import pytest
+from a2a.types import (
+    Artifact,
+    FilePart,
+    FileWithBytes,
+    Part,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.a2a import ActionA2A
+from actions.api.artifact_assembler import ArtifactAssembler, ArtifactTooLarge
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def text_chunk(text, artifact_id="a1"):
+    return Artifact(artifactId=artifact_id, name="answer", parts=[Part(root=TextPart(text=text))])
+
+
+def file_chunk(data: bytes):
+    return encoded_file_chunk(base64.b64encode(data).decode())
+
+
+def encoded_file_chunk(encoded: str):
+    file = FileWithBytes(bytes=encoded, name="form.pdf", mimeType="application/pdf")
+    return Artifact(artifactId="f1", parts=[Part(root=FilePart(file=file))])
+
+
+def test_chunks_are_assembled_into_one_artifact():
+    assembler = ArtifactAssembler(spool_threshold=4)
+    assembler.start(text_chunk("Hello "))
+    assembler.append(text_chunk("world"))
+    artifact = assembler.finish("a1")
+    assert artifact.name == "answer"
+    assert [p.root.text for p in artifact.parts] == ["Hello world"]
+
+    assembler.start(file_chunk(b"%PDF"))
+    assembler.append(file_chunk(b"-1.7 body"))
+    artifact = assembler.finish("f1")
+    assert base64.b64decode(artifact.parts[0].root.file.bytes) == b"%PDF-1.7 body"
+    assert len(assembler) == 0
+
+
+def test_budget_and_timeout_drop_partial_artifacts():
+    clock = FakeClock()
+    assembler = ArtifactAssembler(max_bytes=8, timeout=10, clock=clock)
+    assembler.start(text_chunk("12345"))
+    with pytest.raises(ArtifactTooLarge):
+        assembler.append(text_chunk("67890"))
+    assert "a1" not in assembler
+
+    assembler.start(text_chunk("abc", artifact_id="a2"))
+    clock.now = 11
+    assert assembler.expire() == ["a2"]
+
+
+def test_chunks_of_a_dropped_artifact_are_ignored_until_last_chunk():
+    assembler = ArtifactAssembler(max_bytes=8)
+    assembler.start(text_chunk("12345"))
+    with pytest.raises(ArtifactTooLarge):
+        assembler.append(text_chunk("67890"))
+
+    # the tail must not start a new, truncated artifact
+    assembler.append(text_chunk("tail"))
+    assert "a1" not in assembler and assembler.dropped("a1")
+    assert assembler.finish("a1") is None
+    assert not assembler.dropped("a1")
+
+    # a new first chunk under the same id is a new artifact
+    assembler.start(text_chunk("new"))
+    assert [p.root.text for p in assembler.finish("a1").parts] == ["new"]
+
+
+def test_chunks_of_an_expired_artifact_are_ignored_until_last_chunk():
+    clock = FakeClock()
+    assembler = ArtifactAssembler(timeout=10, clock=clock)
+    assembler.start(text_chunk("head "))
+    clock.now = 11
+
+    assembler.append(text_chunk("tail"))
+    assert "a1" not in assembler
+    assert assembler.finish("a1") is None
+
+
+def test_dropped_ids_are_bounded():
+    assembler = ArtifactAssembler(max_bytes=1, max_dropped=2)
+    for artifact_id in ("a1", "a2", "a3"):
+        with pytest.raises(ArtifactTooLarge):
+            assembler.start(text_chunk("too long", artifact_id=artifact_id))
+
+    assert [assembler.dropped(aid) for aid in ("a1", "a2", "a3")] == [False, True, True]
+
+
+def test_file_chunks_may_split_base64_groups():
+    encoded = base64.b64encode(b"%PDF-1.7 a body of unaligned chunks").decode()
+    assembler = ArtifactAssembler()
+    assembler.start(encoded_file_chunk(encoded[:7]))
+    for start in range(7, len(encoded), 5):
+        assembler.append(encoded_file_chunk(encoded[start:start + 5]))
+
+    artifact = assembler.finish("f1")
+    assert base64.b64decode(artifact.parts[0].root.file.bytes) == b"%PDF-1.7 a body of unaligned chunks"
+
+
+def test_invalid_base64_drops_the_artifact():
+    assembler = ArtifactAssembler()
+    assembler.start(file_chunk(b"%PDF"))
+    assembler.append(encoded_file_chunk("not base64!"))
+    assembler.append(encoded_file_chunk("AAAA"))
+    assert "f1" not in assembler and assembler.dropped("f1")
+    assert assembler.finish("f1") is None
+
+    # an incomplete group left at the end is not silently cut off
+    assembler.start(encoded_file_chunk("JVBERi0"))
+    assert assembler.finish("f1") is None
+
+
+def test_a_malformed_chunk_does_not_end_the_run():
+    action = ActionA2A()
+    task = Task(id="task-1", contextId="ctx-1", status=TaskStatus(state=TaskState.working))
+
+    def event(artifact, append, last):
+        return TaskArtifactUpdateEvent(
+            taskId="task-1", contextId="ctx-1", artifact=artifact, append=append, lastChunk=last
+        )
+
+    action.process_artifact_event(task, event(encoded_file_chunk("JVBER"), append=False, last=False))
+    action.process_artifact_event(task, event(encoded_file_chunk("g=="), append=True, last=False))
+    action.process_artifact_event(task, event(encoded_file_chunk("not base64!"), append=True, last=False))
+    action.process_artifact_event(task, event(encoded_file_chunk("AAAA"), append=True, last=True))
+    assert not task.artifacts
@@ -0,0 +1,121 @@
+import asyncio
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+from a2a.types import AgentCapabilities, AgentCard
+from actions.a2a import RemoteAgentConnections, build_request
+from actions.api.circuit_breaker import CircuitBreaker, CircuitBreakerConfig, CircuitState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_consecutive_failures_open_the_circuit_until_a_probe_succeeds():
+    clock = FakeClock()
+    breaker = CircuitBreaker("agent", CircuitBreakerConfig(consecutive_failures=2, open_timeout=30), clock)
+    breaker.record_failure(1.0, "refused")
+    assert breaker.allow()
+    breaker.record_failure(1.0, "refused")
+    assert breaker.state == CircuitState.open
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitState.half_open
+    # only one probe at a time
+    assert not breaker.allow()
+    breaker.record_failure(1.0, "still down")
+    assert breaker.state == CircuitState.open
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success(0.2)
+    assert breaker.state == CircuitState.closed
+    assert breaker.snapshot()["opened"] == 2
+    assert breaker.snapshot()["rejected"] == 2
+
+
+def test_error_rate_opens_once_enough_requests_are_seen():
+    config = CircuitBreakerConfig(min_requests=4, error_rate=0.5, consecutive_failures=10)
+    breaker = CircuitBreaker("agent", config)
+    for ok in [True, False, True]:
+        breaker.record_success(0.1) if ok else breaker.record_failure(0.1)
+    assert breaker.state == CircuitState.closed
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitState.open
+
+
+def test_timeout_adapts_to_p99_latency():
+    config = CircuitBreakerConfig(min_requests=5, min_timeout=1.0, max_timeout=60.0, timeout_multiplier=2.0)
+    breaker = CircuitBreaker("agent", config)
+    assert breaker.timeout() == 60.0
+    for latency in [0.5, 0.6, 0.7, 0.8, 2.0]:
+        breaker.record_success(latency)
+    assert breaker.timeout() == 4.0
+    breaker.record_success(0.1)
+    assert breaker.timeout() == 4.0
+
+
+def test_config_from_dict_casts_values():
+    config = CircuitBreakerConfig.from_dict({"window": "20", "open_timeout": 5})
+    assert config.window == 20 and config.open_timeout == 5.0 and config.min_requests == 10
+
+
+class FakeStreamingClient:
+    def __init__(self, gaps, error=None):
+        self.gaps = gaps
+        self.error = error
+
+    async def send_message_streaming(self, request, http_kwargs=None):
+        for i, gap in enumerate(self.gaps):
+            await asyncio.sleep(gap)
+            if self.error is not None:
+                raise self.error
+            yield SimpleNamespace(root=SimpleNamespace(result=SimpleNamespace(final=i == len(self.gaps) - 1)))
+
+
+def streaming_connection(client, breaker=None):
+    card = AgentCard(
+        name="Streaming Agent",
+        description="streams",
+        url="http://localhost",
+        version="1.0",
+        capabilities=AgentCapabilities(streaming=True),
+        defaultInputModes=["text"],
+        defaultOutputModes=["text"],
+        skills=[],
+    )
+    connection = RemoteAgentConnections(card, breaker=breaker)
+    connection.client = client
+    return connection
+
+
+def test_stream_timeout_applies_to_the_gap_between_events():
+    config = CircuitBreakerConfig(min_timeout=0.15, max_timeout=0.15)
+    breaker = CircuitBreaker("agent", config)
+    # a healthy stream running longer than the timeout in total
+    connection = streaming_connection(FakeStreamingClient([0.05] * 6), breaker)
+    asyncio.run(connection.send_message(build_request("hi", "user-1"), None))
+    assert breaker.snapshot()["requests"] == 1 and breaker.snapshot()["consecutive_failures"] == 0
+    # the reported latency is the longest wait for an event, not the stream duration
+    assert max(breaker._latencies) < 0.15
+
+    stalled = streaming_connection(FakeStreamingClient([0.05, 0.5]), breaker)
+    with pytest.raises(TimeoutError, match="no stream event within 0.1s"):
+        asyncio.run(stalled.send_message(build_request("hi", "user-1"), None))
+    assert breaker.snapshot()["consecutive_failures"] == 1
+
+
+def test_timeouts_raised_inside_the_exchange_keep_their_error_without_a_breaker():
+    connection = streaming_connection(FakeStreamingClient([0], error=TimeoutError("upstream read timeout")))
+    with pytest.raises(TimeoutError, match="upstream read timeout"):
+        asyncio.run(connection.send_message(build_request("hi", "user-1"), None))
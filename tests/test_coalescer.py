@@ -0,0 +1,51 @@
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.coalescer import MessageCoalescer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_chunks_are_sent_as_one_message_per_reply():
+    sent = []
+    coalescer = MessageCoalescer(sent.append)
+    for chunk in ["The rate ", "is 0.92 ", "EUR per USD."]:
+        coalescer.add("task-1", chunk, separator="")
+    coalescer.add("task-2", "Other task")
+    assert sent == []
+    coalescer.flush("task-1")
+    assert sent == ["The rate is 0.92 EUR per USD."]
+    coalescer.flush_all()
+    assert sent[-1] == "Other task"
+    assert (coalescer.chunks_in, coalescer.messages_out) == (4, 2)
+
+
+def test_size_and_window_flush_at_sentence_boundaries():
+    sent = []
+    clock = FakeClock()
+    coalescer = MessageCoalescer(sent.append, max_chars=20, window=1.0, clock=clock)
+    coalescer.add("t", "First sentence. Second", separator="")
+    assert sent == ["First sentence."]
+
+    coalescer.add("t", " part", separator="")
+    clock.now = 2.0
+    coalescer.add("t", " goes on", separator="")
+    # window elapsed but no sentence end yet
+    assert sent == ["First sentence."]
+    coalescer.add("t", ". Done", separator="")
+    assert sent == ["First sentence.", "Second part goes on."]
+
+
+def test_disabled_coalescer_passes_chunks_through():
+    sent = []
+    coalescer = MessageCoalescer(sent.append, enabled=False)
+    coalescer.add("t", "a")
+    coalescer.add("t", "b")
+    assert sent == ["a", "b"]
@@ -0,0 +1,43 @@
+import asyncio
+import json
+from pathlib import Path
+import sys
+
+from a2a.types import Message, Part, Role, TextPart
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.a2a import Event
+from actions.api.event_log import EventLog, RingBuffer, close_jsonl_files
+
+
+def make_event(i, actor="Currency Agent"):
+    return Event(
+        id=f"e{i}",
+        actor=actor,
+        content=Message(role=Role.agent, parts=[Part(root=TextPart(text=str(i)))], messageId=f"m{i}"),
+        timestamp=float(i),
+    )
+
+
+def test_ring_buffer_keeps_newest_items():
+    buffer = RingBuffer(3, key=lambda x: x)
+    dropped = [buffer.append(i) for i in range(5)]
+    assert dropped == [None, None, None, 0, 1]
+    assert list(buffer) == [2, 3, 4]
+    assert buffer.last(2) == [3, 4]
+    assert buffer.since(3) == [3, 4]
+    assert buffer.since(10) == []
+
+
+def test_event_log_spills_old_events(tmp_path):
+    spill_path = tmp_path / "events.jsonl"
+    log = EventLog(capacity=2, spill_path=str(spill_path), session_id="alice")
+    for i in range(3):
+        log.append(make_event(i, actor="A" if i % 2 else "B"))
+    assert [e.id for e in log] == ["e1", "e2"]
+    assert [e.id for e in log.for_actor("B")] == ["e0", "e2"]
+    assert [e.id for e in log.since(2, actor="B")] == ["e2"]
+
+    asyncio.run(close_jsonl_files())
+    spilled = [json.loads(line) for line in spill_path.read_text().splitlines()]
+    assert [(r["id"], r["session_id"]) for r in spilled] == [("e0", "alice")]
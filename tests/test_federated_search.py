@@ -0,0 +1,136 @@
+import asyncio
+import json
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.federated_search import (
+    FEDERATED_SEARCH_SOURCES_TOTAL,
+    FederatedMember,
+    FederatedSearch,
+    FederatedSearchError,
+    reciprocal_rank_fusion,
+)
+from actions.api.rag import RAGSource, RAGSourceConfig, build_sources
+
+
+class FakeSearch:
+    def __init__(self, results, delay=0.0, error=None):
+        self.results = results
+        self.delay = delay
+        self.error = error
+        self.queries = []
+
+    async def search_results(self, query_string):
+        self.queries.append(query_string)
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+
+def doc(url, content=None):
+    return {"source_url": url, "content": content or f"content of {url}", "title": url}
+
+
+def test_rrf_rewards_results_found_by_several_sources():
+    fused = reciprocal_rank_fusion(
+        {
+            "rasa": [doc("rasa/deploy"), doc("shared/helm"), doc("rasa/nlu")],
+            "kubernetes": [doc("k8s/pods"), doc("shared/helm", "another chunk")],
+        },
+        k=60,
+    )
+
+    assert [result["source_url"] for result in fused] == ["shared/helm", "rasa/deploy", "k8s/pods", "rasa/nlu"]
+    helm = fused[0]
+    assert helm["rrf_score"] == pytest.approx(1 / 62 + 1 / 62)
+    # deduplicated, keeping the best ranked occurrence
+    assert helm["content"] == "content of shared/helm"
+    assert helm["knowledge_sources"] == ["rasa", "kubernetes"]
+
+
+def test_rrf_dedupes_within_a_source_and_limits_results():
+    fused = reciprocal_rank_fusion({"rasa": [doc("a"), doc("a", "second chunk"), doc("b"), {"content": "no url"}]}, num_results=2)
+
+    assert [result["source_url"] for result in fused] == ["a", "b"]
+    assert fused[0]["rrf_score"] == pytest.approx(1 / 61)
+
+
+def test_sources_are_queried_concurrently_and_slow_ones_dropped():
+    rasa = FakeSearch([doc("rasa/deploy")], delay=0.05)
+    kubernetes = FakeSearch([doc("k8s/pods")], delay=0.05)
+    slow = FakeSearch([doc("slow/answer")], delay=5)
+    search = FederatedSearch(
+        "rasa_kubernetes",
+        [
+            FederatedMember("rasa", rasa, deadline=1),
+            FederatedMember("kubernetes", kubernetes, deadline=1),
+            FederatedMember("slow", slow, deadline=0.2),
+        ],
+    )
+    timeouts = FEDERATED_SEARCH_SOURCES_TOTAL.value(search="rasa_kubernetes", source="slow", outcome="timeout")
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = json.loads(await search.search("deploy rasa on kubernetes"))
+        return results, loop.time() - started
+
+    results, elapsed = asyncio.run(run())
+    assert {result["source_url"] for result in results} == {"rasa/deploy", "k8s/pods"}
+    assert elapsed < 0.5
+    assert rasa.queries == kubernetes.queries == slow.queries == ["deploy rasa on kubernetes"]
+    assert FEDERATED_SEARCH_SOURCES_TOTAL.value(search="rasa_kubernetes", source="slow", outcome="timeout") == timeouts + 1
+
+
+def test_failing_sources_are_left_out_until_none_answers():
+    ok = FakeSearch([doc("rasa/deploy")])
+    broken = FakeSearch([], error=ConnectionError("down"))
+    search = FederatedSearch("partial", [FederatedMember("rasa", ok), FederatedMember("kubernetes", broken)])
+
+    assert [result["source_url"] for result in asyncio.run(search.search_results("q"))] == ["rasa/deploy"]
+
+    with pytest.raises(FederatedSearchError):
+        asyncio.run(FederatedSearch("down", [FederatedMember("kubernetes", broken)]).search_results("q"))
+
+
+def test_member_names_must_be_unique():
+    members = [FederatedMember("rasa", FakeSearch([doc("a")])), FederatedMember("rasa", FakeSearch([doc("b")]))]
+
+    with pytest.raises(ValueError, match="rasa"):
+        FederatedSearch("twice", members)
+
+
+def test_federated_source_shares_its_members_search_clients():
+    clients = {"rasa": FakeSearch([doc("rasa/deploy")]), "kubernetes": FakeSearch([doc("k8s/pods")])}
+
+    def factory(config, search_api=None):
+        return RAGSource(config, search_api=search_api or clients[config.name], renderer=object(), llm=object())
+
+    federated = RAGSourceConfig.from_dict(
+        {
+            "name": "rasa_kubernetes",
+            "backend": "federated",
+            "members": ["rasa", "kubernetes", "missing"],
+            "deadline": 2,
+        }
+    )
+    sources = build_sources(
+        [
+            federated,
+            RAGSourceConfig(name="rasa", action="action_rasa_rag"),
+            RAGSourceConfig(name="kubernetes", action="action_kubernetes_rag"),
+        ],
+        factory=factory,
+    )
+
+    assert [source.name for source in sources] == ["rasa_kubernetes", "rasa", "kubernetes"]
+    members = sources[0].search_api.members
+    assert [(member.name, member.search_api, member.deadline) for member in members] == [
+        ("rasa", clients["rasa"], 2.0),
+        ("kubernetes", clients["kubernetes"], 2.0),
+    ]
+    assert federated.action == "action_rasa_kubernetes_rag"
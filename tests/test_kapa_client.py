@@ -0,0 +1,54 @@
+import asyncio
+from pathlib import Path
+import sys
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.kapa_client import (
+    KAPA_CONNECTION_REUSE_RATIO,
+    KAPA_CONNECTIONS_TOTAL,
+    KapaClient,
+    KapaHTTPError,
+    collect_metrics,
+)
+
+
+async def search(request):
+    body = await request.json()
+    if request.headers["X-API-KEY"] != "token":
+        return web.json_response({"detail": "invalid token"}, status=401)
+    return web.json_response({"search_results": [{"content": body["query"]}] * body["num_results"]})
+
+
+def test_queries_reuse_pooled_connections():
+    async def run():
+        app = web.Application()
+        app.router.add_post("/search/", search)
+        server = TestServer(app)
+        await server.start_server()
+        client = KapaClient()
+        url = str(server.make_url("/search/"))
+        try:
+            first = await client.query(url, "token", "what is a pod", 2)
+            second = await client.query(url, "token", "what is a node", 1)
+            with pytest.raises(KapaHTTPError) as error:
+                await client.query(url, "wrong", "what is a pod", 1)
+            return first, second, error.value
+        finally:
+            await client.close()
+            await server.close()
+
+    new = KAPA_CONNECTIONS_TOTAL.value(result="new")
+    reused = KAPA_CONNECTIONS_TOTAL.value(result="reused")
+    first, second, error = asyncio.run(run())
+
+    assert first == {"search_results": [{"content": "what is a pod"}] * 2}
+    assert second == {"search_results": [{"content": "what is a node"}]}
+    assert error.status == 401
+    assert KAPA_CONNECTIONS_TOTAL.value(result="new") == new + 1
+    assert KAPA_CONNECTIONS_TOTAL.value(result="reused") == reused + 2
+    collect_metrics()
+    assert 0 < KAPA_CONNECTION_REUSE_RATIO.value() < 1
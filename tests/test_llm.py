@@ -0,0 +1,140 @@
+import asyncio
+from pathlib import Path
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.llm import LLMClient, LLM_TIME_TO_FIRST_TOKEN_SECONDS, LLM_TOKENS_TOTAL
+from actions.api.stream_hub import StreamHub, stream_to_sender
+
+
+def response(text="ok"):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=3),
+    )
+
+
+def test_concurrent_completions_are_bounded():
+    running = 0
+    peak = 0
+
+    async def acompletion(model, messages, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return response()
+
+    async def run():
+        client = LLMClient(max_concurrency=2, acompletion=acompletion)
+        return await asyncio.gather(*(client.complete("model-a", []) for _ in range(6)))
+
+    results = asyncio.run(run())
+    assert len(results) == 6 and peak == 2
+    assert LLM_TOKENS_TOTAL.value(model="model-a", kind="prompt") == 60
+
+
+def test_completion_times_out():
+    async def acompletion(model, messages, **kwargs):
+        await asyncio.sleep(1)
+
+    client = LLMClient(timeout=0.01, acompletion=acompletion)
+    with pytest.raises(TimeoutError):
+        asyncio.run(client.complete("model-b", []))
+
+
+def test_falls_back_to_thread_pool_without_blocking_the_loop():
+    threads = []
+    async_models = []
+
+    async def acompletion(model, messages, **kwargs):
+        async_models.append(model)
+        if model == "model-c":
+            raise NotImplementedError
+        return response("async")
+
+    def completion(model, messages, **kwargs):
+        threads.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return response("from thread")
+
+    async def run():
+        client = LLMClient(acompletion=acompletion, completion=completion)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        tick_task = asyncio.create_task(ticker())
+        result = await client.complete("model-c", [])
+        tick_task.cancel()
+        # the fallback is remembered for model-c only
+        again = await client.complete("model-c", [])
+        other = await client.complete("model-c2", [])
+        client.close()
+        return client, (result, again, other), ticks
+
+    client, results, ticks = asyncio.run(run())
+    assert [r.choices[0].message.content for r in results] == ["from thread", "from thread", "async"]
+    assert len(threads) == 2 and threads[0].startswith("llm-completion")
+    assert async_models == ["model-c", "model-c2"]
+    assert client.use_async
+    # the event loop kept running while the blocking completion was in flight
+    assert ticks > 3
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def test_streamed_answer_is_sent_per_sentence():
+    async def acompletion(model, messages, stream=False, **kwargs):
+        assert stream
+
+        async def chunks():
+            for text in ["Pods ", "run ", "containers. ", "A ", "Deployment", " manages them.", None, " Done"]:
+                await asyncio.sleep(0)
+                yield chunk(text)
+
+        return chunks()
+
+    async def run():
+        hub = StreamHub(enabled=True)
+        queue = hub.subscribe("sender-1")
+        assert hub.streaming_to("sender-1") and not hub.streaming_to("sender-2")
+        client = LLMClient(acompletion=acompletion)
+        text = await stream_to_sender("sender-1", client.stream("model-d", []), hub=hub)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        return text, events
+
+    text, events = asyncio.run(run())
+    assert text == "Pods run containers. A Deployment manages them. Done"
+    assert [e["text"] for e in events if e["event"] == "partial"] == [
+        "Pods run containers.",
+        "A Deployment manages them.",
+        "Done",
+    ]
+    assert events[-1] == {"event": "done", "text": text}
+    assert LLM_TIME_TO_FIRST_TOKEN_SECONDS.count(model="model-d") == 1
+
+
+def test_stream_falls_back_to_one_piece_without_async():
+    def completion(model, messages, **kwargs):
+        return response("whole answer")
+
+    async def run():
+        client = LLMClient(use_async=False, completion=completion)
+        chunks = [text async for text in client.stream("model-e", [])]
+        client.close()
+        return chunks
+
+    assert asyncio.run(run()) == ["whole answer"]
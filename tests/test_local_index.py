@@ -0,0 +1,141 @@
+import asyncio
+import json
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.local_index import (
+    LocalIndex,
+    LocalSearchAPI,
+    html_chunks,
+    load_documents,
+    markdown_chunks,
+    open_or_build_index,
+)
+from actions.api.rag import RAGSourceConfig, create_search_api
+
+VOCABULARY = ["pods", "deployment", "rollback", "service", "ingress"]
+
+
+def embed(texts):
+    # bag of words over a tiny vocabulary, "rollout" counts as "rollback"
+    vectors = []
+    for text in texts:
+        words = text.lower().replace("rollout", "rollback").split()
+        vectors.append([sum(word.startswith(term) for word in words) for term in VOCABULARY])
+    return np.array(vectors, dtype=np.float32)
+
+
+def write_docs(directory):
+    directory = directory / "docs"
+    directory.mkdir()
+    (directory / "pods.md").write_text(
+        "# Pods\n\nList running pods with kubectl get pods.\n\n"
+        "## Deleting pods\n\nDelete a pod with kubectl delete pod.\n"
+    )
+    (directory / "deploy.html").write_text(
+        "<html><head><style>p {}</style></head><body>"
+        "<h1>Deployment</h1><p>Undo a deployment rollback with kubectl undo.</p>"
+        "<script>var pods = 1;</script></body></html>"
+    )
+    (directory / "faq.jsonl").write_text(
+        json.dumps({"title": "Service", "content": "Expose a service with an ingress.", "source_url": "https://k8s/svc"})
+        + "\n"
+    )
+    (directory / "notes.txt").write_text("ignored")
+
+
+def test_markdown_is_chunked_by_heading_and_size():
+    chunks = markdown_chunks("intro\n\n# One\n\naaa\n\nbbb\n\n## Two\n\n" + "c" * 25, "doc.md", max_chars=10)
+
+    assert [(chunk.title, chunk.content) for chunk in chunks] == [
+        ("", "intro"),
+        ("One", "aaa\n\nbbb"),
+        ("Two", "c" * 10),
+        ("Two", "c" * 10),
+        ("Two", "c" * 5),
+    ]
+    assert {chunk.source_url for chunk in chunks} == {"doc.md"}
+
+
+def test_html_skips_scripts_and_styles():
+    [chunk] = html_chunks(
+        "<style>p {}</style><h2>Title</h2><p>Some <b>bold</b> text</p><script>x()</script>", "page.html"
+    )
+
+    assert (chunk.title, chunk.content, chunk.source_type) == ("Title", "Some bold text", "html")
+
+
+def test_build_and_load_memory_maps_the_index(tmp_path):
+    write_docs(tmp_path)
+    chunks = load_documents(str(tmp_path / "docs"))
+    assert {chunk.source_url for chunk in chunks} == {"pods.md", "deploy.html", "https://k8s/svc"}
+
+    LocalIndex.build(chunks, str(tmp_path / "index"), embed, embedding_model="bag-of-words")
+    index = LocalIndex.load(str(tmp_path / "index"))
+
+    assert len(index) == len(chunks)
+    assert isinstance(index.vectors, np.memmap)
+    assert index.vectors.shape == (len(chunks), len(VOCABULARY))
+    assert index.meta == {"chunks": len(chunks), "dimension": len(VOCABULARY), "embedding_model": "bag-of-words"}
+
+
+def test_bm25_ranks_keyword_matches(tmp_path):
+    write_docs(tmp_path)
+    index = LocalIndex.build(load_documents(str(tmp_path / "docs")), str(tmp_path / "index"))
+
+    hits = index.search("how do I delete a pod", num_results=2)
+    assert hits[0].chunk.title == "Deleting pods"
+    assert hits[0].score == 1.0
+    assert index.vectors is None
+    # no overlap with any chunk, nothing is returned
+    assert index.search("zebra") == []
+
+
+def test_hybrid_search_blends_vectors_and_bm25(tmp_path):
+    write_docs(tmp_path)
+    index = LocalIndex.build(load_documents(str(tmp_path / "docs")), str(tmp_path / "index"), embed)
+
+    # "rollout" and "rollback" share a vector dimension but no BM25 token
+    [vector] = embed(["rollout"])
+    [hit] = index.search("rollout", vector, num_results=1, alpha=1.0)
+    assert hit.chunk.title == "Deployment"
+    assert hit.bm25 == 0 and hit.cosine > 0
+
+    # a vector of the wrong dimension falls back to BM25
+    [hit] = index.search("ingress", np.ones(3), num_results=1)
+    assert hit.chunk.title == "Service"
+
+
+def test_open_or_build_index_builds_once(tmp_path):
+    write_docs(tmp_path)
+    first = open_or_build_index(str(tmp_path / "index"), str(tmp_path / "docs"))
+    (tmp_path / "docs" / "more.md").write_text("# More\n\nmore pods")
+
+    assert len(open_or_build_index(str(tmp_path / "index"), str(tmp_path / "docs"))) == len(first)
+    assert len(open_or_build_index(str(tmp_path / "index"), str(tmp_path / "docs"), rebuild=True)) == len(first) + 1
+
+
+def test_local_search_api_answers_in_kapa_format(tmp_path):
+    write_docs(tmp_path)
+    index = LocalIndex.build(load_documents(str(tmp_path / "docs")), str(tmp_path / "index"), embed)
+    api = LocalSearchAPI(index, lambda text: embed([text])[0], num_results=1)
+
+    [result] = json.loads(asyncio.run(api.search("list running pods")))
+    assert result["content"] == "List running pods with kubectl get pods."
+    assert result["source_url"] == "pods.md"
+    assert set(result) == {"content", "title", "source_url", "source_type", "score"}
+
+
+def test_local_rag_source(tmp_path):
+    write_docs(tmp_path)
+    config = RAGSourceConfig.from_dict(
+        {"name": "offline", "backend": "local", "index_path": str(tmp_path / "index"), "docs_path": str(tmp_path / "docs")}
+    )
+
+    api = create_search_api(config)
+    assert isinstance(api, LocalSearchAPI)
+    assert api.embed_query is None
+    assert json.loads(asyncio.run(api.search("ingress")))[0]["title"] == "Service"
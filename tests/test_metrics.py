@@ -0,0 +1,76 @@
+import gc
+from pathlib import Path
+import sys
+import urllib.request
+import weakref
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.a2a import ActionA2A
+from actions.api import metrics
+from actions.api.metrics import Registry
+
+
+def test_registry_renders_prometheus_text_format():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ["agent"])
+    requests.inc(agent="Currency Agent")
+    requests.inc(2, agent="Currency Agent")
+    latency = registry.histogram("latency_seconds", "Latency", ["agent"], buckets=(0.1, 1.0))
+    latency.observe(0.05, agent='say "hi"')
+    latency.observe(0.5, agent='say "hi"')
+    sessions = registry.gauge("sessions", "Sessions")
+    registry.on_collect(lambda: sessions.set(7))
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{agent="Currency Agent"} 3' in text
+    assert 'latency_seconds_bucket{agent="say \\"hi\\"",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{agent="say \\"hi\\"",le="1"} 2' in text
+    assert 'latency_seconds_bucket{agent="say \\"hi\\"",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{agent="say \\"hi\\""} 2' in text
+    assert "sessions 7" in text
+
+
+def test_metrics_are_registered_once_per_name():
+    registry = Registry()
+    assert registry.counter("hits_total", "Hits", ["cache"]) is registry.counter("hits_total", "Hits", ["cache"])
+    try:
+        registry.gauge("hits_total", "Hits", ["cache"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("registering a gauge under a counter's name must fail")
+
+
+def test_http_server_serves_the_shared_registry():
+    metrics.record_cache("test_cache", "hit")
+    server = metrics.start_http_server(0, addr="127.0.0.1")
+    port = server.server_address[1]
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        body = response.read().decode()
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'cache_requests_total{cache="test_cache",result="hit"} 1' in body
+
+
+def test_weak_collectors_are_dropped_with_their_owner():
+    registry = Registry()
+    sessions = registry.gauge("sessions", "Sessions")
+
+    class Owner:
+        def collect(self):
+            sessions.set(3)
+
+    owner = Owner()
+    registry.on_collect(weakref.WeakMethod(owner.collect))
+    assert "sessions 3" in registry.render()
+
+    del owner
+    gc.collect()
+    registry.render()
+    assert registry._collectors == []
+
+
+def test_action_instances_are_not_kept_alive_by_the_registry():
+    action = weakref.ref(ActionA2A())
+    gc.collect()
+    assert action() is None
@@ -0,0 +1,59 @@
+import asyncio
+import json
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api import profiling
+from actions.api.profiling import ProfilerConfig
+
+
+def test_spans_are_noops_when_the_run_is_not_profiled(monkeypatch):
+    monkeypatch.setattr(profiling, "config", ProfilerConfig())
+    with profiling.profile_action("action_a2a", "user-1") as profile:
+        assert profile is None
+        assert profiling.span("send") is profiling._NOOP_SPAN
+
+
+def test_profiled_action_writes_chrome_trace(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "config", ProfilerConfig(actions={"action_a2a"}, output_dir=str(tmp_path)))
+
+    async def run():
+        with profiling.profile_action("action_a2a", "user-1") as profile:
+            with profiling.span("send"):
+                with profiling.span("stream"):
+                    await asyncio.sleep(0.01)
+            with profiling.span("dispatch"):
+                pass
+        return profile
+
+    profile = asyncio.run(run())
+    stacks = [";".join(s.path) for s in profile.spans]
+    assert stacks == ["action_a2a;send;stream", "action_a2a;send", "action_a2a;dispatch", "action_a2a"]
+
+    trace = json.loads(next(tmp_path.glob("action_a2a-user_1-*.json")).read_text())
+    stream = next(e for e in trace["traceEvents"] if e["name"] == "stream")
+    assert stream["ph"] == "X" and stream["dur"] >= 10_000
+
+
+def test_collapsed_stacks_use_self_time(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        profiling, "config", ProfilerConfig(sample_rate=1.0, output_dir=str(tmp_path), fmt="collapsed")
+    )
+    with profiling.profile_action("action_kubernetes_rag", "user-2") as profile:
+        with profiling.span("kapa_search"):
+            pass
+    profile.spans = [
+        profiling.SpanRecord(("rag", "kapa_search"), 0.0, 0.3, 0.0, 1),
+        profiling.SpanRecord(("rag",), 0.0, 1.0, 0.0, 1),
+    ]
+    assert profile.collapsed_stacks() == ["rag;kapa_search 300000", "rag 700000"]
+    assert (tmp_path / "action_kubernetes_rag.folded").read_text().startswith("action_kubernetes_rag;kapa_search ")
+
+
+def test_sender_sampling_is_stable_per_sender():
+    config = ProfilerConfig(sample_rate=0.5)
+    senders = [f"user-{i}" for i in range(200)]
+    sampled = [s for s in senders if config.should_profile("action_a2a", s)]
+    assert 50 < len(sampled) < 150
+    assert sampled == [s for s in senders if config.should_profile("action_a2a", s)]
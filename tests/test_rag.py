@@ -0,0 +1,107 @@
+import asyncio
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.rag import RAGSource, RAGSourceConfig, build_sources, load_source_configs
+from actions.rag import RAGAction, rag_action_class
+
+
+class FakeSearch:
+    def __init__(self):
+        self.queries = []
+
+    async def search(self, query_string):
+        self.queries.append(query_string)
+        return '[{"content": "kubectl get pods"}]'
+
+
+class FakeRenderer:
+    def __init__(self):
+        self.renders = 0
+
+    def render(self, **kwargs):
+        self.renders += 1
+        return f"prompt: {kwargs['user_message']}"
+
+
+class FakeLLM:
+    async def complete(self, model, messages):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"{model} answer"))])
+
+
+def test_source_settings_from_defaults_and_environment(tmp_path, monkeypatch):
+    config = tmp_path / "rag.yml"
+    config.write_text(
+        "defaults:\n"
+        "  num_results: 5\n"
+        "  model: gpt-4o\n"
+        "  model_env: TEST_RAG_MODEL\n"
+        "sources:\n"
+        "  - name: docs\n"
+        "    project_id_env: TEST_RAG_PROJECT\n"
+        "    token: literal-token\n"
+        "    num_results_env: TEST_RAG_NUM_RESULTS\n"
+    )
+    monkeypatch.setenv("TEST_RAG_PROJECT", "project-1")
+    monkeypatch.setenv("TEST_RAG_NUM_RESULTS", "8")
+    monkeypatch.delenv("TEST_RAG_MODEL", raising=False)
+
+    [source] = load_source_configs(str(config))
+    assert source == RAGSourceConfig(
+        name="docs",
+        action="action_docs_rag",
+        project_id="project-1",
+        token="literal-token",
+        num_results=8,
+        model="gpt-4o",
+    )
+    monkeypatch.setenv("TEST_RAG_MODEL", "gpt-4o-mini")
+    assert load_source_configs(str(config))[0].model == "gpt-4o-mini"
+
+
+def test_sources_are_built_once_and_broken_ones_left_out():
+    built = []
+
+    def factory(config):
+        if not config.token:
+            raise ValueError("Kapa token not set.")
+        built.append(config.name)
+        return RAGSource(config, search_api=FakeSearch(), renderer=FakeRenderer(), llm=FakeLLM())
+
+    sources = build_sources(
+        [
+            RAGSourceConfig(name="kubernetes", action="action_kubernetes_rag", token="t"),
+            RAGSourceConfig(name="no_token", action="action_no_token_rag"),
+        ],
+        factory=factory,
+    )
+    assert [source.name for source in sources] == ["kubernetes"] and built == ["kubernetes"]
+
+    sources[0].warm()
+    sources[0].warm()
+    assert sources[0].renderer.renders == 1
+
+
+def test_generated_action_answers_from_its_source():
+    search = FakeSearch()
+    source = RAGSource(
+        RAGSourceConfig(name="kubernetes", action="action_kubernetes_rag", model="model-k"),
+        search_api=search,
+        renderer=FakeRenderer(),
+        llm=FakeLLM(),
+    )
+    action_class = rag_action_class(source)
+    assert action_class.__name__ == "KubernetesRAG" and issubclass(action_class, RAGAction)
+
+    action = action_class()
+    dispatcher = SimpleNamespace(messages=[])
+    dispatcher.utter_message = lambda text: dispatcher.messages.append(text)
+    tracker = SimpleNamespace(latest_message={"text": "show pods"}, sender_id="user-1")
+    events = asyncio.run(action.run(dispatcher, tracker, {}))
+
+    assert action.name() == "action_kubernetes_rag"
+    assert search.queries == ["show pods"]
+    assert dispatcher.messages == ["model-k answer"]
+    assert events == [{"event": "slot", "timestamp": None, "name": "return_value", "value": "success"}]
@@ -0,0 +1,95 @@
+import asyncio
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.kapa_client import KapaHTTPError
+from actions.api.request_policy import (
+    REQUEST_HEDGES_TOTAL,
+    REQUEST_RETRIES_TOTAL,
+    BudgetExhaustedError,
+    RequestPolicy,
+)
+
+
+def test_slow_attempt_is_hedged_and_the_loser_cancelled():
+    attempts = []
+    cancelled = []
+
+    async def call(timeout):
+        attempt = len(attempts)
+        attempts.append(timeout)
+        try:
+            await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return f"attempt {attempt}"
+
+    policy = RequestPolicy(name="test_hedge", budget=2, hedge_delay=0.02)
+    won = REQUEST_HEDGES_TOTAL.value(policy="test_hedge", result="won")
+    assert asyncio.run(policy.run(call)) == "attempt 1"
+    assert len(attempts) == 2 and attempts[1] < attempts[0] <= 2
+    assert cancelled == [0]
+    assert REQUEST_HEDGES_TOTAL.value(policy="test_hedge", result="won") == won + 1
+
+
+def test_policy_from_call_site_config():
+    policy = RequestPolicy.from_config({"kapa_budget": 5, "kapa_hedge": False, "kapa_url": "x"}, prefix="kapa_")
+    assert policy.budget == 5.0 and policy.hedge is False and policy.max_retries == 2
+
+
+def test_winning_hedge_is_observed_with_its_own_latency():
+    attempts = []
+
+    async def call(timeout):
+        attempts.append(timeout)
+        await asyncio.sleep(1.0 if len(attempts) == 1 else 0.01)
+        return "ok"
+
+    policy = RequestPolicy(name="test_hedge_latency", budget=2, hedge_delay=0.2)
+    assert asyncio.run(policy.run(call)) == "ok"
+    # measured from the primary's start it would include the 0.2s hedge delay
+    assert len(policy._latencies) == 1 and policy._latencies[0] < 0.2
+
+
+def test_hedge_delay_follows_observed_latency():
+    policy = RequestPolicy(hedge_delay=2.0, min_samples=5, min_hedge_delay=0.05)
+    assert policy.hedge_after() == 2.0
+    for seconds in (0.1, 0.1, 0.1, 0.2, 0.3):
+        policy.observe(seconds)
+    assert 0.2 < policy.hedge_after() < 0.3
+
+
+def test_retryable_errors_are_retried_within_the_budget():
+    statuses = [503, 429]
+
+    async def call(timeout):
+        if statuses:
+            raise KapaHTTPError(statuses.pop(0), "busy")
+        return {"search_results": []}
+
+    policy = RequestPolicy(name="test_retry", budget=2, hedge=False, backoff=0.001)
+    retries = REQUEST_RETRIES_TOTAL.value(policy="test_retry")
+    assert asyncio.run(policy.run(call)) == {"search_results": []}
+    assert REQUEST_RETRIES_TOTAL.value(policy="test_retry") == retries + 2
+
+
+def test_client_errors_fail_fast_and_slow_requests_exhaust_the_budget():
+    calls = []
+
+    async def unauthorized(timeout):
+        calls.append(timeout)
+        raise KapaHTTPError(401, "invalid token")
+
+    with pytest.raises(KapaHTTPError):
+        asyncio.run(RequestPolicy(budget=2, backoff=0.001).run(unauthorized))
+    assert len(calls) == 1
+
+    async def hanging(timeout):
+        await asyncio.sleep(1)
+
+    with pytest.raises(BudgetExhaustedError):
+        asyncio.run(RequestPolicy(budget=0.05, hedge_delay=0.01).run(hanging))
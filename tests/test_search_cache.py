@@ -0,0 +1,97 @@
+import asyncio
+from pathlib import Path
+import sys
+import threading
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.search_cache import (
+    MemorySearchCache,
+    SearchCache,
+    SQLiteSearchCache,
+    create_search_cache,
+    search_cache_key,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_folds_case_punctuation_and_whitespace():
+    assert search_cache_key("p1", "search", 8, "What is  a Pod?") == search_cache_key("p1", "search", 8, "what is a pod")
+    assert search_cache_key("p1", "search", 8, "what is a pod") != search_cache_key("p1", "chat", 8, "what is a pod")
+    assert search_cache_key("p1", "search", 8, "what is a pod") != search_cache_key("p1", "search", 3, "what is a pod")
+
+
+def test_memory_cache_expires_and_evicts_least_recently_used():
+    clock = FakeClock()
+    cache = MemorySearchCache(ttl=60, max_entries=2, clock=clock)
+    cache.put("a", {"search_results": []})
+    cache.put("b", {"search_results": []})
+    assert cache.get("a") is not None
+    cache.put("c", {"search_results": []})
+    assert cache.get("b") is None and len(cache) == 2
+
+    clock.now += 60
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "search.db")
+    clock = FakeClock()
+    cache = SQLiteSearchCache(path, ttl=60, clock=clock)
+    cache.put("a", {"search_results": [{"content": "kubectl get pods"}]})
+    cache.close()
+
+    reopened = SQLiteSearchCache(path, ttl=60, clock=clock)
+    assert reopened.get("a") == {"search_results": [{"content": "kubectl get pods"}]}
+    clock.now += 61
+    reopened._entries.clear()
+    assert reopened.get("a") is None
+    reopened.close()
+
+
+def test_cache_from_endpoint_config(tmp_path):
+    assert isinstance(create_search_cache({}), MemorySearchCache)
+    assert create_search_cache({"kapa_cache": False}) is None
+    assert create_search_cache({"kapa_cache_ttl": 0}) is None
+    cache = create_search_cache({"kapa_cache": "sqlite", "kapa_cache_path": str(tmp_path / "kapa.db")})
+    assert isinstance(cache, SQLiteSearchCache)
+    cache.close()
+
+
+def test_search_cache_is_abstract():
+    with pytest.raises(TypeError):
+        SearchCache()
+
+
+def test_sqlite_cache_queries_in_a_worker_thread(tmp_path, monkeypatch):
+    cache = SQLiteSearchCache(str(tmp_path / "search.db"), ttl=60)
+    threads = []
+    execute = cache._db.execute
+
+    class RecordingConnection:
+        def execute(self, *args):
+            threads.append(threading.current_thread() is threading.main_thread())
+            return execute(*args)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(cache, "_db", RecordingConnection())
+
+    async def lookups():
+        await cache.aput("a", {"search_results": []})
+        cache._entries.clear()
+        return await cache.aget("a")
+
+    assert asyncio.run(lookups()) == {"search_results": []}
+    assert threads == [False, False]
+    monkeypatch.undo()
+    cache.close()
@@ -0,0 +1,61 @@
+import asyncio
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api.single_flight import SINGLE_FLIGHT_SAVED_TOTAL, SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_request():
+    calls = []
+
+    async def fetch(query):
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        return {"query": query}
+
+    async def run():
+        flight = SingleFlight("test_search")
+        results = await asyncio.gather(
+            *(flight.do(query, lambda query=query: fetch(query)) for query in ["pods", "pods", "pods", "nodes"])
+        )
+        # a later call starts a new request
+        again = await flight.do("pods", lambda: fetch("pods"))
+        return flight, results, again
+
+    saved = SINGLE_FLIGHT_SAVED_TOTAL.value(name="test_search")
+    flight, results, again = asyncio.run(run())
+    assert results == [{"query": "pods"}] * 3 + [{"query": "nodes"}]
+    assert again == {"query": "pods"}
+    assert calls == ["pods", "nodes", "pods"]
+    assert flight.calls == 3 and flight.saved == 2
+    assert SINGLE_FLIGHT_SAVED_TOTAL.value(name="test_search") == saved + 2
+
+
+def test_followers_get_the_leaders_exception_and_survive_its_cancellation():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("Kapa search timeout")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def run():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("q", failing))
+        second = asyncio.ensure_future(flight.do("q", failing))
+        with pytest.raises(RuntimeError):
+            await first
+        with pytest.raises(RuntimeError):
+            await second
+
+        leader = asyncio.ensure_future(flight.do("r", slow))
+        follower = asyncio.ensure_future(flight.do("r", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "result"
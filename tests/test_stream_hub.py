@@ -0,0 +1,68 @@
+import asyncio
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from actions.api import stream_hub
+from actions.api.stream_hub import StreamHub
+
+
+class FakeApp:
+    def __init__(self):
+        self.routes = {}
+
+    def add_route(self, handler, uri, methods=None, name=None):
+        self.routes[uri] = handler
+
+
+class FakeRequest:
+    def __init__(self, headers=None, args=None):
+        self.headers = headers or {}
+        self.args = args or {}
+
+    async def respond(self, **kwargs):
+        raise AssertionError("unauthorized request was answered with a stream")
+
+
+def attach(monkeypatch, hub, workers="1"):
+    monkeypatch.setattr(stream_hub, "HUB", hub)
+    monkeypatch.setenv("ACTION_SERVER_SANIC_WORKERS", workers)
+    app = FakeApp()
+    stream_hub.attach_stream_endpoint(app)
+    return app
+
+
+def test_tokens_are_bound_to_the_conversation():
+    hub = StreamHub(enabled=True, secret="s3cret")
+    token = hub.token_for("sender-1")
+
+    assert hub.authorized("sender-1", token)
+    assert not hub.authorized("sender-2", token)
+    assert not hub.authorized("sender-1", None)
+    assert not StreamHub(enabled=True).authorized("sender-1", StreamHub(enabled=True).token_for("sender-1"))
+
+
+def test_stream_endpoint_rejects_requests_without_a_valid_token(monkeypatch):
+    hub = StreamHub(enabled=True, secret="s3cret")
+    endpoint = attach(monkeypatch, hub).routes[stream_hub.STREAM_PATH]
+
+    for request in (
+        FakeRequest(),
+        FakeRequest(args={"token": hub.token_for("sender-2")}),
+        FakeRequest(headers={stream_hub.TOKEN_HEADER: "guess"}),
+    ):
+        response = asyncio.run(endpoint(request, "sender-1"))
+        assert response.status == 403
+    assert not hub.streaming_to("sender-1")
+
+
+def test_stream_endpoint_is_not_served_without_secret_or_with_several_workers(monkeypatch):
+    hub = StreamHub(enabled=True)
+    assert attach(monkeypatch, hub).routes == {}
+    assert not hub.enabled
+
+    hub = StreamHub(enabled=True, secret="s3cret")
+    assert attach(monkeypatch, hub, workers="4").routes == {}
+    # the RAG actions fall back to sending one message
+    hub.subscribe("sender-1")
+    assert not hub.streaming_to("sender-1")